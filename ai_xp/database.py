@@ -1,16 +1,52 @@
 import json
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+from functools import cached_property
 from pathlib import Path
-from time import sleep
 from typing import Self
 
 import pandas as pd
 
-from ai_xp.llm_proxy import AiSummarizer, AiSummaryPath, OpenRouterAiProxy, VideoModel
+from ai_xp.html_archive import HtmlArchive, reparse_archive
+from ai_xp.http_client import PooledSession, default_http_client
+from ai_xp.input_cache import InputCache
+from ai_xp.job_ledger import JobKey, JobLedger
+from ai_xp.layout import ArtifactDirectory
+from ai_xp.llm_proxy import (
+    AiSummarizer,
+    OpenRouterAiProxy,
+    SummaryJob,
+    VideoModel,
+    max_concurrency_from_key_info,
+)
+from ai_xp.manifest import FileManifest
+from ai_xp.metrics import MetricsRegistry, default_metrics
+from ai_xp.rate_limit import (
+    AdaptiveConcurrencyLimiter,
+    TokenBucket,
+    run_rate_limited,
+)
+from ai_xp.response_cache import ResponseCache
 from ai_xp.scrapper import MetadataPath, YouTubeHtmlScrapper
-from ai_xp.transcript import TranscriptPath, extract_video_id, get_youtube_transcript
-from ai_xp.utils import load_json, render_title_slug, render_video_url, retrieve_api_key
-from ai_xp.youtube_history import YouTubeHistoryAnalyzer
+from ai_xp.search_index import SearchIndex, TranscriptHit
+from ai_xp.transcript import (
+    TranscriptBatchFetcher,
+    TranscriptErrorResult,
+    TranscriptKey,
+    TranscriptPath,
+    TranscriptSuccessResult,
+    extract_video_id,
+    get_youtube_transcript,
+)
+from ai_xp.transcript_store import TranscriptStore
+from ai_xp.usage_ledger import UsageLedger
+from ai_xp.utils import (
+    has_pyarrow,
+    load_json,
+    render_title_slug,
+    render_video_url,
+    retrieve_api_key,
+)
+from ai_xp.youtube_history import HISTORY_COLUMNS, YouTubeHistoryAnalyzer
 
 
 @dataclass(kw_only=True, frozen=True)
@@ -54,14 +90,34 @@ class FileDatabase:
     metadata_dataframe: pd.DataFrame = field(repr=False)
     transcript_dataframe: pd.DataFrame = field(repr=False)
     llm_output_dataframe: pd.DataFrame = field(repr=False)
+    # When available, the artifact dataframes are loaded from the manifest
+    # instead of globbing the generated directories.
+    manifest: FileManifest | None = field(default=None, repr=False)
+    # When available, search() is backed by a full-text index.
+    search_index: SearchIndex | None = field(default=None, repr=False)
+    # Columnar copy of the transcripts, filled by compact_transcripts().
+    transcript_store: TranscriptStore | None = field(default=None, repr=False)
+    # Per (stage, video) state of the fetches, to resume and retry.
+    job_ledger: JobLedger | None = field(default=None, repr=False)
+    # Parsed input files, so unchanged histories are not parsed again.
+    input_cache: InputCache | None = field(default=None, repr=False)
+    # Spans of the fetch stages; the process-wide registry when None.
+    metrics: MetricsRegistry | None = field(default=None, repr=False)
 
     def refresh(self) -> Self:
-        # XXX Inefficient. Just recreate a new instance. This is bruteforce
+        # With a manifest, only the directories that changed are listed again.
+        # Without it, this is bruteforce and all directories are globbed.
         return self.from_paths_detailed(
             input_lookup_dir_path=self.input_lookup_dir_path,
             metadata_lookup_dir_path=self.metadata_lookup_dir_path,
             transcript_lookup_dir_path=self.transcript_lookup_dir_path,
             llm_output_lookup_dir_path=self.llm_output_lookup_dir_path,
+            manifest=self.manifest,
+            search_index=self.search_index,
+            transcript_store=self.transcript_store,
+            job_ledger=self.job_ledger,
+            input_cache=self.input_cache,
+            metrics=self.metrics,
         )
 
     @classmethod
@@ -69,15 +125,55 @@ class FileDatabase:
         cls,
         input_lookup_dir_path: Path,
         root_database_path: Path,
+        *,
+        use_manifest: bool = True,
+        use_search_index: bool = True,
+        use_input_cache: bool = True,
+        use_job_ledger: bool = True,
     ) -> Self:
         metadata_lookup_dir_path = root_database_path / "metadata_output"
         transcript_lookup_dir_path = root_database_path / "transcript_output"
         llm_output_lookup_dir_path = root_database_path / "llm_output"
+        manifest = (
+            FileManifest.open(
+                root_database_path / "manifest.sqlite",
+                metadata_dir_path=metadata_lookup_dir_path,
+                transcript_dir_path=transcript_lookup_dir_path,
+                llm_output_dir_path=llm_output_lookup_dir_path,
+            )
+            if use_manifest
+            else None
+        )
+        search_index = (
+            SearchIndex.open(root_database_path / "search_index.sqlite")
+            if use_search_index
+            else None
+        )
         return cls.from_paths_detailed(
             input_lookup_dir_path=input_lookup_dir_path,
             metadata_lookup_dir_path=metadata_lookup_dir_path,
             transcript_lookup_dir_path=transcript_lookup_dir_path,
             llm_output_lookup_dir_path=llm_output_lookup_dir_path,
+            manifest=manifest,
+            search_index=search_index,
+            transcript_store=TranscriptStore(
+                root=root_database_path / "transcript_store"
+            ),
+            job_ledger=(
+                JobLedger.open(root_database_path / "jobs.sqlite")
+                if use_job_ledger
+                else None
+            ),
+            # The cache needs pyarrow (Parquet): inputs are parsed otherwise.
+            input_cache=(
+                InputCache(root=root_database_path / "input_cache")
+                if use_input_cache and has_pyarrow()
+                else None
+            ),
+            metrics=MetricsRegistry(
+                events_path=root_database_path / "metrics" / "events.jsonl",
+                prometheus_path=root_database_path / "metrics" / "ai_xp.prom",
+            ),
         )
 
     @classmethod
@@ -88,13 +184,29 @@ class FileDatabase:
         metadata_lookup_dir_path: Path,
         transcript_lookup_dir_path: Path,
         llm_output_lookup_dir_path: Path,
+        manifest: FileManifest | None = None,
+        search_index: SearchIndex | None = None,
+        transcript_store: TranscriptStore | None = None,
+        job_ledger: JobLedger | None = None,
+        input_cache: InputCache | None = None,
+        metrics: MetricsRegistry | None = None,
     ) -> Self:
-        input_dataframe = inputs_dir_to_dataframe(input_lookup_dir_path)
-        metadata_dataframe = metadata_dir_to_dataframe(metadata_lookup_dir_path)
-        transcript_dataframe = transcripts_dir_to_dataframe(transcript_lookup_dir_path)
-        llm_output_dataframe = llm_outputs_dir_dataframe(llm_output_lookup_dir_path)
+        input_dataframe = inputs_dir_to_dataframe(
+            input_lookup_dir_path, input_cache=input_cache
+        )
+        if manifest is not None:
+            manifest.reconcile()
+            metadata_dataframe = manifest.metadata_dataframe()
+            transcript_dataframe = manifest.transcript_dataframe()
+            llm_output_dataframe = manifest.llm_output_dataframe()
+        else:
+            metadata_dataframe = metadata_dir_to_dataframe(metadata_lookup_dir_path)
+            transcript_dataframe = transcripts_dir_to_dataframe(
+                transcript_lookup_dir_path
+            )
+            llm_output_dataframe = llm_outputs_dir_dataframe(llm_output_lookup_dir_path)
 
-        return cls(
+        instance = cls(
             input_lookup_dir_path=input_lookup_dir_path,
             metadata_lookup_dir_path=metadata_lookup_dir_path,
             transcript_lookup_dir_path=transcript_lookup_dir_path,
@@ -103,10 +215,67 @@ class FileDatabase:
             metadata_dataframe=metadata_dataframe,
             transcript_dataframe=transcript_dataframe,
             llm_output_dataframe=llm_output_dataframe,
+            manifest=manifest,
+            search_index=search_index,
+            transcript_store=transcript_store,
+            job_ledger=job_ledger,
+            input_cache=input_cache,
+            metrics=metrics,
         )
+        return instance
+
+    def sync_search_index(self) -> SearchIndex:
+        # Index the artifacts that are not indexed yet. Files rewritten in place
+        # are reindexed through the write-through methods (with_*_paths).
+        # Called on the first index query rather than on open, so that opening
+        # the database does not read every artifact.
+        if self.search_index is None:
+            raise ValueError("No search index, use FileDatabase.from_paths")
+        known = self.search_index.indexed_paths()
+        self.search_index.index_inputs(self.input_dataframe)
+        for kind, df in (
+            ("metadata", self.metadata_dataframe),
+            ("transcript", self.transcript_dataframe),
+            ("summary", self.llm_output_dataframe),
+        ):
+            paths = [Path(p) for p in df["path"] if str(p) not in known]
+            self.search_index.index_paths(kind, paths)
+        return self.search_index
+
+    def compact_transcripts(self) -> int:
+        # Pack the successful transcripts into the columnar store. Incremental:
+        # transcripts already packed are skipped.
+        assert self.transcript_store is not None
+        paths = [Path(p) for p in self.transcript_dataframe["path"]]
+        return self.transcript_store.compact(paths)
+
+    def transcript_snippets_dataframe(self) -> pd.DataFrame:
+        # One row per snippet of the compacted transcripts (memory-mapped).
+        assert self.transcript_store is not None
+        return self.transcript_store.to_dataframe()
 
-    def search(self, df: pd.DataFrame, value: str) -> pd.DataFrame:
-        return search(df, value)
+    def search(
+        self, df: pd.DataFrame, value: str, *, ranked: bool = False
+    ) -> pd.DataFrame:
+        # Rows of df with a cell containing value (case insensitive substring).
+        # With ranked, rows whose video matches every word of value as a prefix
+        # in the search index instead (titles, descriptions, transcripts and
+        # summaries), best ranked video first. See search_with_index.
+        if not ranked:
+            return search(df, value)
+        return search_with_index(self.sync_search_index(), df, value)
+
+    def search_full_text(self, value: str, *, limit: int | None = 100) -> pd.DataFrame:
+        # Ranked hits over titles, descriptions, transcripts and summaries.
+        return self.sync_search_index().search(value, limit=limit)
+
+    def search_transcripts(
+        self, phrase: str, *, regex: bool = False, limit: int | None = 100
+    ) -> list[TranscriptHit]:
+        # Where, in the videos, a phrase is said. See TranscriptHit.video_url.
+        return self.sync_search_index().search_transcripts(
+            phrase, regex=regex, limit=limit
+        )
 
     def inputs_with_missing_metadata(self) -> pd.DataFrame:
         df = self.input_dataframe.drop(self.metadata_dataframe.index)
@@ -131,45 +300,330 @@ class FileDatabase:
         )
         return df
 
-    def fetch_missing_metadata(self, *, sleep_seconds: int = 2):
-        # Note: no retry mechanism implemented.
-        # If a fetch resulted in error, it will not be retried.
-        # For advertisements or videos unavailable, this is OK
-        # But for some other errors, it might be beneficial
-        # to retry a video.
+    def with_metadata_paths(self, paths: list[Path]) -> Self:
+        # Write-through: append the rows of freshly written metadata files,
+        # at O(new rows) cost instead of a full refresh.
+        new_df = metadata_paths_to_dataframe(paths).set_index("video_id")
+        if self.search_index is not None:
+            self.search_index.index_paths("metadata", paths)
+        return replace(
+            self,
+            metadata_dataframe=append_artifact_rows(self.metadata_dataframe, new_df),
+        )
+
+    def with_transcript_paths(self, paths: list[Path]) -> Self:
+        new_df = transcript_paths_to_dataframe(paths).set_index(
+            ["language_code", "source", "video_id"]
+        )
+        if self.search_index is not None:
+            self.search_index.index_paths("transcript", paths)
+        return replace(
+            self,
+            transcript_dataframe=append_artifact_rows(
+                self.transcript_dataframe, new_df
+            ),
+        )
+
+    def with_llm_output_paths(self, paths: list[Path]) -> Self:
+        if not paths:
+            return self
+        new_df = consolidated_to_output_dataframe(consolidate_output_paths(paths))
+        if self.search_index is not None:
+            self.search_index.index_paths("summary", paths)
+        return replace(
+            self,
+            llm_output_dataframe=append_artifact_rows(
+                self.llm_output_dataframe, new_df
+            ),
+        )
+
+    def fetch_missing_metadata(
+        self,
+        *,
+        requests_per_second: float = 0.5,
+        burst: int = 1,
+        max_workers: int = 4,
+        http_client: PooledSession | None = None,
+        archive_html: bool = False,
+    ) -> Self:
+        # The returned database already contains the newly written metadata.
+        # With archive_html, the fetched pages are kept (compressed) in the
+        # HTML archive, see reparse_metadata_from_archive.
+        # Requests are spread over a bounded worker pool. The token bucket
+        # caps the request rate, so workers only sleep when it is empty.
+        # With a job ledger, fetches that failed with a transient error (or
+        # were interrupted) are retried, until the max number of attempts.
+        # All the workers share the same pooled HTTP session, of their own: a
+        # given session is forked, not to share cookies and headers with the
+        # other stages.
+        http_client = http_client.fork() if http_client else default_http_client()
+        metrics = self.metrics or default_metrics()
         self.metadata_lookup_dir_path.mkdir(exist_ok=True, parents=True)
         missing_metadata = self.inputs_with_missing_metadata()
+        video_ids = missing_metadata.index
+        if self.job_ledger is not None:
+            video_ids = video_ids[
+                [
+                    self.job_ledger.should_run(JobKey(stage="metadata", video_id=v))
+                    for v in video_ids
+                ]
+            ]
         print("Start metadata fetching ")
         print(f"There is {len(self.input_dataframe)} inputs. ")
         print(f"There is {len(missing_metadata)} missing metadata files. ")
-        for idx, video_id in enumerate(missing_metadata.index, 1):
-            print(f"{idx}/{len(missing_metadata)}: {video_id}")
-            scrapper = YouTubeHtmlScrapper.from_video_id(video_id)
+        print(f"There is {len(video_ids)} metadata files to fetch. ")
+
+        def fetch(video_id: str) -> Path | None:
+            key = JobKey(stage="metadata", video_id=video_id)
+            if self.job_ledger is not None:
+                self.job_ledger.start(key)
+            with metrics.span("metadata_fetch", video_id=video_id) as span:
+                scrapper = YouTubeHtmlScrapper.from_video_id(
+                    video_id, http_client=http_client
+                )
+                if scrapper is None:
+                    span.status = "RequestException"
+                else:
+                    span.bytes = len(scrapper.html)
             if scrapper is None:
                 print(f"ERROR Failed to fetch metadata for {video_id}")
-            else:
-                fetch_one_metadata(self.metadata_lookup_dir_path, video_id, scrapper)
-
-            print(f"Sleep for {sleep_seconds} seconds...")
-            sleep(sleep_seconds)
-
-    def fetch_missing_transcripts(self, *, sleep_seconds: int = 2):
-        # Note: no retry mechanism implemented.
-        # If a fetch resulted in error, it will not be retried.
-        # For advertisements or videos unavailable, this is OK
-        # But for some other errors, it might be beneficial
-        # to retry a video.
+                if self.job_ledger is not None:
+                    self.job_ledger.fail(key, "RequestException")
+                return None
+            if archive_html:
+                self.html_archive.put(video_id, scrapper.html)
+            path = fetch_one_metadata(
+                self.metadata_lookup_dir_path,
+                video_id,
+                scrapper,
+                manifest=self.manifest,
+                metrics=metrics,
+            )
+            if self.job_ledger is not None:
+                self.job_ledger.record_outcome(key, MetadataPath.from_path(path).status)
+            return path
+
+        written_paths, _ = run_rate_limited(
+            video_ids,
+            fetch,
+            bucket=TokenBucket(rate=requests_per_second, burst=burst),
+            max_workers=max_workers,
+            label="metadata",
+            metrics=metrics,
+            is_success=lambda path: MetadataPath.from_path(path).status == "success",
+        )
+        print(http_client.report())
+        print(metrics.report())
+        metrics.flush()
+        return self.with_metadata_paths(written_paths)
+
+    @property
+    def html_archive(self) -> HtmlArchive:
+        # Next to the metadata: generated/html_archive
+        return HtmlArchive(root=self.metadata_lookup_dir_path.parent / "html_archive")
+
+    def reparse_metadata_from_archive(self, *, max_workers: int | None = None) -> Self:
+        # Rebuild the metadata of all the archived pages offline, over all the
+        # cores, e.g. after a fix of the scrapper. No page is fetched.
+        written_paths = reparse_archive(
+            self.html_archive, self.metadata_lookup_dir_path, max_workers=max_workers
+        )
+        if self.job_ledger is not None:
+            for path in written_paths:
+                parsed = MetadataPath.from_path(path)
+                self.job_ledger.record_outcome(
+                    JobKey(stage="metadata", video_id=parsed.video_id), parsed.status
+                )
+        if self.search_index is not None:
+            # Files rewritten in place must be reindexed explicitly.
+            self.search_index.forget_missing()
+            self.search_index.index_paths("metadata", written_paths)
+        return self.refresh()
+
+    def fetch_missing_transcripts(
+        self,
+        *,
+        requests_per_second: float = 0.5,
+        burst: int = 1,
+        max_workers: int = 4,
+        http_client: PooledSession | None = None,
+    ) -> Self:
+        # The returned database already contains the newly written transcripts.
+        # Same rate limiting as fetch_missing_metadata.
+        # With a job ledger, transcripts that failed with a transient error
+        # (e.g. RequestBlocked) are retried, until the max number of attempts.
+        # The error artifact is replaced by the result of the retry.
+        http_client = http_client.fork() if http_client else default_http_client()
+        metrics = self.metrics or default_metrics()
         self.transcript_lookup_dir_path.mkdir(exist_ok=True, parents=True)
         missing_transcripts = self.inputs_with_missing_transcripts()
+        video_ids = missing_transcripts.index
+        error_paths: dict[str, list[Path]] = {}
+        if self.job_ledger is not None:
+            errors = self.transcript_errors()
+            self.job_ledger.seed_failures(
+                "transcript", dict(zip(errors.index, errors["status"]))
+            )
+            retryable = self.job_ledger.retryable("transcript")["video_id"]
+            for video_id, path in errors["path"].items():
+                error_paths.setdefault(video_id, []).append(Path(path))
+            video_ids = video_ids[
+                [
+                    self.job_ledger.should_run(JobKey(stage="transcript", video_id=v))
+                    for v in video_ids
+                ]
+            ].union(self.input_dataframe.index.intersection(retryable), sort=False)
         print("Start transcripts fetching ")
         print(f"There is {len(self.input_dataframe)} inputs. ")
         print(f"There is {len(missing_transcripts)} missing transcripts files. ")
-        for idx, video_id in enumerate(missing_transcripts.index, 1):
-            print(f"{idx}/{len(missing_transcripts)}: {video_id}")
-            title = str(missing_transcripts.loc[video_id]["title"])
-            fetch_one_transcript(self.transcript_lookup_dir_path, video_id, title)
-            print(f"Sleep for {sleep_seconds} seconds...")
-            sleep(sleep_seconds)
+        print(f"There is {len(video_ids)} transcripts to fetch (including retries). ")
+        titles = self.input_dataframe["title"].astype(str)
+        # Caption tracks and the innertube API key saved by the metadata
+        # stage spare the transcript listing a fetch of the watch page.
+        metadata_paths = self.metadata_dataframe.query("status == 'success'")["path"]
+
+        def fetch(video_id: str) -> Path:
+            key = JobKey(stage="transcript", video_id=video_id)
+            if self.job_ledger is not None:
+                self.job_ledger.start(key)
+            path = fetch_one_transcript(
+                self.transcript_lookup_dir_path,
+                video_id,
+                titles.loc[video_id],
+                manifest=self.manifest,
+                http_client=http_client,
+                metrics=metrics,
+                video_metadata=(
+                    load_json(Path(metadata_paths.loc[video_id]))
+                    if video_id in metadata_paths.index
+                    else None
+                ),
+            )
+            if self.job_ledger is not None:
+                self.job_ledger.record_outcome(
+                    key, TranscriptPath.from_path(path).status
+                )
+            return path
+
+        written_paths, _ = run_rate_limited(
+            video_ids,
+            fetch,
+            bucket=TokenBucket(rate=requests_per_second, burst=burst),
+            max_workers=max_workers,
+            label="transcripts",
+            metrics=metrics,
+            is_success=lambda path: TranscriptPath.from_path(path).status == "success",
+        )
+        print(http_client.report())
+        print(metrics.report())
+        metrics.flush()
+        # Remove the error artifacts superseded by a retry.
+        stale_paths = [
+            stale_path
+            for path in written_paths
+            for stale_path in error_paths.get(
+                TranscriptPath.from_path(path).video_id, []
+            )
+            if stale_path != path
+        ]
+        return self.without_transcript_paths(stale_paths).with_transcript_paths(
+            written_paths
+        )
+
+    def fetch_missing_transcript_languages(
+        self,
+        keys: list[TranscriptKey],
+        *,
+        requests_per_second: float = 0.5,
+        burst: int = 1,
+        max_workers: int = 4,
+        http_client: PooledSession | None = None,
+    ) -> Self:
+        # Fetch, for every video, the requested (language_code, source)
+        # transcripts it does not have yet, e.g. to summarize in several
+        # languages. A video is listed once for all its missing transcripts,
+        # translations included: the rate limit applies per video.
+        # With a job ledger, transcripts that failed permanently, or too many
+        # times, are not requested again.
+        fetcher = TranscriptBatchFetcher(
+            http_client=http_client.fork() if http_client else default_http_client()
+        )
+        metrics = self.metrics or default_metrics()
+        existing = set(
+            self.transcript_dataframe.query("status == 'success'").index.tolist()
+        )
+        missing: dict[str, list[TranscriptKey]] = {}
+        for video_id in self.input_dataframe.index:
+            video_keys = [
+                key
+                for key in keys
+                if (*key, video_id) not in existing
+                and (
+                    self.job_ledger is None
+                    or self.job_ledger.should_run(transcript_job_key(video_id, key))
+                )
+            ]
+            if video_keys:
+                missing[video_id] = video_keys
+        print(f"There is {len(missing)} videos with missing transcripts for {keys}. ")
+        titles = self.input_dataframe["title"].astype(str)
+        metadata_paths = self.metadata_dataframe.query("status == 'success'")["path"]
+
+        def fetch(video_id: str) -> list[Path]:
+            return fetch_transcripts_of_video(
+                self.transcript_lookup_dir_path,
+                video_id,
+                titles.loc[video_id],
+                missing[video_id],
+                fetcher=fetcher,
+                manifest=self.manifest,
+                job_ledger=self.job_ledger,
+                metrics=metrics,
+                video_metadata=(
+                    load_json(Path(metadata_paths.loc[video_id]))
+                    if video_id in metadata_paths.index
+                    else None
+                ),
+            )
+
+        self.transcript_lookup_dir_path.mkdir(exist_ok=True, parents=True)
+        written_paths, _ = run_rate_limited(
+            list(missing),
+            fetch,
+            bucket=TokenBucket(rate=requests_per_second, burst=burst),
+            max_workers=max_workers,
+            label="transcripts",
+            metrics=metrics,
+            is_success=lambda paths: all(
+                TranscriptPath.from_path(path).status == "success" for path in paths
+            ),
+        )
+        print(fetcher.http_client.report())
+        print(metrics.report())
+        metrics.flush()
+        return self.with_transcript_paths(
+            [path for paths in written_paths for path in paths]
+        )
+
+    def transcript_errors(self) -> pd.DataFrame:
+        # Error artifacts, indexed by video id, with their status (error name).
+        return (
+            self.transcript_dataframe.query("status != 'success'")
+            .reset_index()
+            .set_index("video_id")
+        )
+
+    def without_transcript_paths(self, paths: list[Path]) -> Self:
+        # Delete artifacts from disk, then drop their rows.
+        if not paths:
+            return self
+        for path in paths:
+            path.unlink(missing_ok=True)
+            if self.manifest is not None:
+                self.manifest.forget("transcript", path)
+            print(f"[  OK] Removed superseded {path}")
+        df = self.transcript_dataframe
+        return replace(self, transcript_dataframe=df[~df["path"].isin(paths)])
 
     def find_missing_llm_outputs_candidates(
         self,
@@ -217,72 +671,186 @@ class FileDatabase:
             self.transcript_dataframe.index.droplevel("video_id")
             .unique()
             # Drop error-couples (for error, no transcript-related index values exist)
-            .drop(("_", "_"))
+            .drop(("_", "_"), errors="ignore")
         )
 
-    def fetch_missing_llm_outputs(self):
-        now = pd.Timestamp.now()
-
-        # TODO eschalk Make that configurable
-        prompts_path = Path("../resources/prompts/prompts.toml")
-        secrets_path = Path.home() / Path(".secrets/yt_summary_secrets.json")
-        api_key = retrieve_api_key(secrets_path=secrets_path)
-        proxy = OpenRouterAiProxy(api_key=api_key)
-        summarizer = AiSummarizer.instantiate(
-            proxy, dry_run=False, prompts_path=prompts_path, creation_time=now
-        )
-        print(summarizer)
-
+    def missing_llm_output_jobs(self) -> list[SummaryJob]:
         indexers = self.get_transcript_language_and_source_indexer_couples()
         dfs = self.find_missing_llm_outputs_candidates(
             indexers, keep_successful_only=True
         )
+        jobs: list[SummaryJob] = []
         for key in dfs:
             language_code, source = key
-            print(language_code, source)
-            df = dfs[key]
-
-            for idx, video_id in enumerate(df.index, 1):
-                row_model = OutputCandidateRow.from_series(df.loc[video_id])
-                print(f"{idx:05d}/{len(df):05d}", video_id, row_model.title)
-                print(f"{row_model.metadata_path=}")
-                print(f"{row_model.transcript_path=}")
-                video = VideoModel.from_path(Path(row_model.metadata_path))
-                print(video)
-                summarizer.summarize_with_ai(
-                    video,
-                    Path(row_model.transcript_path),
-                    self.llm_output_lookup_dir_path,
-                    language_code,
-                    None,
+            print(language_code, source, len(dfs[key]))
+            for _, row in dfs[key].iterrows():
+                row_model = OutputCandidateRow.from_series(row)
+                jobs.append(
+                    SummaryJob(
+                        video=VideoModel.from_path(Path(row_model.metadata_path)),
+                        transcript_file_path=Path(row_model.transcript_path),
+                        llm_output_dir_path=self.llm_output_lookup_dir_path,
+                        prompt_language_code=language_code,
+                    )
                 )
+        return jobs
 
+    def plan_missing_llm_outputs(
+        self, *, chunk_tokens: int | None = None
+    ) -> pd.DataFrame:
+        # Prompt tokens per video that fetch_missing_llm_outputs would send.
+        # Nothing is sent, so no API key is needed.
+        summarizer = AiSummarizer.instantiate(
+            OpenRouterAiProxy(api_key=""),
+            dry_run=True,
+            prompts_path=Path("../resources/prompts/prompts.toml"),
+            transcript_store=self.transcript_store,
+            chunk_tokens=chunk_tokens,
+        )
+        return summarizer.plan(self.missing_llm_output_jobs())
 
-def inputs_dir_to_dataframe(input_lookup_dir_path: Path) -> pd.DataFrame:
-    all_json_videos = consolidate_input_json(input_lookup_dir_path)
-    all_json_df = pd.DataFrame.from_dict(all_json_videos.values())
+    @cached_property
+    def usage_ledger(self) -> UsageLedger:
+        # Next to the LLM outputs: generated/llm_usage.jsonl
+        return UsageLedger(
+            path=self.llm_output_lookup_dir_path.parent / "llm_usage.jsonl"
+        )
+
+    def fetch_missing_llm_outputs(
+        self,
+        *,
+        max_concurrency: int = 4,
+        use_response_cache: bool = False,
+        bypass_cache: bool = False,
+        stream: bool = False,
+        max_output_chars: int | None = None,
+        chunk_tokens: int | None = None,
+        http_client: PooledSession | None = None,
+        api_key: str | None = None,
+        prompts_path: Path = Path("../resources/prompts/prompts.toml"),
+    ) -> Self:
+        # The returned database already contains the newly written LLM outputs.
+        # Up to max_concurrency requests are in flight. The actual concurrency
+        # adapts to the rate limits reported by OpenRouter.
+        # With use_response_cache, identical requests (same model and prompts)
+        # are answered from generated/llm_response_cache, e.g. when resuming
+        # after a crash. bypass_cache forces a fresh sample.
+        # With stream, summaries are written as they are generated, and cut
+        # off after max_output_chars.
+        # With chunk_tokens, long transcripts are summarized chunk by chunk
+        # (in parallel), then the partial summaries are merged.
+        # Without api_key, the key is read from the secrets file.
+        now = pd.Timestamp.now()
+
+        http_client = http_client.fork() if http_client else default_http_client()
+        metrics = self.metrics or default_metrics()
+        if api_key is None:
+            secrets_path = Path.home() / Path(".secrets/yt_summary_secrets.json")
+            api_key = retrieve_api_key(secrets_path=secrets_path)
+        proxy = OpenRouterAiProxy(
+            api_key=api_key,
+            http_client=http_client,
+            response_cache=(
+                ResponseCache(
+                    root=self.llm_output_lookup_dir_path.parent / "llm_response_cache"
+                )
+                if use_response_cache
+                else None
+            ),
+            usage_ledger=self.usage_ledger,
+        )
+        key_info = proxy.check_if_i_can_still_use_the_service()
+        print(key_info)
+        # Start at the limit the key allows, rather than ramping up from 1.
+        limit = max_concurrency_from_key_info(key_info, max_concurrency)
+        proxy = replace(
+            proxy,
+            limiter=AdaptiveConcurrencyLimiter(max_limit=limit, initial_limit=limit),
+        )
+        summarizer = AiSummarizer.instantiate(
+            proxy,
+            dry_run=False,
+            prompts_path=prompts_path,
+            creation_time=now,
+            manifest=self.manifest,
+            transcript_store=self.transcript_store,
+            job_ledger=self.job_ledger,
+            bypass_cache=bypass_cache,
+            stream=stream,
+            max_output_chars=max_output_chars,
+            chunk_tokens=chunk_tokens,
+            metrics=metrics,
+        )
+        print(summarizer)
+
+        written = summarizer.summarize_many(self.missing_llm_output_jobs())
+        print(http_client.report())
+        print(metrics.report())
+        metrics.flush()
+        return self.with_llm_output_paths([paths["md"] for paths in written])
+
+
+def inputs_dir_to_dataframe(
+    input_lookup_dir_path: Path, *, input_cache: InputCache | None = None
+) -> pd.DataFrame:
+    def parse(namespace: str, path: Path, parse_one) -> pd.DataFrame:
+        if input_cache is None:
+            return parse_one(path)
+        return input_cache.frame(namespace, path, parse_one)
+
+    json_df_list = [
+        parse("input_json", path, input_json_to_dataframe)
+        for path in sorted(input_lookup_dir_path.glob("*.json"))
+    ]
+    all_json_df = merge_input_json_dataframes(json_df_list)
 
     watch_history_json_list = input_lookup_dir_path / "watch_history_json_list.txt"
     assert watch_history_json_list.is_file()
     paths = list(
         Path(el) for el in watch_history_json_list.read_text().strip().split("\n")
     )
-    df_list: list[pd.DataFrame] = []
-    for path in paths:
-        analyzer = YouTubeHistoryAnalyzer.from_path(path, consolidate=True)
-        # Reverse index so top = recent ; bottom = ancient
-        normalized_df = analyzer.df[["video_id", "title"]].drop_duplicates("video_id")[
-            ::-1
-        ]
-        df_list.append(normalized_df)
+    df_list = [
+        parse("watch_history", path, watch_history_to_dataframe) for path in paths
+    ]
     histories_concat_df = (
         pd.concat([all_json_df, *df_list])
         .drop_duplicates(subset="video_id")
         .set_index("video_id")
     )
+    if input_cache is not None:
+        print(f"Input cache: {input_cache.stats.report()}")
     return histories_concat_df
 
 
+def watch_history_to_dataframe(path: Path) -> pd.DataFrame:
+    analyzer = YouTubeHistoryAnalyzer.from_path(
+        path, consolidate=True, columns=HISTORY_COLUMNS
+    )
+    # Reverse index so top = recent ; bottom = ancient
+    normalized_df = analyzer.df[["video_id", "title"]].drop_duplicates("video_id")[::-1]
+    return normalized_df.reset_index(drop=True)
+
+
+def input_json_to_dataframe(path: Path) -> pd.DataFrame:
+    videos = load_json(path)
+    for video in videos:
+        video["video_id"] = extract_video_id(video["href"])
+        del video["href"]
+    return pd.DataFrame.from_records(videos)
+
+
+def merge_input_json_dataframes(df_list: list[pd.DataFrame]) -> pd.DataFrame:
+    # Same as consolidate_input_json: a video keeps the position of its first
+    # occurrence, and the values of its last one.
+    if not df_list:
+        return pd.DataFrame()
+    df = pd.concat(df_list, ignore_index=True)
+    first_positions = df.drop_duplicates("video_id").index
+    last_rows = df.drop_duplicates("video_id", keep="last").set_index("video_id")
+    merged = last_rows.loc[df.loc[first_positions, "video_id"]].reset_index()
+    return merged[df.columns]
+
+
 def llm_outputs_dir_dataframe(output_lookup_dir_path: Path) -> pd.DataFrame:
     consolidated = consolidate_output_files(output_lookup_dir_path)
     df = consolidated_to_output_dataframe(consolidated)
@@ -319,27 +887,72 @@ def search(df: pd.DataFrame, value: str) -> pd.DataFrame:
     return filtered_df
 
 
+def search_with_index(
+    search_index: SearchIndex, df: pd.DataFrame, value: str
+) -> pd.DataFrame:
+    # Keep the rows of df whose video matches, best ranked video first. Unlike
+    # search, every word must match as a prefix of a word of the documents.
+    hits = search_index.search(value, limit=None)
+    best_rank = hits.groupby("video_id")["rank"].min()
+    video_ids = (
+        df.index.get_level_values("video_id")
+        if "video_id" in df.index.names
+        else df["video_id"]
+    )
+    ranks = pd.Series(video_ids, index=df.index).map(best_rank)
+    return df.loc[ranks.notna().to_numpy()].iloc[
+        ranks.dropna().argsort(kind="stable").to_numpy()
+    ]
+
+
 def consolidate_output_files(output_lookup_dir_path: Path) -> dict[str, list[Path]]:
     all_summary_paths = sorted(output_lookup_dir_path.glob("*/*.md"))
+    return consolidate_output_paths(all_summary_paths)
+
+
+def consolidate_output_paths(all_summary_paths: list[Path]) -> dict[str, list[Path]]:
     all_summary_dict: dict[str, list[Path]] = {}
     for path in all_summary_paths:
         all_summary_dict.setdefault(path.parent.stem, []).append(path)
     return all_summary_dict
 
 
+METADATA_PATH_COLUMNS = tuple(MetadataPath.__annotations__)
+TRANSCRIPT_PATH_COLUMNS = tuple(TranscriptPath.__annotations__)
+AI_SUMMARY_PATH_COLUMNS = ("prompt_family", *TRANSCRIPT_PATH_COLUMNS)
+
+
+def split_artifact_filenames(
+    paths: list[Path], columns: tuple[str, ...]
+) -> pd.DataFrame:
+    """
+    Parse the dot-separated filenames of artifacts into one column per field.
+
+    Batch equivalent of the ``from_path`` parsers (MetadataPath,
+    TranscriptPath, AiSummaryPath), followed by a ``path`` column: the
+    filenames are split at once, no dataclass is built per file.
+    """
+    if not paths:
+        return pd.DataFrame(columns=[*columns, "path"])
+    names = pd.Series([path.name for path in paths], dtype=object)
+    df = names.str.split(".", expand=True)
+    if df.shape[1] != len(columns) or df.isna().to_numpy().any():
+        malformed = names[names.str.count(r"\.") != len(columns) - 1]
+        raise ValueError(f"Unexpected artifact filename: {malformed.iloc[0]}")
+    df.columns = list(columns)
+    df["path"] = paths
+    return df
+
+
 def consolidated_to_output_dataframe(
     consolidated: dict[str, list[Path]],
 ) -> pd.DataFrame:
-    df = pd.DataFrame(
-        [
-            {
-                "timestamp": timestamp,
-                **AiSummaryPath.from_path(path).asdict(),
-                "path": path,
-            }
-            for timestamp, paths in consolidated.items()
-            for path in paths
-        ]
+    paths = [path for paths in consolidated.values() for path in paths]
+    df = split_artifact_filenames(paths, AI_SUMMARY_PATH_COLUMNS)
+    df.insert(
+        0,
+        "timestamp",
+        [timestamp for timestamp, paths in consolidated.items() for _ in paths],
     )
     df["timestamp"] = pd.to_datetime(df["timestamp"], format="%Y-%m-%dT%H-%M-%S-%f")
     df = df.set_index(
@@ -350,49 +963,77 @@ def consolidated_to_output_dataframe(
 
 
 def metadata_dir_to_dataframe(metadata_lookup_dir_path: Path) -> pd.DataFrame:
-    df = pd.DataFrame(
-        [
-            {**MetadataPath.from_path(path).asdict(), "path": path}
-            for path in sorted(metadata_lookup_dir_path.glob("*.json"))
-        ]
+    # Both layouts, see ArtifactDirectory.
+    df = metadata_paths_to_dataframe(
+        ArtifactDirectory.metadata(metadata_lookup_dir_path).all_paths()
     )
-    if df.empty:
-        # Set expected empty column
-        df = pd.DataFrame(columns=MetadataPath.__annotations__.keys())
     return df.set_index("video_id")
 
 
+def metadata_paths_to_dataframe(paths: list[Path]) -> pd.DataFrame:
+    return split_artifact_filenames(paths, METADATA_PATH_COLUMNS)
+
+
 def transcripts_dir_to_dataframe(transcript_lookup_dir_path: Path) -> pd.DataFrame:
-    df = pd.DataFrame(
-        [
-            {**TranscriptPath.from_path(path).asdict(), "path": path}
-            for path in sorted(transcript_lookup_dir_path.glob("*.json"))
-        ]
+    df = transcript_paths_to_dataframe(
+        ArtifactDirectory.transcripts(transcript_lookup_dir_path).all_paths()
     )
-    if df.empty:
-        # Set expected empty column
-        df = pd.DataFrame(columns=TranscriptPath.__annotations__.keys())
     return df.set_index(["language_code", "source", "video_id"])
 
 
+def transcript_paths_to_dataframe(paths: list[Path]) -> pd.DataFrame:
+    return split_artifact_filenames(paths, TRANSCRIPT_PATH_COLUMNS)
+
+
+def append_artifact_rows(df: pd.DataFrame, new_df: pd.DataFrame) -> pd.DataFrame:
+    if new_df.empty:
+        return df
+    if df.empty:
+        return new_df
+    # A rewritten file (same path) replaces its previous row.
+    df = df[~df["path"].isin(new_df["path"])]
+    return pd.concat([df, new_df])
+
+
 def fetch_one_metadata(
-    metadata_dir_path: Path, video_id: str, scrapper: YouTubeHtmlScrapper
+    metadata_dir_path: Path,
+    video_id: str,
+    scrapper: YouTubeHtmlScrapper,
+    *,
+    manifest: FileManifest | None = None,
+    metrics: MetricsRegistry | None = None,
 ) -> Path:
-    metadata_parsed = MetadataPath.from_scrapper(scrapper, "json")
+    metrics = metrics or default_metrics()
+    with metrics.span("metadata_parse", video_id=video_id) as span:
+        metadata_parsed = MetadataPath.from_scrapper(scrapper, "json")
+        span.status = metadata_parsed.status
+        content = None
+        if metadata_parsed.status == "success":
+            content = scrapper.to_json()
+        elif metadata_parsed.status == "likely-video-unavailable":
+            message = "ERROR Cannot extract description, video likely unavailable"
+            print(message)
+            content = json.dumps({"error": message})
+        elif metadata_parsed.status == "likely-an-advertisement":
+            message = (
+                "ERROR JSON cannot be parsed (Regexp can). Empirically, likely an ad."
+            )
+            print(message)
+            content = json.dumps({"error": message})
     output_filename = metadata_parsed.to_filename()
-    output_file_path = metadata_dir_path / output_filename
-    if metadata_parsed.status == "success":
-        output_file_path.write_text(scrapper.to_json())
-    elif metadata_parsed.status == "likely-video-unavailable":
-        message = "ERROR Cannot extract description, video likely unavailable"
-        print(message)
-        output_file_path.write_text(json.dumps({"error": message}))
-    elif metadata_parsed.status == "likely-an-advertisement":
-        message = "ERROR JSON cannot be parsed (Regexp can). Empirically, likely an ad."
-        print(message)
-        output_file_path.write_text(json.dumps({"error": message}))
+    output_file_path = (
+        ArtifactDirectory.metadata(metadata_dir_path).directory(video_id)
+        / output_filename
+    )
+    if content is not None:
+        output_file_path.parent.mkdir(exist_ok=True, parents=True)
+        with metrics.span("metadata_write", video_id=video_id) as span:
+            output_file_path.write_text(content)
+            span.bytes = len(content.encode())
     print(f"OK Written {video_id} metadata to {output_file_path} ")
     print(f"status ({metadata_parsed.status})")
+    if manifest is not None:
+        manifest.record("metadata", output_file_path)
     return output_file_path
 
 
@@ -402,14 +1043,109 @@ def fetch_one_transcript(
     title: str,
     *,
     preferred_languages: tuple[str, ...] = ("fr", "en"),
+    manifest: FileManifest | None = None,
+    http_client: PooledSession | None = None,
+    video_metadata: dict | None = None,
+    metrics: MetricsRegistry | None = None,
 ) -> Path:
+    metrics = metrics or default_metrics()
     video_url = render_video_url(video_id)
-    result = get_youtube_transcript(video_url, preferred_languages=preferred_languages)
+    with metrics.span("transcript_fetch", video_id=video_id) as span:
+        result = get_youtube_transcript(
+            video_url,
+            preferred_languages=preferred_languages,
+            http_client=http_client,
+            video_metadata=video_metadata,
+        )
+        span.status = transcript_result_status(result)
+    return write_transcript_result(
+        transcript_dir_path, result, title, manifest=manifest, metrics=metrics
+    )
+
+
+def transcript_job_key(video_id: str, key: TranscriptKey) -> JobKey:
+    # The language code carries the source too (e.g. "fr.generated"): the
+    # transcript of a video in its default language is keyed without one.
+    return JobKey(stage="transcript", video_id=video_id, language_code=".".join(key))
+
+
+def transcript_result_status(
+    result: TranscriptSuccessResult | TranscriptErrorResult,
+) -> str:
+    if isinstance(result, TranscriptErrorResult):
+        return type(result.error).__name__
+    return "success"
+
+
+def fetch_transcripts_of_video(
+    transcript_dir_path: Path,
+    video_id: str,
+    title: str,
+    keys: list[TranscriptKey],
+    *,
+    fetcher: TranscriptBatchFetcher,
+    manifest: FileManifest | None = None,
+    job_ledger: JobLedger | None = None,
+    video_metadata: dict | None = None,
+    metrics: MetricsRegistry | None = None,
+) -> list[Path]:
+    # Write every transcript found. An error artifact is only written when
+    # none of the requested transcripts could be fetched.
+    metrics = metrics or default_metrics()
+    if job_ledger is not None:
+        for key in keys:
+            job_ledger.start(transcript_job_key(video_id, key))
+    with metrics.span("transcript_fetch", video_id=video_id) as span:
+        results = fetcher.fetch_many(video_id, keys, video_metadata=video_metadata)
+        statuses = {transcript_result_status(result) for result in results.values()}
+        span.status = "success" if "success" in statuses else min(statuses)
+        span.attributes["transcripts"] = len(results)
+    successes = [
+        result
+        for result in results.values()
+        if isinstance(result, TranscriptSuccessResult)
+    ]
+    written_paths = [
+        write_transcript_result(
+            transcript_dir_path, result, title, manifest=manifest, metrics=metrics
+        )
+        for result in successes or [next(iter(results.values()))]
+    ]
+    if job_ledger is not None:
+        for key, result in results.items():
+            job_ledger.record_outcome(
+                transcript_job_key(video_id, key), transcript_result_status(result)
+            )
+    return written_paths
+
+
+def write_transcript_result(
+    transcript_dir_path: Path,
+    result: TranscriptSuccessResult | TranscriptErrorResult,
+    title: str,
+    *,
+    manifest: FileManifest | None = None,
+    metrics: MetricsRegistry | None = None,
+) -> Path:
+    metrics = metrics or default_metrics()
     title_slug = render_title_slug(title)
     transcript_parsed_name = result.generate_transcript_parsed_name(title_slug)
-    output_file_path = transcript_dir_path / transcript_parsed_name.to_filename()
+    output_file_path = (
+        ArtifactDirectory.transcripts(transcript_dir_path).directory(
+            transcript_parsed_name.video_id
+        )
+        / transcript_parsed_name.to_filename()
+    )
     output_file_path.parent.mkdir(exist_ok=True, parents=True)
-    output_file_path.write_text(result.to_json())
+    with metrics.span(
+        "transcript_write", video_id=transcript_parsed_name.video_id
+    ) as span:
+        content = result.to_json()
+        output_file_path.write_text(content)
+        span.status = transcript_parsed_name.status
+        span.bytes = len(content.encode())
     print(f"[  OK] Written transcript file for [[{title}]] into {output_file_path}")
     print(f"status ({transcript_parsed_name.status})")
+    if manifest is not None:
+        manifest.record("transcript", output_file_path)
     return output_file_path
@@ -4,7 +4,10 @@ from pathlib import Path
 import pandas as pd
 
 from ai_xp.database import FileDatabase
+from ai_xp.job_ledger import JobKey, JobLedger, classify_error
+from ai_xp.layout import ArtifactDirectory
 from ai_xp.transcript import (
+    TranscriptPath,
     TranscriptSuccessResult,
     get_youtube_transcript,
 )
@@ -20,10 +23,8 @@ def main():
     dry_run = False
     with_ai_summary = False
     # with_ai_summary = True
-    skip = (
-        0  # argument to manually retrigger a failed run and restore cursor in the list.
-    )
-    print(f"{skip=}")
+    # No cursor to restore by hand: the job ledger tells which videos are done,
+    # failed for good, or must be retried after a transient error.
     slug_whitelist = []
 
     now = pd.Timestamp.now()
@@ -36,21 +37,29 @@ def main():
         llm_output_dir_path.mkdir(exist_ok=True, parents=True)
 
     inputs_lookup_dir_path = Path("inputs").resolve()
-    outputs_lookup_dir_path = Path("generated/llm_output").resolve()
-    db = FileDatabase.from_paths(inputs_lookup_dir_path, outputs_lookup_dir_path)
-    videos_to_summarize = db.inputs_with_missing_outputs()
+    root_database_path = Path("generated").resolve()
+    db = FileDatabase.from_paths(inputs_lookup_dir_path, root_database_path)
+    assert db.job_ledger is not None
+    ledger = db.job_ledger
+    # Videos without a transcript, and videos whose transcript failed with a
+    # transient error: their error artifact is replaced by the retry.
+    errors = db.transcript_errors()
+    ledger.seed_failures("transcript", dict(zip(errors.index, errors["status"])))
+    retryable = ledger.retryable("transcript")["video_id"]
+    videos_to_summarize = pd.concat(
+        [
+            db.inputs_with_missing_transcripts(),
+            db.input_dataframe.loc[db.input_dataframe.index.intersection(retryable)],
+        ]
+    )
+    videos_to_summarize = videos_to_summarize[~videos_to_summarize.index.duplicated()]
 
-    for idx, (_, video_to_summarize) in enumerate(
-        videos_to_summarize.reset_index().iterrows(), 1
+    for idx, (video_id, video_to_summarize) in enumerate(
+        videos_to_summarize.iterrows(), 1
     ):
-        if skip > idx:
-            continue
-
-        # TODO eschalk read from metadata_output if missing?
         title = str(video_to_summarize["title"])
-        href = str(video_to_summarize["href"])
-        video_id = str(video_to_summarize["video_id"])
-        timestamp = str(video_to_summarize["timestamp"])
+        video_id = str(video_id)
+        href = render_video_url(video_id)
 
         title_slug = render_title_slug(title)
 
@@ -58,25 +67,17 @@ def main():
             print("Continue because not in whitelist")
             continue
 
-        exc_name = videos_to_summarize.loc[video_id]["exc_name"]
-        if is_unrecoverable_error(exc_name):
-            print(
-                f"[SKIP] {href} Continue because latest transcript query resulted in {exc_name} error."
-            )
+        key = JobKey(stage="transcript", video_id=video_id)
+        if not ledger.should_run(key):
+            state, attempts = ledger.state(key)
+            print(f"[SKIP] {href} Continue because job is {state} ({attempts=}).")
             continue
 
-        # transcript_output_file_path = (
-        #     transcript_output_dir_path / title_slug
-        # ).with_suffix(f".{video_id}.txt")
-        # llm_output_file_path = (llm_output_dir_path / title_slug).with_suffix(
-        #     f".{video_id}.md"
-        # )
-
         print(f"Handling {idx}/{len(videos_to_summarize)} [[{title}]]")
         if dry_run:
             print("Skip because dry run")
         else:
-            print(f"Fetching transcript for video: {href} (output date: {timestamp})")
+            print(f"Fetching transcript for video: {href}")
             handle_video(
                 title,
                 video_id,
@@ -84,6 +85,7 @@ def main():
                 llm_output_dir_path,
                 with_ai_summary,
                 now,
+                ledger=ledger,
             )
 
 
@@ -94,21 +96,34 @@ def handle_video(
     llm_output_dir_path: Path,
     with_ai_summary: bool,
     now: pd.Timestamp,
+    *,
+    ledger: JobLedger | None = None,
 ) -> None:
     video_url = render_video_url(video_id)
     title_slug = render_title_slug(title)
-    transcript_output_file_paths = sorted(
-        transcript_output_dir_path.glob(f"*{video_id}*")
-    )
-
-    if not transcript_output_file_paths:
+    # Only the shard of the video is listed, see ArtifactDirectory.
+    transcript_directory = ArtifactDirectory.transcripts(transcript_output_dir_path)
+    transcript_output_file_paths = transcript_directory.paths(video_id)
+    error_paths = [
+        path
+        for path in transcript_output_file_paths
+        if TranscriptPath.from_path(path).status != "success"
+    ]
+    key = JobKey(stage="transcript", video_id=video_id)
+    # An error artifact is replaced when the ledger says to retry the video.
+    has_success = len(error_paths) < len(transcript_output_file_paths)
+    retry = bool(error_paths) and ledger is not None and ledger.should_run(key)
+
+    if not has_success and (not error_paths or retry):
+        if ledger is not None:
+            ledger.start(key)
         result = get_youtube_transcript(video_url, preferred_languages=("fr", "en"))
+        transcript_output_file_path = (
+            transcript_directory.directory(video_id)
+            / result.generate_transcript_parsed_name(title_slug).to_filename()
+        )
+        transcript_output_file_path.parent.mkdir(exist_ok=True, parents=True)
         if isinstance(result, TranscriptSuccessResult):
-            transcript_output_file_path = (
-                transcript_output_dir_path
-                / result.generate_transcript_parsed_name(title_slug).to_filename()
-            )
-            transcript_output_file_path.parent.mkdir(exist_ok=True, parents=True)
             additional_metadata = {"creation_date": now.isoformat()}
             transcript_output_file_path.write_text(
                 json.dumps(
@@ -119,34 +134,38 @@ def handle_video(
                     indent=4,
                 )
             )
+        else:
+            transcript_output_file_path.write_text(result.to_json())
+        for error_path in error_paths:
+            if error_path != transcript_output_file_path:
+                error_path.unlink(missing_ok=True)
+                print(f"[  OK] Removed superseded {error_path}")
+
+        if isinstance(result, TranscriptSuccessResult):
             print(
                 f"[  OK] Written summary for [[{title}]] into {transcript_output_file_path}"
             )
+            if ledger is not None:
+                ledger.succeed(key)
             transcript_output_file_paths = [transcript_output_file_path]
         else:
-            exc_name = type(result.error).__name__
-            summary = f"<<<ERROR>>>: {exc_name}\n{str(result.error)}"
-            error_output_file_path = (
-                transcript_output_dir_path
-                / result.generate_transcript_filename(title_slug)
-            )
-            error_output_file_path.write_text(summary)
-            print(f"[ NOK] Written [[{title}]] into {error_output_file_path}")
+            print(f"[ NOK] Written [[{title}]] into {transcript_output_file_path}")
+            if ledger is not None:
+                ledger.fail(key, type(result.error).__name__)
             return
+    elif not has_success:
+        return
 
-    transcript_output_file_path = transcript_output_file_paths[0]
+    transcript_output_file_path = next(
+        path for path in transcript_output_file_paths if path not in error_paths
+    )
     if with_ai_summary:
         raise NotImplementedError("Check database.py")
 
 
 def is_unrecoverable_error(exc_name: str) -> bool:
-    errnames = ["TranscriptsDisabled", "NoTranscriptFound"]
-
-    # TODO eschalk NoTranscriptFound can maybe fixed by improving the transcript lang filtering.
-    for errname in errnames:
-        if exc_name == errname:
-            return True
-    return False
+    # See job_ledger.PERMANENT_ERRORS for the classification.
+    return classify_error(exc_name) == "permanent"
 
 
 if __name__ == "__main__":
@@ -0,0 +1,438 @@
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Self
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+from ai_xp.rate_limit import TokenBucket
+from ai_xp.scrapper import PLAYER_RESPONSE_MARKER, TITLE_PATTERN
+
+YOUTUBE_BASE_URL = "https://www.youtube.com"
+OPENROUTER_BASE_URL = "https://openrouter.ai"
+FAKE_API_KEY = "fake-innertube-api-key"
+
+WORDS = (
+    "alors donc vidéo science histoire question réponse exemple important "
+    "regarder comprendre expliquer simple monde temps chose idée travail"
+).split()
+
+
+@dataclass(kw_only=True)
+class FakeBehaviour:
+    """Latency, errors and rate limit of one of the faked services."""
+
+    latency_seconds: float = 0.0
+    latency_jitter_seconds: float = 0.0
+    # Share of the requests answered with a server error (5xx).
+    error_rate: float = 0.0
+    # Above this rate, requests are answered with 429 (too many requests).
+    requests_per_second: float | None = None
+    burst: int = 1
+    retry_after_seconds: int = 1
+    bucket: TokenBucket | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.requests_per_second is not None:
+            self.bucket = TokenBucket(rate=self.requests_per_second, burst=self.burst)
+
+    def wait(self, rng: random.Random):
+        latency = self.latency_seconds + rng.uniform(0, self.latency_jitter_seconds)
+        if latency > 0:
+            time.sleep(latency)
+
+    def is_rate_limited(self) -> bool:
+        return self.bucket is not None and not self.bucket.try_acquire()
+
+
+@dataclass(kw_only=True)
+class FakeServerConfig:
+    youtube: FakeBehaviour = field(default_factory=FakeBehaviour)
+    openrouter: FakeBehaviour = field(default_factory=FakeBehaviour)
+    # Watch pages are built from these examples, the video id picks one.
+    examples_dir: Path = Path("resources/examples")
+    snippets_per_transcript: int = 50
+    completion_chars: int = 800
+    # Delay between two streamed deltas of a completion.
+    stream_delta_seconds: float = 0.0
+    # Share of the videos without transcripts, and of unavailable videos.
+    transcripts_disabled_rate: float = 0.1
+    unavailable_rate: float = 0.02
+    seed: int = 0
+
+
+def video_fraction(video_id: str) -> float:
+    # Stable per video: the same video always gets the same fate.
+    digest = hashlib.sha256(video_id.encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64
+
+
+def render_words(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def render_player_response(config: FakeServerConfig, video_id: str) -> dict:
+    # Same player response in the watch page and from the innertube API.
+    fraction = video_fraction(video_id)
+    if fraction < config.unavailable_rate:
+        playability = {"status": "ERROR", "reason": "This video is unavailable"}
+        return {"playabilityStatus": playability}
+    rng = random.Random(f"{config.seed}:{video_id}")
+    response: dict = {
+        "playabilityStatus": {"status": "OK"},
+        "videoDetails": {
+            "videoId": video_id,
+            "title": render_words(rng, 6).capitalize(),
+            "lengthSeconds": str(4 * config.snippets_per_transcript),
+            "channelId": "UCfake",
+            "shortDescription": render_words(rng, 40),
+            "viewCount": str(rng.randrange(100, 10**6)),
+            "author": "Fake channel",
+        },
+    }
+    if fraction < config.unavailable_rate + config.transcripts_disabled_rate:
+        return response
+    base_url = f"{YOUTUBE_BASE_URL}/api/timedtext?v={video_id}&lang=fr"
+    response["captions"] = {
+        "playerCaptionsTracklistRenderer": {
+            "captionTracks": [
+                {
+                    "baseUrl": f"{base_url}&kind=asr",
+                    "name": {"runs": [{"text": "French (auto-generated)"}]},
+                    "languageCode": "fr",
+                    "kind": "asr",
+                    "isTranslatable": True,
+                }
+            ],
+            "translationLanguages": [
+                {"languageCode": code, "languageName": {"runs": [{"text": name}]}}
+                for code, name in (("en", "English"), ("de", "German"))
+            ],
+        }
+    }
+    return response
+
+
+def render_watch_page(template: str, player_response: dict) -> str:
+    """
+    Watch page of a fake video, from one of the example pages.
+
+    The examples are reformatted (unquoted keys) and their API key is
+    redacted: the title is replaced, and a player response and an API key
+    in the format of the real pages are inserted before the original ones.
+    """
+    title = player_response.get("videoDetails", {}).get("title", "")
+    page = TITLE_PATTERN.sub(
+        f"<title>{escape(title)} - YouTube</title>", template, count=1
+    )
+    scripts = (
+        f"<script>{PLAYER_RESPONSE_MARKER}{json.dumps(player_response)};</script>"
+        f'<script>ytcfg.set({{"INNERTUBE_API_KEY": "{FAKE_API_KEY}"}});</script>'
+    )
+    marker_index = page.find(PLAYER_RESPONSE_MARKER)
+    insert_at = page.rfind("<script", 0, marker_index) if marker_index != -1 else -1
+    if insert_at == -1:
+        insert_at = page.find("<body")
+    return page[:insert_at] + scripts + page[insert_at:]
+
+
+class FakeRequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive, like the real services: the pooled session reuses connections.
+    protocol_version = "HTTP/1.1"
+    server: "FakeHttpServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def config(self) -> FakeServerConfig:
+        return self.server.fake.config
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str):
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        body = b""
+        if method == "POST":
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        routes = {
+            ("GET", "/watch"): ("youtube", self._watch_page),
+            ("POST", "/youtubei/v1/player"): ("youtube", self._player),
+            ("GET", "/api/timedtext"): ("youtube", self._timedtext),
+            ("POST", "/api/v1/chat/completions"): ("openrouter", self._completions),
+            ("GET", "/api/v1/auth/key"): ("openrouter", self._key_info),
+        }
+        if (method, url.path) not in routes:
+            self._send(404, b"Not found", "text/plain")
+            self.server.fake.count(url.path, 404)
+            return
+        service, handler = routes[(method, url.path)]
+        behaviour = getattr(self.config, service)
+        rng = random.Random()
+        behaviour.wait(rng)
+
+        if behaviour.is_rate_limited():
+            self._send_rate_limited(service, behaviour)
+            status = 429
+        elif rng.random() < behaviour.error_rate:
+            self._send_error(service)
+            status = 503 if service == "youtube" else 502
+        else:
+            status = handler(query, body)
+        self.server.fake.count(url.path, status)
+
+    def _send(
+        self,
+        status: int,
+        content: bytes,
+        content_type: str,
+        headers: dict[str, str] | None = None,
+    ):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _send_json(self, status: int, obj: dict, headers: dict[str, str] | None = None):
+        content = json.dumps(obj, ensure_ascii=False).encode()
+        self._send(status, content, "application/json", headers)
+
+    def _send_rate_limited(self, service: str, behaviour: FakeBehaviour):
+        retry_after = {"Retry-After": str(behaviour.retry_after_seconds)}
+        if service == "youtube":
+            self._send(429, b"Too Many Requests", "text/html", retry_after)
+            return
+        # OpenRouter reports its rate limits in the error metadata.
+        reset_ms = int((time.time() + behaviour.retry_after_seconds) * 1000)
+        rate_limit_headers = {
+            "X-RateLimit-Limit": str(behaviour.burst),
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": str(reset_ms),
+        }
+        error = {
+            "code": 429,
+            "message": "Rate limit exceeded",
+            "metadata": {"headers": rate_limit_headers},
+        }
+        self._send_json(429, {"error": error}, {**retry_after, **rate_limit_headers})
+
+    def _send_error(self, service: str):
+        if service == "youtube":
+            self._send(503, b"Service Unavailable", "text/html")
+            return
+        error = {"code": 502, "message": "Upstream provider returned an error"}
+        self._send_json(502, {"error": error})
+
+    def _watch_page(self, query: dict[str, str], body: bytes) -> int:
+        templates = self.server.fake.pages
+        video_id = query.get("v", "")
+        template = templates[int(video_fraction(video_id) * len(templates))]
+        page = render_watch_page(
+            template, render_player_response(self.config, video_id)
+        )
+        self._send(200, page.encode(), "text/html; charset=utf-8")
+        return 200
+
+    def _player(self, query: dict[str, str], body: bytes) -> int:
+        video_id = json.loads(body or b"{}").get("videoId", "")
+        self._send_json(200, render_player_response(self.config, video_id))
+        return 200
+
+    def _timedtext(self, query: dict[str, str], body: bytes) -> int:
+        rng = random.Random(f"{self.config.seed}:{query.get('v')}:{query.get('tlang')}")
+        texts = [
+            f'<text start="{4.0 * index:.2f}" dur="4.00">'
+            f"{escape(render_words(rng, 8))}</text>"
+            for index in range(self.config.snippets_per_transcript)
+        ]
+        content = f'<?xml version="1.0" encoding="utf-8" ?><transcript>{"".join(texts)}</transcript>'
+        self._send(200, content.encode(), "text/xml; charset=utf-8")
+        return 200
+
+    def _key_info(self, query: dict[str, str], body: bytes) -> int:
+        requests_per_second = self.config.openrouter.requests_per_second
+        rate_limit = (
+            {"requests": max(1, int(requests_per_second * 10)), "interval": "10s"}
+            if requests_per_second is not None
+            else None
+        )
+        data = {"label": "fake", "usage": 0, "limit": None, "rate_limit": rate_limit}
+        self._send_json(200, {"data": data})
+        return 200
+
+    def _completions(self, query: dict[str, str], body: bytes) -> int:
+        request_data = json.loads(body)
+        prompt_chars = sum(len(m["content"]) for m in request_data["messages"])
+        rng = random.Random(f"{self.config.seed}:{prompt_chars}")
+        content = render_words(rng, self.config.completion_chars // 8)
+        usage = {
+            "prompt_tokens": prompt_chars // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": (prompt_chars + len(content)) // 4,
+        }
+        completion_id = f"gen-fake-{rng.getrandbits(32):08x}"
+        model = request_data.get("model", "fake")
+        if not request_data.get("stream"):
+            message = {"role": "assistant", "content": content}
+            choice = {"index": 0, "message": message, "finish_reason": "stop"}
+            response = {
+                "id": completion_id,
+                "model": model,
+                "choices": [choice],
+                "usage": usage,
+            }
+            self._send_json(200, response)
+            return 200
+
+        # Server-sent events, with chunked transfer encoding.
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        words = content.split(" ")
+        for index, word in enumerate(words):
+            delta = word if index == len(words) - 1 else f"{word} "
+            chunk = {
+                "id": completion_id,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": delta}}],
+            }
+            self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n")
+            if self.config.stream_delta_seconds:
+                time.sleep(self.config.stream_delta_seconds)
+        last = {
+            "id": completion_id,
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "usage": usage,
+        }
+        self._write_chunk(f"data: {json.dumps(last)}\n\ndata: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+        return 200
+
+    def _write_chunk(self, text: str):
+        data = text.encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+class FakeHttpServer(ThreadingHTTPServer):
+    daemon_threads = True
+    fake: "FakeServer"
+
+
+@dataclass(kw_only=True)
+class FakeServer:
+    """
+    Local stand-in for YouTube and OpenRouter, to load-test the pipeline.
+
+    Serves the watch pages (built from the example pages), the innertube
+    player and timedtext endpoints used by youtube_transcript_api, and the
+    OpenRouter chat completions (streamed or not) and key info endpoints.
+    Latency, server errors and 429 responses are configured per service.
+    Requests reach it through a PooledSession with base_url_overrides.
+    """
+
+    config: FakeServerConfig = field(default_factory=FakeServerConfig)
+    host: str = "127.0.0.1"
+    port: int = 0
+    counts: Counter = field(default_factory=Counter, repr=False)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    httpd: FakeHttpServer | None = field(default=None, init=False, repr=False)
+    pages: list[str] = field(default_factory=list, init=False, repr=False)
+
+    @property
+    def base_url(self) -> str:
+        assert self.httpd is not None, "Start the server first"
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def base_url_overrides(self) -> dict[str, str]:
+        return {YOUTUBE_BASE_URL: self.base_url, OPENROUTER_BASE_URL: self.base_url}
+
+    def count(self, path: str, status: int):
+        with self.lock:
+            self.counts[(path, status)] += 1
+
+    def start(self) -> Self:
+        self.pages = [
+            path.read_text() for path in sorted(self.config.examples_dir.glob("*.html"))
+        ]
+        if not self.pages:
+            raise FileNotFoundError(f"No example page in {self.config.examples_dir}")
+        self.httpd = FakeHttpServer((self.host, self.port), FakeRequestHandler)
+        self.httpd.fake = self
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def report(self) -> str:
+        with self.lock:
+            return "\n".join(
+                f"{path} {status}: {count}"
+                for (path, status), count in sorted(self.counts.items())
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve fake YouTube and OpenRouter endpoints locally."
+    )
+    parser.add_argument("--port", type=int, default=8123)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--youtube-rps", type=float, default=None)
+    parser.add_argument("--openrouter-rps", type=float, default=None)
+    args = parser.parse_args()
+
+    def behaviour(requests_per_second: float | None) -> FakeBehaviour:
+        return FakeBehaviour(
+            latency_seconds=args.latency,
+            latency_jitter_seconds=args.jitter,
+            error_rate=args.error_rate,
+            requests_per_second=requests_per_second,
+        )
+
+    config = FakeServerConfig(
+        youtube=behaviour(args.youtube_rps), openrouter=behaviour(args.openrouter_rps)
+    )
+    server = FakeServer(config=config, port=args.port).start()
+    print(f"Serving on {server.base_url}, use:")
+    print(f"PooledSession(base_url_overrides={server.base_url_overrides()!r})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(server.report())
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import argparse
+import gzip
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from ai_xp.layout import ArtifactDirectory
+from ai_xp.scrapper import MetadataPath, YouTubeHtmlScrapper
+from ai_xp.utils import render_video_url
+
+
+@dataclass(kw_only=True, frozen=True)
+class HtmlArchive:
+    """
+    Gzip-compressed copies of the fetched watch pages, one per video id.
+
+    Keeping the raw HTML allows to rebuild ``metadata_output`` offline, e.g.
+    after a parser fix, instead of fetching every page again.
+    """
+
+    root: Path
+
+    def path(self, video_id: str) -> Path:
+        return self.root / f"{video_id}.html.gz"
+
+    def __contains__(self, video_id: str) -> bool:
+        return self.path(video_id).is_file()
+
+    def put(self, video_id: str, html: str):
+        path = self.path(video_id)
+        path.parent.mkdir(exist_ok=True, parents=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as fp:
+            fp.write(html)
+        tmp_path.replace(path)
+
+    def get(self, video_id: str) -> str:
+        with gzip.open(self.path(video_id), "rt", encoding="utf-8") as fp:
+            return fp.read()
+
+    def video_ids(self) -> list[str]:
+        if not self.root.is_dir():
+            return []
+        return sorted(
+            entry.name.removesuffix(".html.gz")
+            for entry in os.scandir(self.root)
+            if entry.name.endswith(".html.gz")
+        )
+
+
+def reparse_one(
+    archive_root: Path,
+    metadata_dir_path: Path,
+    video_id: str,
+    former_paths: list[Path],
+) -> Path | None:
+    # Run in a worker process: only paths and strings cross the boundary.
+    # Imported here, the database module imports this one.
+    from ai_xp.database import fetch_one_metadata
+
+    try:
+        html = HtmlArchive(root=archive_root).get(video_id)
+        scrapper = YouTubeHtmlScrapper(html=html, url=render_video_url(video_id))
+        path = fetch_one_metadata(metadata_dir_path, video_id, scrapper)
+    except Exception as error:
+        # The former artifact is kept, and the other videos are reparsed.
+        print(f"ERROR Failed to reparse {video_id}: {type(error).__name__}: {error}")
+        return None
+    # The status (hence the filename) may change: drop the former artifact,
+    # once the new one is written.
+    for former_path in former_paths:
+        if former_path != path:
+            former_path.unlink(missing_ok=True)
+    return path
+
+
+def reparse_archive(
+    archive: HtmlArchive,
+    metadata_dir_path: Path,
+    *,
+    video_ids: list[str] | None = None,
+    max_workers: int | None = None,
+) -> list[Path]:
+    """
+    Rebuild the metadata of the archived pages, using all the cores.
+
+    Return the written metadata paths; pages that fail to parse keep their
+    former artifact. The manifest, if any, is not updated from the workers:
+    reconcile it afterwards.
+    """
+    video_ids = archive.video_ids() if video_ids is None else video_ids
+    metadata_dir_path.mkdir(exist_ok=True, parents=True)
+    # The directory is listed once, not once per video.
+    metadata_directory = ArtifactDirectory.metadata(metadata_dir_path)
+    former_paths: dict[str | None, list[Path]] = {}
+    for path in metadata_directory.all_paths():
+        former_paths.setdefault(metadata_directory.video_id(path.name), []).append(path)
+    print(f"Reparsing {len(video_ids)} archived pages")
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(
+            executor.map(
+                reparse_one,
+                [archive.root] * len(video_ids),
+                [metadata_dir_path] * len(video_ids),
+                video_ids,
+                [former_paths.get(video_id, []) for video_id in video_ids],
+                chunksize=16,
+            )
+        )
+    written_paths = [path for path in results if path is not None]
+    if len(written_paths) < len(video_ids):
+        print(f"ERROR {len(video_ids) - len(written_paths)} pages failed to reparse")
+    return written_paths
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rebuild metadata_output from the archived watch pages."
+    )
+    parser.add_argument("--root", type=Path, default=Path("generated"))
+    parser.add_argument("--max-workers", type=int, default=None)
+    args = parser.parse_args()
+
+    written_paths = reparse_archive(
+        HtmlArchive(root=args.root / "html_archive"),
+        args.root / "metadata_output",
+        max_workers=args.max_workers,
+    )
+    statuses: dict[str, int] = {}
+    for path in written_paths:
+        status = MetadataPath.from_path(path).status
+        statuses[status] = statuses.get(status, 0) + 1
+    print(f"Reparsed {len(written_paths)} pages: {statuses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import cache
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def accept_encoding() -> str:
+    # urllib3 only decodes brotli when the brotli package is installed.
+    try:
+        import brotli  # noqa: F401
+
+        return "gzip, deflate, br"
+    except ImportError:
+        return "gzip, deflate"
+
+
+@dataclass(kw_only=True)
+class HostStats:
+    requests: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def record(self, elapsed: float, *, error: bool):
+        self.requests += 1
+        self.errors += int(error)
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+
+
+class ConnectionPool:
+    """
+    Connections, per-host limits and statistics shared by several sessions.
+
+    Connections are kept alive and pooled per host by a single
+    ``HTTPAdapter``, at most ``max_per_host`` requests are in flight to the
+    same host, and latency and connection reuse statistics are kept per host,
+    whatever the session the requests go through.
+    """
+
+    def __init__(self, *, max_per_host: int = 8, pool_maxsize: int = 16):
+        self.max_per_host = max_per_host
+        self.adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_maxsize)
+        self._lock = threading.Lock()
+        self._host_semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._host_stats: dict[str, HostStats] = defaultdict(HostStats)
+
+    def semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(
+                    self.max_per_host
+                )
+            return self._host_semaphores[host]
+
+    def record(self, host: str, elapsed: float, *, error: bool):
+        with self._lock:
+            self._host_stats[host].record(elapsed, error=error)
+
+    def _connections_per_host(self) -> dict[str, int]:
+        # urllib3 counts the connections it opened in each pool: requests
+        # minus connections is the number of reused connections.
+        connections: dict[str, int] = defaultdict(int)
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            host = (
+                pool.host
+                if pool.port in (None, 80, 443)
+                else f"{pool.host}:{pool.port}"
+            )
+            connections[host] += pool.num_connections
+        return connections
+
+    def stats_dataframe(self) -> "pd.DataFrame":
+        import pandas as pd
+
+        columns = [
+            "requests",
+            "errors",
+            "mean_seconds",
+            "max_seconds",
+            "new_connections",
+            "reused_connections",
+        ]
+        connections = self._connections_per_host()
+        with self._lock:
+            rows = {
+                host: {
+                    "requests": stats.requests,
+                    "errors": stats.errors,
+                    "mean_seconds": stats.total_seconds / stats.requests,
+                    "max_seconds": stats.max_seconds,
+                    "new_connections": connections.get(host, 0),
+                    "reused_connections": max(
+                        0, stats.requests - connections.get(host, 0)
+                    ),
+                }
+                for host, stats in self._host_stats.items()
+                if stats.requests
+            }
+        df = pd.DataFrame.from_dict(rows, orient="index", columns=columns)
+        df.index.name = "host"
+        return df
+
+
+class PooledSession(requests.Session):
+    """
+    ``requests.Session`` over a ``ConnectionPool``.
+
+    The scrapper, the transcript API and the LLM proxy each get their own
+    session (cookies and headers are not shared), over the same pool of
+    connections, see default_http_client and fork. Every request gets a
+    (connect, read) timeout unless one is given.
+
+    ``base_url_overrides`` redirects every URL starting with a key to the
+    associated base URL, e.g. to send the YouTube and OpenRouter requests to
+    a local fake server (see ai_xp.fake_server).
+    """
+
+    def __init__(
+        self,
+        *,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 60.0,
+        max_per_host: int = 8,
+        pool_maxsize: int = 16,
+        base_url_overrides: dict[str, str] | None = None,
+        pool: ConnectionPool | None = None,
+    ):
+        # max_per_host and pool_maxsize are only used without a pool.
+        super().__init__()
+        self.timeout = (connect_timeout, read_timeout)
+        self.base_url_overrides = dict(base_url_overrides or {})
+        self._owns_pool = pool is None
+        self.pool = pool or ConnectionPool(
+            max_per_host=max_per_host, pool_maxsize=pool_maxsize
+        )
+        self.headers["Accept-Encoding"] = accept_encoding()
+        self.mount("https://", self.pool.adapter)
+        self.mount("http://", self.pool.adapter)
+
+    def fork(self) -> "PooledSession":
+        # A new session (own cookies and headers), same connections and settings.
+        connect_timeout, read_timeout = self.timeout
+        return PooledSession(
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            base_url_overrides=self.base_url_overrides,
+            pool=self.pool,
+        )
+
+    def close(self):
+        # The adapter of a shared pool may still be used by other sessions.
+        if self._owns_pool:
+            super().close()
+
+    def _override_base_url(self, url: str) -> str:
+        for base_url, override in self.base_url_overrides.items():
+            if url.startswith(base_url):
+                return override + url[len(base_url) :]
+        return url
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        url = self._override_base_url(url)
+        host = urlsplit(url).netloc
+        semaphore = self.pool.semaphore(host)
+        semaphore.acquire()
+        error = False
+        response = None
+        start = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+            return response
+        except requests.exceptions.RequestException:
+            error = True
+            raise
+        finally:
+            self.pool.record(host, time.perf_counter() - start, error=error)
+            if kwargs.get("stream") and response is not None:
+                # The connection stays busy until the body is read: hold the
+                # slot until the response is closed, or its body exhausted.
+                release_on_close(response, semaphore)
+            else:
+                semaphore.release()
+
+    def stats_dataframe(self) -> "pd.DataFrame":
+        # Statistics of the whole pool, i.e. of all the sessions sharing it.
+        return self.pool.stats_dataframe()
+
+    def report(self) -> str:
+        return self.stats_dataframe().to_string()
+
+
+def release_on_close(response: requests.Response, semaphore: threading.Semaphore):
+    # urllib3 releases the connection once the body is exhausted, and
+    # Response.close releases it too: release the slot the first time only.
+    raw = response.raw
+    release_conn = raw.release_conn
+    released = threading.Lock()
+
+    def release_conn_and_slot():
+        try:
+            release_conn()
+        finally:
+            if released.acquire(blocking=False):
+                semaphore.release()
+
+    raw.release_conn = release_conn_and_slot
+
+
+@cache
+def default_connection_pool() -> ConnectionPool:
+    # One process-wide pool, so every module reuses the same connections.
+    return ConnectionPool()
+
+
+def default_http_client() -> PooledSession:
+    # A new session for every client, over the process-wide connection pool.
+    return PooledSession(pool=default_connection_pool())
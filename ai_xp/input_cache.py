@@ -0,0 +1,65 @@
+import hashlib
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from ai_xp.response_cache import CacheStats
+from ai_xp.utils import import_pyarrow
+
+# Bump when the parsing of the inputs changes: former entries are ignored.
+INPUT_CACHE_VERSION = 1
+
+
+def hash_file(path: Path, *, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        while chunk := fp.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass(kw_only=True, frozen=True)
+class InputCache:
+    """
+    Parquet copies of the parsed input files (Takeout histories, inputs JSON).
+
+    An entry is keyed by the parser name, the input path, its size and the
+    SHA-256 of its content: unchanged files are loaded from the cache, new or
+    modified ones are parsed again. The entry of a modified file replaces the
+    former one.
+    """
+
+    root: Path
+    stats: CacheStats = field(default_factory=CacheStats)
+
+    def _path(self, namespace: str, path: Path, size: int, content_hash: str) -> Path:
+        path_key = hashlib.sha256(
+            f"{INPUT_CACHE_VERSION}:{namespace}:{path.resolve()}".encode()
+        ).hexdigest()[:16]
+        return self.root / f"{path_key}.{size}.{content_hash}.parquet"
+
+    def frame(
+        self, namespace: str, path: Path, parse: Callable[[Path], pd.DataFrame]
+    ) -> pd.DataFrame:
+        """Return parse(path), from the cache when the file did not change."""
+        import_pyarrow()
+        cache_path = self._path(namespace, path, path.stat().st_size, hash_file(path))
+        if cache_path.is_file():
+            self.stats.hits += 1
+            return pd.read_parquet(cache_path)
+
+        self.stats.misses += 1
+        df = parse(path)
+        self.root.mkdir(exist_ok=True, parents=True)
+        # The input changed: drop the entry of its former content.
+        path_key = cache_path.name.split(".")[0]
+        for stale_path in self.root.glob(f"{path_key}.*.parquet"):
+            stale_path.unlink(missing_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        df.to_parquet(tmp_path, index=False)
+        tmp_path.replace(cache_path)
+        self.stats.writes += 1
+        return df
@@ -0,0 +1,194 @@
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal, Self
+
+import pandas as pd
+
+Stage = Literal["metadata", "transcript", "llm_output"]
+JobState = Literal["pending", "running", "done", "failed-transient", "failed-permanent"]
+ErrorKind = Literal["transient", "permanent"]
+
+# Errors that retrying will not fix: the video itself is the problem.
+# Statuses of the metadata artifacts are classified the same way.
+PERMANENT_ERRORS = frozenset(
+    {
+        # youtube_transcript_api
+        "TranscriptsDisabled",
+        "NoTranscriptFound",
+        "VideoUnavailable",
+        "VideoUnplayable",
+        "InvalidVideoId",
+        "AgeRestricted",
+        "NotTranslatable",
+        "TranslationLanguageNotAvailable",
+        # Metadata statuses (see MetadataPath.from_scrapper)
+        "likely-video-unavailable",
+        "likely-an-advertisement",
+        # LLM errors other than rate limits (e.g. context too long)
+        "OpenRouterRequestFailed",
+    }
+)
+
+# Errors caused by the environment (network, blocking, rate limit), worth
+# retrying later. Unknown errors are considered transient too: the number of
+# attempts bounds the retries anyway.
+TRANSIENT_ERRORS = frozenset(
+    {
+        "RequestBlocked",
+        "IpBlocked",
+        "YouTubeRequestFailed",
+        "PoTokenRequired",
+        "YouTubeDataUnparsable",
+        "RequestException",
+        "OpenRouterRateLimitExceeded",
+        "OpenRouterStreamInterrupted",
+    }
+)
+
+
+def classify_error(exc_name: str) -> ErrorKind:
+    if exc_name in PERMANENT_ERRORS:
+        return "permanent"
+    return "transient"
+
+
+def failure_state(exc_name: str) -> JobState:
+    if classify_error(exc_name) == "permanent":
+        return "failed-permanent"
+    return "failed-transient"
+
+
+@dataclass(kw_only=True, frozen=True)
+class JobKey:
+    stage: Stage
+    video_id: str
+    # Empty when not relevant for the stage.
+    language_code: str = ""
+    prompt_family: str = ""
+
+    def astuple(self) -> tuple[str, str, str, str]:
+        return (self.stage, self.video_id, self.language_code, self.prompt_family)
+
+
+@dataclass(kw_only=True, frozen=True)
+class JobLedger:
+    """
+    Persistent ledger of the pipeline jobs (SQLite).
+
+    A job is identified by its stage, video, language and prompt family, and
+    goes through pending -> running -> done or failed-transient /
+    failed-permanent. A job left running by an interrupted run, or failed
+    with a transient error, is retried until ``max_attempts`` is reached.
+    """
+
+    path: Path
+    max_attempts: int = 3
+    connection: sqlite3.Connection = field(repr=False)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @classmethod
+    def open(cls, path: Path, *, max_attempts: int = 3) -> Self:
+        path.parent.mkdir(exist_ok=True, parents=True)
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "stage TEXT NOT NULL, video_id TEXT NOT NULL, "
+                "language_code TEXT NOT NULL, prompt_family TEXT NOT NULL, "
+                "state TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+                "last_error TEXT, updated_at TEXT NOT NULL, "
+                "PRIMARY KEY (stage, video_id, language_code, prompt_family))"
+            )
+        return cls(path=path, max_attempts=max_attempts, connection=connection)
+
+    def close(self):
+        self.connection.close()
+
+    def _upsert(
+        self, key: JobKey, state: JobState, *, attempt: bool, error: str | None
+    ):
+        now = pd.Timestamp.now().isoformat()
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO jobs (stage, video_id, language_code, prompt_family, "
+                "state, attempts, last_error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (stage, video_id, language_code, prompt_family) "
+                "DO UPDATE SET state = excluded.state, "
+                "attempts = attempts + excluded.attempts, "
+                "last_error = excluded.last_error, updated_at = excluded.updated_at",
+                (*key.astuple(), state, int(attempt), error, now),
+            )
+
+    def start(self, key: JobKey):
+        self._upsert(key, "running", attempt=True, error=None)
+
+    def succeed(self, key: JobKey):
+        self._upsert(key, "done", attempt=False, error=None)
+
+    def fail(self, key: JobKey, exc_name: str, *, attempt: bool = False):
+        # attempt=True records a failure that happened outside of start().
+        self._upsert(key, failure_state(exc_name), attempt=attempt, error=exc_name)
+
+    def record_outcome(self, key: JobKey, status: str):
+        # Artifacts carry their status in their filename: "success" or an error.
+        if status == "success":
+            self.succeed(key)
+        else:
+            self.fail(key, status)
+
+    def state(self, key: JobKey) -> tuple[JobState | None, int]:
+        row = self.connection.execute(
+            "SELECT state, attempts FROM jobs WHERE stage = ? AND video_id = ? "
+            "AND language_code = ? AND prompt_family = ?",
+            key.astuple(),
+        ).fetchone()
+        return (row[0], row[1]) if row else (None, 0)
+
+    def should_run(self, key: JobKey) -> bool:
+        state, attempts = self.state(key)
+        if state in ("done", "failed-permanent"):
+            return False
+        return attempts < self.max_attempts
+
+    def retryable(self, stage: Stage) -> pd.DataFrame:
+        """
+        Jobs to run again: interrupted (left running) or failed transiently,
+        with attempts left.
+        """
+        return pd.read_sql_query(
+            "SELECT video_id, language_code, prompt_family, state, attempts, "
+            "last_error FROM jobs WHERE stage = ? "
+            "AND state IN ('pending', 'running', 'failed-transient') "
+            "AND attempts < ?",
+            self.connection,
+            params=(stage, self.max_attempts),
+        )
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.read_sql_query(
+            "SELECT * FROM jobs", self.connection, parse_dates=["updated_at"]
+        ).set_index(["stage", "video_id", "language_code", "prompt_family"])
+
+    def seed_failures(self, stage: Stage, failures: dict[str, str]):
+        # Record failures known from error artifacts (video id -> error name)
+        # that predate the ledger, as a first failed attempt.
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO jobs (stage, video_id, language_code, "
+                "prompt_family, state, attempts, last_error, updated_at) "
+                "VALUES (?, ?, '', '', ?, 1, ?, ?)",
+                (
+                    (
+                        stage,
+                        video_id,
+                        failure_state(exc_name),
+                        exc_name,
+                        pd.Timestamp.now().isoformat(),
+                    )
+                    for video_id, exc_name in failures.items()
+                ),
+            )
@@ -0,0 +1,145 @@
+import argparse
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self
+
+# Present in a sharded artifact directory: writers then use the shards.
+SHARDED_MARKER = ".sharded"
+ARTIFACT_PATTERN = "*.json"
+
+
+def render_shard_name(video_id: str) -> str:
+    # Hashed, so the shards are balanced whatever the shape of the ids.
+    return hashlib.sha256(video_id.encode()).hexdigest()[:2]
+
+
+@dataclass(kw_only=True, frozen=True)
+class ArtifactDirectory:
+    """
+    Directory of artifacts (metadata or transcripts) named after their video.
+
+    In the flat layout, every file is directly in ``root``. In the sharded
+    layout, files are in ``root/<shard>/``, the shard being computed from the
+    video id, so the artifacts of a video are found by listing a single small
+    directory. A directory being migrated contains both: readers always look
+    at both levels, writers use the shards once the marker file is present.
+    """
+
+    root: Path
+    # Index of the video id among the dot-separated fields of the filenames.
+    video_id_field: int
+
+    @classmethod
+    def metadata(cls, root: Path) -> Self:
+        # <video_id>.<title_slug>.<status>.json
+        return cls(root=root, video_id_field=0)
+
+    @classmethod
+    def transcripts(cls, root: Path) -> Self:
+        # <language_code>.<source>.<video_id>.<title_slug>.<status>.json
+        return cls(root=root, video_id_field=2)
+
+    @property
+    def sharded(self) -> bool:
+        return (self.root / SHARDED_MARKER).is_file()
+
+    def directory(self, video_id: str) -> Path:
+        """Directory where a new artifact of the video is written."""
+        if self.sharded:
+            return self.root / render_shard_name(video_id)
+        return self.root
+
+    def video_id(self, filename: str) -> str | None:
+        fields = filename.split(".")
+        return (
+            fields[self.video_id_field] if len(fields) > self.video_id_field else None
+        )
+
+    def _list(self, directory: Path, video_id: str) -> list[Path]:
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            return []
+        return [
+            Path(entry.path)
+            for entry in entries
+            if entry.name.endswith(".json")
+            and entry.is_file()
+            and self.video_id(entry.name) == video_id
+        ]
+
+    def paths(self, video_id: str) -> list[Path]:
+        """
+        Artifacts of a video, in both layouts.
+
+        Once sharded, only the shard of the video is listed. Before that, the
+        (possibly large) root is listed too.
+        """
+        paths = self._list(self.root / render_shard_name(video_id), video_id)
+        if not self.sharded:
+            paths += self._list(self.root, video_id)
+        return sorted(paths)
+
+    def all_paths(self) -> list[Path]:
+        return sorted(
+            [
+                *self.root.glob(ARTIFACT_PATTERN),
+                *self.root.glob(f"*/{ARTIFACT_PATTERN}"),
+            ]
+        )
+
+    def shard(self) -> int:
+        """
+        Migrate the flat directory to the sharded layout, in place.
+
+        The marker is written first, so concurrent writers switch to the
+        shards, then the flat files are moved (renamed) one by one. Readers
+        see both layouts meanwhile. Idempotent: return the number of moved
+        files, run it again to move files written by a writer that had not
+        seen the marker yet.
+        """
+        self.root.mkdir(exist_ok=True, parents=True)
+        (self.root / SHARDED_MARKER).touch()
+        moved = 0
+        for path in sorted(self.root.glob(ARTIFACT_PATTERN)):
+            video_id = self.video_id(path.name)
+            if video_id is None:
+                continue
+            shard_path = self.root / render_shard_name(video_id) / path.name
+            shard_path.parent.mkdir(exist_ok=True)
+            path.replace(shard_path)
+            moved += 1
+        return moved
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Migrate metadata_output and transcript_output to the sharded "
+            "layout. Safe to run while the pipeline is running, and to rerun."
+        )
+    )
+    parser.add_argument("--root", type=Path, default=Path("generated"))
+    args = parser.parse_args()
+
+    for directory in (
+        ArtifactDirectory.metadata(args.root / "metadata_output"),
+        ArtifactDirectory.transcripts(args.root / "transcript_output"),
+    ):
+        moved = directory.shard()
+        print(f"Moved {moved} files into the shards of {directory.root}")
+
+    search_index_path = args.root / "search_index.sqlite"
+    if search_index_path.is_file():
+        # Imported here: the search index pulls pandas in.
+        from ai_xp.search_index import SearchIndex
+
+        # The moved files are indexed again under their new path on the next
+        # FileDatabase.from_paths; the manifest is reconciled there too.
+        SearchIndex.open(search_index_path).forget_missing()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,33 @@
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from functools import cached_property
 from pathlib import Path
-from typing import Literal, Self
+from typing import TYPE_CHECKING, Callable, Literal, Self
 
 import pandas as pd
 import requests
 
+from ai_xp.http_client import default_http_client
+from ai_xp.job_ledger import JobKey, JobLedger
+from ai_xp.metrics import MetricsRegistry, Span, default_metrics
+from ai_xp.rate_limit import AdaptiveConcurrencyLimiter
+from ai_xp.response_cache import ResponseCache, render_cache_key
 from ai_xp.scrapper import MetadataPath
-from ai_xp.transcript import TranscriptPath, load_transcript_full_text
+from ai_xp.tokens import (
+    TranscriptChunk,
+    chunk_snippets,
+    count_tokens_batch,
+    render_timecode,
+)
+from ai_xp.transcript import (
+    TranscriptPath,
+    load_transcript_full_text,
+    load_transcript_snippets,
+)
+from ai_xp.usage_ledger import UsageLedger
 from ai_xp.utils import (
     load_json,
     load_toml,
@@ -18,13 +37,88 @@ from ai_xp.utils import (
     retrieve_api_key,
 )
 
+if TYPE_CHECKING:
+    # The manifest parses AiSummaryPath filenames, hence the import cycle.
+    from ai_xp.manifest import FileManifest
+    from ai_xp.transcript_store import TranscriptStore
+
 PromptsDictType = dict[Literal["user", "assistant"], str]
 
 
 class OpenRouterRateLimitExceeded(Exception):
+    def __init__(self, message: str, *, reset_at: float | None = None):
+        super().__init__(message)
+        # Epoch seconds at which the rate limit window resets, when known.
+        self.reset_at = reset_at
+
+
+class OpenRouterRequestFailed(Exception):
+    pass
+
+
+class OpenRouterStreamInterrupted(Exception):
+    # The connection dropped while streaming: the partial output is kept.
     pass
 
 
+def parse_rate_limit_headers(
+    headers: dict[str, str],
+) -> tuple[int | None, float | None]:
+    # OpenRouter sends X-RateLimit-Remaining and X-RateLimit-Reset (epoch
+    # milliseconds), either as response headers or, for upstream rate limits,
+    # in the error metadata.
+    lowered = {k.lower(): v for k, v in headers.items()}
+    remaining = lowered.get("x-ratelimit-remaining")
+    reset = lowered.get("x-ratelimit-reset")
+    try:
+        remaining = int(remaining) if remaining is not None else None
+        reset_at = int(reset) / 1000 if reset is not None else None
+    except ValueError:
+        return None, None
+    return remaining, reset_at
+
+
+def max_concurrency_from_key_info(key_info: dict, default: int) -> int:
+    # The key info endpoint tells how many requests are allowed per interval
+    # (e.g. {"requests": 20, "interval": "10s"}).
+    rate_limit = key_info.get("data", {}).get("rate_limit") or {}
+    requests_per_interval = rate_limit.get("requests")
+    if isinstance(requests_per_interval, int) and requests_per_interval > 0:
+        return min(default, requests_per_interval)
+    return default
+
+
+@dataclass(kw_only=True)
+class StreamStats:
+    start: float
+    end: float | None = None
+    first_delta: float | None = None
+    deltas: int = 0
+    completion_tokens: int | None = None
+
+    def record_delta(self, now: float):
+        if self.first_delta is None:
+            self.first_delta = now
+        self.deltas += 1
+
+    def asdict(self) -> dict[str, float | int | None]:
+        # Without usage, the number of streamed deltas approximates the tokens.
+        tokens = self.completion_tokens or self.deltas
+        ttft = self.first_delta - self.start if self.first_delta else None
+        generation_seconds = (
+            self.end - self.first_delta if self.end and self.first_delta else None
+        )
+        return {
+            "time_to_first_token_seconds": ttft,
+            "total_seconds": self.end - self.start if self.end else None,
+            "deltas": self.deltas,
+            "completion_tokens": self.completion_tokens,
+            "tokens_per_second": (
+                tokens / generation_seconds if generation_seconds else None
+            ),
+        }
+
+
 @dataclass(frozen=True, kw_only=True)
 class AiSummaryPath:
     prompt_family: str
@@ -69,6 +163,17 @@ class OpenRouterAiProxy:
     model: str = "deepseek/deepseek-r1:free"
     endpoint: str = "https://openrouter.ai/api/v1/chat/completions"
     endpoint_key_info: str = "https://openrouter.ai/api/v1/auth/key"
+    # Optional shared limiter, to run several prompts concurrently.
+    limiter: AdaptiveConcurrencyLimiter | None = field(default=None, repr=False)
+    # Optional (opt-in) cache of the successful responses.
+    response_cache: ResponseCache | None = field(default=None, repr=False)
+    # Own session over the shared connection pool by default, see
+    # http_client.default_http_client.
+    http_client: requests.Session | None = field(default=None, repr=False)
+    # (connect, read) timeouts: a generation can take minutes, not forever.
+    timeout: tuple[float, float] = (10.0, 300.0)
+    # Optional ledger of the token usage and latency of every request sent.
+    usage_ledger: UsageLedger | None = field(default=None, repr=False)
 
     @classmethod
     def instantiate_with_default_key(cls):
@@ -77,8 +182,12 @@ class OpenRouterAiProxy:
         proxy = OpenRouterAiProxy(api_key=api_key)
         return proxy
 
+    @cached_property
+    def session(self) -> requests.Session:
+        return self.http_client or default_http_client()
+
     def check_if_i_can_still_use_the_service(self):
-        response = requests.get(
+        response = self.session.get(
             url=self.endpoint_key_info,
             headers={
                 "Authorization": f"Bearer {self.api_key}",
@@ -88,7 +197,35 @@ class OpenRouterAiProxy:
         response_dict = json.loads(response.content.decode())
         return response_dict
 
-    def prompt(self, prompts: PromptsDictType):
+    def refresh_limits(self, max_concurrency: int) -> dict | None:
+        """
+        Fetch the key info again, and cap the limiter to the rate limit it
+        tells. Return None when the key info cannot be fetched.
+        """
+        try:
+            key_info = self.check_if_i_can_still_use_the_service()
+        except (requests.exceptions.RequestException, json.JSONDecodeError) as error:
+            print(f"[WARN] Cannot fetch the key info: {type(error).__name__}")
+            return None
+        if self.limiter is not None:
+            self.limiter.set_max_limit(
+                max_concurrency_from_key_info(key_info, max_concurrency)
+            )
+        return key_info
+
+    def prompt(
+        self,
+        prompts: PromptsDictType,
+        *,
+        bypass_cache: bool = False,
+        on_delta: Callable[[str], None] | None = None,
+        max_output_chars: int | None = None,
+    ):
+        # bypass_cache skips the cache lookup, to get a fresh sample. The fresh
+        # response still replaces the cached one.
+        # With on_delta, the completion is streamed (server-sent events) and
+        # on_delta receives the content as it arrives. The generation is cut
+        # off once it exceeds max_output_chars.
         user_content = prompts["user"]
         assistant_content = prompts.get("assistant")
 
@@ -101,24 +238,243 @@ class OpenRouterAiProxy:
             )
 
         request_data = {"model": self.model, "messages": messages}
-        response = requests.post(
-            url=self.endpoint,
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-            },
-            data=json.dumps(request_data),
-        )
-        response_dict = json.loads(response.content.decode())
+        cache_key = render_cache_key(self.model, messages)
+        if self.response_cache is not None and not bypass_cache:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                if on_delta is not None:
+                    on_delta(cached["choices"][0]["message"]["content"])
+                return {
+                    "url": self.endpoint,
+                    "model": self.model,
+                    "request": {"data": request_data},
+                    "response": cached,
+                    "status_code": None,
+                    "rate_limit_headers": {},
+                    "cache_key": cache_key,
+                    "cache_hit": True,
+                }
+
+        stream_stats = None
+        if self.limiter is not None:
+            self.limiter.acquire()
+        start = time.perf_counter()
+        try:
+            if on_delta is None:
+                response = self.session.post(
+                    url=self.endpoint,
+                    headers={
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json",
+                    },
+                    data=json.dumps(request_data),
+                    timeout=self.timeout,
+                )
+                response_dict = parse_response_body(response)
+            else:
+                request_data = {**request_data, "stream": True}
+                response, response_dict, stream_stats = self._post_streaming(
+                    request_data, on_delta, max_output_chars
+                )
+            rate_limit_headers = {
+                k: v
+                for k, v in response.headers.items()
+                if k.lower().startswith("x-ratelimit")
+            }
+            if self.limiter is not None:
+                self._give_feedback_to_limiter(response_dict, rate_limit_headers)
+        finally:
+            if self.limiter is not None:
+                self.limiter.release()
+        latency_seconds = time.perf_counter() - start
+
+        if self.response_cache is not None and "error" not in response_dict:
+            self.response_cache.put(cache_key, response_dict)
+
         product = {
             "url": self.endpoint,
             "model": self.model,
             # result's request data already contains prompts
             "request": {"data": request_data},
             "response": response_dict,
+            "status_code": response.status_code,
+            "rate_limit_headers": rate_limit_headers,
+            "cache_key": cache_key,
+            "cache_hit": False,
         }
+        if stream_stats is not None:
+            product["stream"] = stream_stats.asdict()
+        if self.usage_ledger is not None:
+            self.usage_ledger.record(product, latency_seconds=latency_seconds)
         return product
 
+    def _post_streaming(
+        self,
+        request_data: dict,
+        on_delta: Callable[[str], None],
+        max_output_chars: int | None,
+    ) -> tuple[requests.Response, dict, "StreamStats"]:
+        # Consume the server-sent events and rebuild a response dict shaped
+        # like a non-streamed one. A dropped connection or a cut-off
+        # generation is reported as an error, along with the partial content.
+        stats = StreamStats(start=time.perf_counter())
+        response = self.session.post(
+            url=self.endpoint,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+            },
+            data=json.dumps(request_data),
+            timeout=self.timeout,
+            stream=True,
+        )
+        if not response.headers.get("Content-Type", "").startswith("text/event-stream"):
+            # Errors (e.g. rate limits) are not streamed.
+            return response, parse_response_body(response), stats
+
+        response_dict: dict = {}
+        content: list[str] = []
+        content_chars = 0
+        finish_reason = None
+        try:
+            # chunk_size=None yields the data as it arrives, instead of buffering.
+            # Lines are decoded here: event streams are always UTF-8, whereas
+            # requests would default to ISO-8859-1 without a charset.
+            for raw_line in response.iter_lines(chunk_size=None):
+                line = raw_line.decode("utf-8")
+                # Lines starting with ":" are keep-alive comments. The space
+                # after "data:" is optional.
+                if not line.startswith("data:"):
+                    continue
+                data = line.removeprefix("data:").removeprefix(" ")
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                if "error" in chunk:
+                    response_dict["error"] = chunk["error"]
+                    break
+                response_dict.setdefault("id", chunk.get("id"))
+                response_dict.setdefault("model", chunk.get("model"))
+                if chunk.get("usage"):
+                    response_dict["usage"] = chunk["usage"]
+                for choice in chunk.get("choices", []):
+                    finish_reason = choice.get("finish_reason") or finish_reason
+                    delta = choice.get("delta", {}).get("content")
+                    if delta:
+                        stats.record_delta(time.perf_counter())
+                        content.append(delta)
+                        content_chars += len(delta)
+                        on_delta(delta)
+                if max_output_chars is not None and content_chars > max_output_chars:
+                    response_dict["error"] = {
+                        "code": "cutoff",
+                        "message": f"Generation cut off after {max_output_chars} characters",
+                    }
+                    break
+        except (
+            requests.exceptions.RequestException,
+            UnicodeDecodeError,
+            json.JSONDecodeError,
+        ) as error:
+            # A malformed event is handled like a dropped connection.
+            response_dict["error"] = {
+                "code": "stream_interrupted",
+                "message": f"Stream interrupted: {type(error).__name__}",
+            }
+        finally:
+            response.close()
+
+        stats.end = time.perf_counter()
+        stats.completion_tokens = response_dict.get("usage", {}).get(
+            "completion_tokens"
+        )
+        response_dict["choices"] = [
+            {
+                "message": {"role": "assistant", "content": "".join(content)},
+                "finish_reason": finish_reason,
+            }
+        ]
+        return response, response_dict, stats
+
+    def _give_feedback_to_limiter(
+        self, response_dict: dict, rate_limit_headers: dict[str, str]
+    ):
+        assert self.limiter is not None
+        if is_rate_limit_error(response_dict):
+            _, reset_at = parse_rate_limit_headers(
+                {**rate_limit_headers, **rate_limit_error_headers(response_dict)}
+            )
+            self.limiter.on_rate_limited(reset_at)
+        elif "error" not in response_dict:
+            self.limiter.on_success(*parse_rate_limit_headers(rate_limit_headers))
+
+
+def parse_response_body(response: requests.Response) -> dict:
+    # A body that is not JSON (e.g. the HTML page of a gateway error) is
+    # reported as an error, with the HTTP status as its code.
+    try:
+        return json.loads(response.content.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        body = response.content[:200].decode("utf-8", errors="replace")
+        return {
+            "error": {
+                "code": response.status_code,
+                "message": f"Response is not JSON (HTTP {response.status_code}): "
+                f"{body}",
+            }
+        }
+
+
+def is_rate_limit_error(response_dict: dict) -> bool:
+    return "error" in response_dict and response_dict["error"].get("code") == 429
+
+
+def rate_limit_error_headers(response_dict: dict) -> dict[str, str]:
+    metadata = response_dict.get("error", {}).get("metadata") or {}
+    return metadata.get("headers") or {}
+
+
+def record_llm_call(span: Span, product: dict):
+    # Status, token usage and size of the completion of an LLM call span.
+    response = product["response"]
+    usage = response.get("usage") or {}
+    span.status = (
+        str(response["error"].get("code")) if "error" in response else "success"
+    )
+    span.prompt_tokens = usage.get("prompt_tokens")
+    span.completion_tokens = usage.get("completion_tokens")
+    span.attributes["cache_hit"] = product.get("cache_hit", False)
+    if "error" not in response:
+        span.bytes = len(response["choices"][0]["message"]["content"].encode())
+
+
+def raise_for_response_error(product: dict):
+    response = product["response"]
+    if "error" not in response:
+        return
+    print(json.dumps(response, indent=4, ensure_ascii=False, sort_keys=True))
+    print(response["error"]["message"])
+    if is_rate_limit_error(response):
+        _, reset_at = parse_rate_limit_headers(
+            {**product["rate_limit_headers"], **rate_limit_error_headers(response)}
+        )
+        raise OpenRouterRateLimitExceeded(
+            response["error"]["message"], reset_at=reset_at
+        )
+    if response["error"].get("code") == "stream_interrupted":
+        raise OpenRouterStreamInterrupted(response["error"]["message"])
+    raise OpenRouterRequestFailed(response["error"]["message"])
+
+
+def render_retry_delay(
+    error: OpenRouterRateLimitExceeded, attempt: int, backoff_seconds: float
+) -> float:
+    # Exponential backoff, or until the announced reset if it is later.
+    delay = backoff_seconds * 2 ** (attempt - 1)
+    if error.reset_at is not None:
+        delay = max(delay, error.reset_at - time.time())
+    return delay
+
 
 @dataclass(kw_only=True, frozen=True)
 class VideoModel:
@@ -162,12 +518,41 @@ class VideoModel:
         }
 
 
+@dataclass(kw_only=True, frozen=True)
+class SummaryJob:
+    video: VideoModel
+    transcript_file_path: Path
+    llm_output_dir_path: Path
+    prompt_language_code: str
+    prompt_family: str | None = None
+
+    def job_key(self) -> JobKey:
+        return JobKey(
+            stage="llm_output",
+            video_id=self.video.video_id,
+            language_code=self.prompt_language_code,
+            prompt_family=self.prompt_family or self.video.best_prompt_family,
+        )
+
+
 @dataclass(kw_only=True, frozen=True)
 class AiSummarizer:
     proxy: OpenRouterAiProxy
     all_prompts: dict[str, dict[str, PromptsDictType]]
     dry_run: bool
     creation_time: pd.Timestamp | None
+    manifest: "FileManifest | None" = field(default=None, repr=False)
+    transcript_store: "TranscriptStore | None" = field(default=None, repr=False)
+    job_ledger: JobLedger | None = field(default=None, repr=False)
+    # Ask the proxy for fresh responses even when they are cached.
+    bypass_cache: bool = False
+    # Stream the completions, see OpenRouterAiProxy.prompt.
+    stream: bool = False
+    max_output_chars: int | None = None
+    # Transcripts longer than this many tokens are summarized chunk by chunk.
+    chunk_tokens: int | None = None
+    # Spans of the prompt render, LLM call and write stages.
+    metrics: MetricsRegistry | None = field(default=None, repr=False)
 
     @cached_property
     def time_id(self) -> str | None:
@@ -180,6 +565,14 @@ class AiSummarizer:
         dry_run: bool = False,
         prompts_path: Path = Path("resources/prompts/prompts.toml"),
         creation_time: pd.Timestamp | None = None,
+        manifest: "FileManifest | None" = None,
+        transcript_store: "TranscriptStore | None" = None,
+        job_ledger: JobLedger | None = None,
+        bypass_cache: bool = False,
+        stream: bool = False,
+        max_output_chars: int | None = None,
+        chunk_tokens: int | None = None,
+        metrics: MetricsRegistry | None = None,
     ):
         all_prompts = load_toml(prompts_path)["prompts"]
         return cls(
@@ -187,6 +580,14 @@ class AiSummarizer:
             all_prompts=all_prompts,
             dry_run=dry_run,
             creation_time=creation_time,
+            manifest=manifest,
+            transcript_store=transcript_store,
+            job_ledger=job_ledger,
+            bypass_cache=bypass_cache,
+            stream=stream,
+            max_output_chars=max_output_chars,
+            chunk_tokens=chunk_tokens,
+            metrics=metrics,
         )
 
     def summarize_with_ai(
@@ -200,9 +601,20 @@ class AiSummarizer:
         if prompt_family is None:
             prompt_family = video.best_prompt_family
 
-        prompts = self.render_prompts(
-            video, transcript_file_path, prompt_language_code, prompt_family
-        )
+        print(f"Generating summary for transcript: {transcript_file_path}")
+        metrics = self.metrics or default_metrics()
+        # Long transcripts are summarized chunk by chunk, then the partial
+        # summaries are merged with the reduce prompt.
+        with metrics.span("prompt_render", video_id=video.video_id) as span:
+            chunks = self.chunk_transcript(transcript_file_path)
+            prompts = (
+                None
+                if chunks
+                else self.render_prompts(
+                    video, transcript_file_path, prompt_language_code, prompt_family
+                )
+            )
+            span.attributes["chunks"] = len(chunks)
         parsed_ai_summary_path = AiSummaryPath.from_transcript_path(
             prompt_family, TranscriptPath.from_path(transcript_file_path)
         )
@@ -229,31 +641,288 @@ class AiSummarizer:
             )
             return
 
-        product = self.proxy.prompt(prompts)
+        chunk_products = []
+        if chunks:
+            chunk_products = self.summarize_chunks(video, chunks, prompt_language_code)
+            prompts = self.render_reduce_prompts(
+                video, chunk_products, prompt_language_code
+            )
+
+        llm_output_file_path.parent.mkdir(exist_ok=True, parents=True)
+        md_path = llm_output_file_path.with_suffix(".md")
+        # While streaming, the summary is appended to a ".md.partial" file,
+        # which is only renamed once the generation is complete. Partial files
+        # are not picked up as outputs, but are kept for inspection.
+        partial_path = md_path.with_name(md_path.name + ".partial")
+        partial_path.unlink(missing_ok=True)
+        with metrics.span("llm_call", video_id=video.video_id) as span:
+            if self.stream:
+                with partial_path.open("a") as partial_file:
+
+                    def on_delta(delta: str):
+                        partial_file.write(delta)
+                        partial_file.flush()
+
+                    product = self.proxy.prompt(
+                        prompts,
+                        bypass_cache=self.bypass_cache,
+                        on_delta=on_delta,
+                        max_output_chars=self.max_output_chars,
+                    )
+            else:
+                product = self.proxy.prompt(prompts, bypass_cache=self.bypass_cache)
+            record_llm_call(span, product)
+        if "stream" in product:
+            print(f"[STAT] {md_path.name} {product['stream']}")
         response = product["response"]
 
         if "error" in response:
-            print(json.dumps(response, indent=4, ensure_ascii=False, sort_keys=True))
-            print(response["error"]["message"])
-            # TODO eschalk refine error management, it can be something else than rate limit.
-            raise OpenRouterRateLimitExceeded(response["error"]["message"])
+            if partial_path.exists() and not partial_path.stat().st_size:
+                partial_path.unlink()
+            elif partial_path.exists():
+                print(f"[ NOK] Kept partial summary into {partial_path}")
+        raise_for_response_error(product)
 
         product.update(metadata)
+        if chunk_products:
+            product["chunks"] = [
+                {
+                    "index": chunk.index,
+                    "start_seconds": chunk.start_seconds,
+                    "end_seconds": chunk.end_seconds,
+                    "tokens": chunk.tokens,
+                    "response": chunk_product["response"],
+                }
+                for chunk, chunk_product in zip(chunks, chunk_products)
+            ]
 
         summary = response["choices"][0]["message"]["content"]
 
-        llm_output_file_path.parent.mkdir(exist_ok=True, parents=True)
-        md_path = llm_output_file_path.with_suffix(".md")
-        md_path.write_text(summary)
         json_path = llm_output_file_path.with_suffix(".json")
-        json_path.write_text(
-            json.dumps(product, sort_keys=True, indent=4, ensure_ascii=False)
-        )
+        with metrics.span("summary_write", video_id=video.video_id) as span:
+            if self.stream:
+                partial_path.replace(md_path)
+            else:
+                md_path.write_text(summary)
+            product_json = json.dumps(
+                product, sort_keys=True, indent=4, ensure_ascii=False
+            )
+            json_path.write_text(product_json)
+            span.bytes = len(summary.encode()) + len(product_json.encode())
         print(f"[  OK] Written product into {json_path} for {transcript_file_path}")
         print(f"[  OK] Written md summary  into {md_path} for {transcript_file_path}")
+        if self.manifest is not None:
+            self.manifest.record("llm_output", md_path)
 
         return {"json": json_path, "md": md_path}
 
+    def chunk_transcript(self, transcript_file_path: Path) -> list[TranscriptChunk]:
+        # Empty when chunking is disabled or the transcript fits in one chunk.
+        if self.chunk_tokens is None:
+            return []
+        snippets = load_transcript_snippets(
+            transcript_file_path, store=self.transcript_store
+        )
+        # The chunk prompt asks for the time of each point: lines are marked.
+        chunks = chunk_snippets(snippets, max_tokens=self.chunk_tokens, timecodes=True)
+        return chunks if len(chunks) > 1 else []
+
+    def summarize_chunks(
+        self,
+        video: VideoModel,
+        chunks: list[TranscriptChunk],
+        prompt_language_code: str,
+        *,
+        max_attempts: int = 5,
+        backoff_seconds: float = 10.0,
+    ) -> list[dict]:
+        # The chunks are sent concurrently, with at most as many workers as
+        # the proxy's limiter allows; otherwise, one at a time. The limiter
+        # caps the requests actually in flight. A rate-limited chunk is retried
+        # on its own, so the chunks already summarized are not sent again. Any
+        # other error (or a chunk still rate limited after max_attempts) aborts
+        # the video.
+        print(f"Summarizing {len(chunks)} chunks of {video.video_url}")
+        metrics = self.metrics or default_metrics()
+
+        def summarize_chunk(chunk: TranscriptChunk) -> dict:
+            prompts = self.render_chunk_prompts(
+                video, chunk, len(chunks), prompt_language_code
+            )
+            for attempt in range(1, max_attempts + 1):
+                with metrics.span("llm_call", video_id=video.video_id) as span:
+                    span.attributes["chunk"] = chunk.index
+                    product = self.proxy.prompt(prompts, bypass_cache=self.bypass_cache)
+                    record_llm_call(span, product)
+                try:
+                    raise_for_response_error(product)
+                except OpenRouterRateLimitExceeded as rate_limit_error:
+                    if attempt == max_attempts:
+                        raise
+                    delay = render_retry_delay(
+                        rate_limit_error, attempt, backoff_seconds
+                    )
+                    print(
+                        f"[WAIT] Rate limited, retry chunk {chunk.index + 1} "
+                        f"of {video.video_id} in {delay:.0f}s"
+                    )
+                    time.sleep(delay)
+                else:
+                    return product
+
+        limiter = self.proxy.limiter
+        max_workers = limiter.max_limit if limiter is not None else 1
+        with ThreadPoolExecutor(max_workers=min(len(chunks), max_workers)) as executor:
+            return list(executor.map(summarize_chunk, chunks))
+
+    def plan(self, jobs: list[SummaryJob]) -> pd.DataFrame:
+        """
+        Prompt tokens the jobs would send, per video, without sending anything.
+
+        All the prompts are rendered first, then tokenized in a single batch.
+        For chunked transcripts, the chunk prompts are counted, not the
+        reduce prompt (it depends on the chunk summaries).
+        """
+        rows = []
+        texts = []
+        for job in jobs:
+            prompt_family = job.prompt_family or job.video.best_prompt_family
+            chunks = self.chunk_transcript(job.transcript_file_path)
+            if chunks:
+                all_prompts = [
+                    self.render_chunk_prompts(
+                        job.video, chunk, len(chunks), job.prompt_language_code
+                    )
+                    for chunk in chunks
+                ]
+            else:
+                all_prompts = [
+                    self.render_prompts(
+                        job.video,
+                        job.transcript_file_path,
+                        job.prompt_language_code,
+                        prompt_family,
+                    )
+                ]
+            for prompts in all_prompts:
+                rows.append(
+                    {
+                        "video_id": job.video.video_id,
+                        "language_code": job.prompt_language_code,
+                        "prompt_family": prompt_family,
+                    }
+                )
+                texts.append(prompts["user"] + prompts.get("assistant", ""))
+
+        columns = ["video_id", "language_code", "prompt_family"]
+        df = pd.DataFrame(rows, columns=columns)
+        df["prompt_tokens"] = count_tokens_batch(texts)
+        plan = df.groupby(columns).agg(
+            requests=("prompt_tokens", "size"),
+            prompt_tokens=("prompt_tokens", "sum"),
+        )
+        print(
+            f"Plan: {len(plan)} videos, {plan['requests'].sum()} requests, "
+            f"{plan['prompt_tokens'].sum()} prompt tokens"
+        )
+        return plan
+
+    def summarize_many(
+        self,
+        jobs: list[SummaryJob],
+        *,
+        max_attempts: int = 5,
+        backoff_seconds: float = 10.0,
+        key_info_interval_seconds: float = 60.0,
+    ) -> list[dict[str, Path]]:
+        # Run the jobs concurrently. The number of requests actually in flight
+        # is governed by the proxy's limiter, if any; otherwise, one at a time.
+        # A rate-limited job is retried with an exponential backoff (or until
+        # the announced reset) instead of aborting the whole batch. Rate limits
+        # also refresh the key info (at most once per interval), as the limits
+        # of the key may have changed. Any other error fails its job only.
+        limiter = self.proxy.limiter
+        max_workers = limiter.max_limit if limiter is not None else 1
+        key_info_checked_at = [time.monotonic()]
+        key_info_lock = threading.Lock()
+
+        def refresh_limits():
+            with key_info_lock:
+                if (
+                    time.monotonic() - key_info_checked_at[0]
+                    < key_info_interval_seconds
+                ):
+                    return
+                key_info_checked_at[0] = time.monotonic()
+            self.proxy.refresh_limits(max_workers)
+
+        # The job ledger, if any, tracks the jobs across runs: completed or
+        # permanently failed jobs are skipped, each run counts as an attempt.
+        ledger = None if self.dry_run else self.job_ledger
+
+        def run(idx: int, job: SummaryJob) -> dict[str, Path] | None:
+            key = job.job_key()
+            if ledger is not None:
+                if not ledger.should_run(key):
+                    print(f"[SKIP] {key} according to the job ledger")
+                    return None
+                ledger.start(key)
+            result = run_attempts(idx, job)
+            if ledger is not None:
+                if isinstance(result, Exception):
+                    ledger.fail(key, type(result).__name__)
+                else:
+                    ledger.succeed(key)
+            return None if isinstance(result, Exception) else result
+
+        def run_attempts(
+            idx: int, job: SummaryJob
+        ) -> dict[str, Path] | None | Exception:
+            error: Exception | None = None
+            for attempt in range(1, max_attempts + 1):
+                print(f"{idx:05d}/{len(jobs):05d} (attempt {attempt})", job)
+                try:
+                    return self.summarize_with_ai(
+                        job.video,
+                        job.transcript_file_path,
+                        job.llm_output_dir_path,
+                        job.prompt_language_code,
+                        job.prompt_family,
+                    )
+                except OpenRouterRateLimitExceeded as rate_limit_error:
+                    error = rate_limit_error
+                    delay = render_retry_delay(
+                        rate_limit_error, attempt, backoff_seconds
+                    )
+                    print(
+                        f"[WAIT] Rate limited, retry {job.video.video_id} in {delay:.0f}s"
+                    )
+                    refresh_limits()
+                    time.sleep(delay)
+                except (
+                    OpenRouterRequestFailed,
+                    OpenRouterStreamInterrupted,
+                ) as request_error:
+                    print(f"[ NOK] {job.video.video_id} failed: {request_error}")
+                    return request_error
+                except Exception as unexpected_error:
+                    # e.g. a connection error, or a response without choices:
+                    # the results of the other jobs are kept.
+                    print(
+                        f"[ NOK] {job.video.video_id} failed: "
+                        f"{type(unexpected_error).__name__}: {unexpected_error}"
+                    )
+                    return unexpected_error
+            print(f"[ NOK] {job.video.video_id} still rate limited, giving up")
+            return error
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(run, range(1, len(jobs) + 1), jobs))
+        if self.proxy.response_cache is not None:
+            self.proxy.response_cache.evict()
+            print(f"Response cache: {self.proxy.response_cache.stats.report()}")
+        return [result for result in results if result is not None]
+
     def render_prompts(
         self,
         video: VideoModel,
@@ -261,13 +930,13 @@ class AiSummarizer:
         prompt_language_code: str,
         prompt_family: str,
     ) -> PromptsDictType:
-        print(f"Generating summary for transcript: {transcript_file_path}")
-
         prompts = self.get_prompts_for_language_and_family(
             prompt_language_code, prompt_family
         )
 
-        transcript_full_text = load_transcript_full_text(transcript_file_path)
+        transcript_full_text = load_transcript_full_text(
+            transcript_file_path, store=self.transcript_store
+        )
 
         prompts: PromptsDictType
         if prompt_family == "basic":
@@ -290,6 +959,48 @@ class AiSummarizer:
 
         raise ValueError("Formatting for this prompt family is not supported yet.")
 
+    def render_chunk_prompts(
+        self,
+        video: VideoModel,
+        chunk: TranscriptChunk,
+        chunk_count: int,
+        prompt_language_code: str,
+    ) -> PromptsDictType:
+        prompts = self.get_prompts_for_language_and_family(
+            prompt_language_code, "chunk"
+        )
+        return {
+            "user": prompts["user"].format(
+                video_transcript=chunk.text,
+                video_title=video.title or "",
+                chunk_number=chunk.index + 1,
+                chunk_count=chunk_count,
+                chunk_start=render_timecode(chunk.start_seconds),
+                chunk_end=render_timecode(chunk.end_seconds),
+            ),
+            "assistant": prompts["assistant"],
+        }
+
+    def render_reduce_prompts(
+        self,
+        video: VideoModel,
+        chunk_products: list[dict],
+        prompt_language_code: str,
+    ) -> PromptsDictType:
+        prompts = self.get_prompts_for_language_and_family(
+            prompt_language_code, "reduce"
+        )
+        chunk_summaries = "\n\n---\n\n".join(
+            product["response"]["choices"][0]["message"]["content"]
+            for product in chunk_products
+        )
+        return {
+            "user": prompts["user"].format(
+                chunk_summaries=chunk_summaries, video_title=video.title or ""
+            ),
+            "assistant": prompts["assistant"],
+        }
+
     def get_prompts_for_language_and_family(
         self, prompt_language_code: str, prompt_family: str
     ) -> PromptsDictType:
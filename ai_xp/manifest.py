@@ -0,0 +1,295 @@
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Literal, Self
+
+import pandas as pd
+
+from ai_xp.llm_proxy import AiSummaryPath
+from ai_xp.scrapper import MetadataPath
+from ai_xp.transcript import TranscriptPath
+
+ArtifactKind = Literal["metadata", "transcript", "llm_output"]
+
+# Columns stored for each kind of artifact, in the order of the parsed filename.
+# The "path" and "directory" columns are stored in addition to these.
+MANIFEST_COLUMNS: dict[ArtifactKind, tuple[str, ...]] = {
+    "metadata": ("video_id", "title_slug", "status", "extension"),
+    "transcript": (
+        "language_code",
+        "source",
+        "video_id",
+        "title_slug",
+        "status",
+        "extension",
+    ),
+    "llm_output": (
+        "timestamp",
+        "prompt_family",
+        "language_code",
+        "source",
+        "video_id",
+        "title_slug",
+        "status",
+        "extension",
+    ),
+}
+
+MANIFEST_SUFFIXES: dict[ArtifactKind, str] = {
+    "metadata": ".json",
+    "transcript": ".json",
+    "llm_output": ".md",
+}
+
+
+# Name of the time-identified LLM output folders, see render_timestamp_slug.
+TIME_ID_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}-\d{2}-\d{2}-\d{1,6}")
+
+
+def is_manifest_path(kind: ArtifactKind, path: Path) -> bool:
+    # LLM outputs are only listed in their time-identified folder, whose name
+    # is their timestamp: stray files, e.g. in the root, are not artifacts.
+    return (
+        kind != "llm_output" or TIME_ID_PATTERN.fullmatch(path.parent.name) is not None
+    )
+
+
+def parse_metadata_path(path: Path) -> dict[str, str]:
+    return MetadataPath.from_path(path).asdict()
+
+
+def parse_transcript_path(path: Path) -> dict[str, str]:
+    return TranscriptPath.from_path(path).asdict()
+
+
+def parse_llm_output_path(path: Path) -> dict[str, str]:
+    # The timestamp is the name of the time-identified subfolder.
+    return {"timestamp": path.parent.name, **AiSummaryPath.from_path(path).asdict()}
+
+
+MANIFEST_PARSERS: dict[ArtifactKind, Callable[[Path], dict[str, str]]] = {
+    "metadata": parse_metadata_path,
+    "transcript": parse_transcript_path,
+    "llm_output": parse_llm_output_path,
+}
+
+
+@dataclass(kw_only=True, frozen=True)
+class FileManifest:
+    """
+    On-disk SQLite manifest of the artifacts written into the generated directories.
+
+    The manifest stores the parsed filename of every artifact, so opening the
+    database does not require globbing and parsing every file again. Writers
+    record their artifacts as they go, and ``reconcile`` only lists the
+    directories whose mtime changed since the last pass, to catch files that
+    were added or removed outside of this code.
+    """
+
+    path: Path
+    metadata_dir_path: Path
+    transcript_dir_path: Path
+    llm_output_dir_path: Path
+    connection: sqlite3.Connection = field(repr=False)
+    # The manifest can be written to from worker threads.
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @classmethod
+    def open(
+        cls,
+        path: Path,
+        *,
+        metadata_dir_path: Path,
+        transcript_dir_path: Path,
+        llm_output_dir_path: Path,
+    ) -> Self:
+        path.parent.mkdir(exist_ok=True, parents=True)
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        instance = cls(
+            path=path,
+            metadata_dir_path=metadata_dir_path,
+            transcript_dir_path=transcript_dir_path,
+            llm_output_dir_path=llm_output_dir_path,
+            connection=connection,
+        )
+        instance._create_tables()
+        return instance
+
+    def _create_tables(self):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS directories "
+                "(path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL)"
+            )
+            for kind, columns in MANIFEST_COLUMNS.items():
+                self.connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {kind} "
+                    f"(path TEXT PRIMARY KEY, directory TEXT NOT NULL, "
+                    f"{', '.join(f'{c} TEXT NOT NULL' for c in columns)})"
+                )
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {kind}_directory ON {kind} (directory)"
+                )
+
+    def close(self):
+        self.connection.close()
+
+    def record(self, kind: ArtifactKind, path: Path):
+        """Insert (or replace) a freshly written artifact into the manifest."""
+        self.record_many(kind, [path])
+
+    def record_many(self, kind: ArtifactKind, paths: list[Path]):
+        for path in paths:
+            if not is_manifest_path(kind, path):
+                print(f"[WARN] Not recorded, outside a time-identified folder: {path}")
+        paths = [path for path in paths if is_manifest_path(kind, path)]
+        parse = MANIFEST_PARSERS[kind]
+        columns = ("path", "directory", *MANIFEST_COLUMNS[kind])
+        rows = [(str(path), str(path.parent), *parse(path).values()) for path in paths]
+        with self.lock, self.connection:
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO {kind} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                rows,
+            )
+
+    def forget(self, kind: ArtifactKind, path: Path):
+        """Remove an artifact that was deleted from disk."""
+        with self.lock, self.connection:
+            self.connection.execute(f"DELETE FROM {kind} WHERE path = ?", (str(path),))
+
+    def reconcile(self) -> dict[ArtifactKind, int]:
+        """
+        Synchronize the manifest with the filesystem.
+
+        Only the directories whose mtime changed are listed. A directory mtime
+        changes when a file is created, renamed or removed inside it, which are
+        exactly the events that can make the manifest stale.
+        """
+        return {
+            "metadata": self._reconcile_tree("metadata", self.metadata_dir_path),
+            "transcript": self._reconcile_tree("transcript", self.transcript_dir_path),
+            "llm_output": self._reconcile_tree("llm_output", self.llm_output_dir_path),
+        }
+
+    def _reconcile_tree(self, kind: ArtifactKind, root: Path) -> int:
+        # Artifacts are in the root (flat layout) or in its subfolders: the
+        # shards of the sharded layout, the time-identified LLM output folders.
+        # The root mtime is taken before its subfolders are listed, and that
+        # value is stored: a subfolder created meanwhile changes the mtime
+        # again, so it is listed on the next pass instead of being missed.
+        root_mtime_ns = _mtime_ns(root)
+        subdirectories = self._subdirectories(root, root_mtime_ns)
+        return self._reconcile_directory(kind, root, root_mtime_ns) + sum(
+            self._reconcile_directory(kind, directory) for directory in subdirectories
+        )
+
+    def _subdirectories(self, root: Path, root_mtime_ns: int | None) -> list[Path]:
+        # The root directory mtime tells whether subfolders were added or removed.
+        known = [
+            Path(p)
+            for (p,) in self.connection.execute(
+                "SELECT path FROM directories WHERE path LIKE ? || '/%'",
+                (str(root),),
+            )
+        ]
+        if self._stored_mtime_ns(root) == root_mtime_ns and root.is_dir():
+            return known
+        listed = (
+            [Path(entry.path) for entry in os.scandir(root) if entry.is_dir()]
+            if root.is_dir()
+            else []
+        )
+        # Known but removed subfolders must be reconciled too, to drop their rows.
+        return sorted(set(known) | set(listed))
+
+    def _stored_mtime_ns(self, directory: Path) -> int | None:
+        row = self.connection.execute(
+            "SELECT mtime_ns FROM directories WHERE path = ?", (str(directory),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _store_mtime_ns(self, directory: Path, mtime_ns: int | None):
+        with self.lock, self.connection:
+            if mtime_ns is None:
+                self.connection.execute(
+                    "DELETE FROM directories WHERE path = ?", (str(directory),)
+                )
+            else:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO directories (path, mtime_ns) VALUES (?, ?)",
+                    (str(directory), mtime_ns),
+                )
+
+    def _reconcile_directory(
+        self, kind: ArtifactKind, directory: Path, mtime_ns: int | None = None
+    ) -> int:
+        # mtime_ns, if given, must have been taken before this call.
+        if mtime_ns is None:
+            mtime_ns = _mtime_ns(directory)
+        if mtime_ns is not None and self._stored_mtime_ns(directory) == mtime_ns:
+            return 0
+
+        suffix = MANIFEST_SUFFIXES[kind]
+        on_disk = (
+            {
+                entry.path
+                for entry in os.scandir(directory)
+                if entry.name.endswith(suffix)
+                and entry.is_file()
+                and is_manifest_path(kind, Path(entry.path))
+            }
+            if mtime_ns is not None
+            else set()
+        )
+        in_manifest = {
+            p
+            for (p,) in self.connection.execute(
+                f"SELECT path FROM {kind} WHERE directory = ?", (str(directory),)
+            )
+        }
+        added = sorted(on_disk - in_manifest)
+        removed = sorted(in_manifest - on_disk)
+
+        self.record_many(kind, [Path(p) for p in added])
+        with self.lock, self.connection:
+            self.connection.executemany(
+                f"DELETE FROM {kind} WHERE path = ?", ((p,) for p in removed)
+            )
+        self._store_mtime_ns(directory, mtime_ns)
+        return len(added) + len(removed)
+
+    def _read_dataframe(self, kind: ArtifactKind) -> pd.DataFrame:
+        columns = (*MANIFEST_COLUMNS[kind], "path")
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(columns)} FROM {kind} ORDER BY path", self.connection
+        )
+        df["path"] = [Path(p) for p in df["path"]]
+        return df
+
+    def metadata_dataframe(self) -> pd.DataFrame:
+        return self._read_dataframe("metadata").set_index("video_id")
+
+    def transcript_dataframe(self) -> pd.DataFrame:
+        return self._read_dataframe("transcript").set_index(
+            ["language_code", "source", "video_id"]
+        )
+
+    def llm_output_dataframe(self) -> pd.DataFrame:
+        df = self._read_dataframe("llm_output")
+        df["timestamp"] = pd.to_datetime(df["timestamp"], format="%Y-%m-%dT%H-%M-%S-%f")
+        return df.set_index(
+            ["prompt_family", "language_code", "source", "timestamp", "video_id"]
+        )
+
+
+def _mtime_ns(directory: Path) -> int | None:
+    try:
+        return directory.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,215 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import cache
+from pathlib import Path
+from typing import Any, Iterator
+
+# Seconds: from a cached response to a long generation.
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+LabelsType = tuple[tuple[str, str], ...]
+
+METRIC_HELP = {
+    "ai_xp_stage_seconds": "Duration of the spans of a pipeline stage.",
+    "ai_xp_stage_total": "Spans of a pipeline stage, per status.",
+    "ai_xp_stage_bytes_total": "Bytes handled by the spans of a pipeline stage.",
+    "ai_xp_llm_tokens_total": "LLM tokens of a pipeline stage, per kind.",
+    "ai_xp_rate_limit_wait_seconds": "Wait for the rate limiter before a request.",
+}
+
+
+def render_labels(labels: LabelsType) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+@dataclass(kw_only=True)
+class Histogram:
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    bucket_counts: list[int] = field(default_factory=list)
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def __post_init__(self):
+        self.bucket_counts = [0] * len(self.buckets)
+
+    def observe(self, value: float):
+        # Each bucket counts the values lower than or equal to its bound.
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[index] += 1
+
+
+@dataclass(kw_only=True)
+class Span:
+    """One unit of work of a stage, e.g. the transcript fetch of a video."""
+
+    stage: str
+    video_id: str | None = None
+    status: str = "ok"
+    bytes: int = 0
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.time)
+    start: float = field(default_factory=time.perf_counter)
+    seconds: float | None = None
+
+    def asdict(self) -> dict[str, Any]:
+        return {
+            "time": self.started_at,
+            "stage": self.stage,
+            "video_id": self.video_id,
+            "status": self.status,
+            "seconds": self.seconds,
+            "bytes": self.bytes,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            **self.attributes,
+        }
+
+
+@dataclass(kw_only=True, frozen=True)
+class MetricsRegistry:
+    """
+    Counters, histograms and spans of the pipeline stages.
+
+    Every span (metadata fetch, transcript fetch, prompt render, LLM call,
+    file write...) updates the per-stage counters and latency histogram and,
+    with ``events_path``, is appended as a JSON line with its video id,
+    status, bytes and tokens. ``flush`` writes the counters and histograms in
+    the Prometheus text format to ``prometheus_path``, for the node exporter
+    textfile collector.
+    """
+
+    events_path: Path | None = None
+    prometheus_path: Path | None = None
+    counters: dict[tuple[str, LabelsType], float] = field(
+        default_factory=dict, repr=False
+    )
+    histograms: dict[tuple[str, LabelsType], Histogram] = field(
+        default_factory=dict, repr=False
+    )
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    @contextmanager
+    def span(self, stage: str, *, video_id: str | None = None) -> Iterator[Span]:
+        # The status is set by the caller; an exception sets it to its name.
+        span = Span(stage=stage, video_id=video_id)
+        try:
+            yield span
+        except BaseException as error:
+            if span.status == "ok":
+                span.status = type(error).__name__
+            raise
+        finally:
+            self.record(span)
+
+    def record(self, span: Span):
+        span.seconds = time.perf_counter() - span.start
+        self.observe("ai_xp_stage_seconds", span.seconds, stage=span.stage)
+        self.inc("ai_xp_stage_total", stage=span.stage, status=span.status)
+        if span.bytes:
+            self.inc("ai_xp_stage_bytes_total", span.bytes, stage=span.stage)
+        for kind, tokens in (
+            ("prompt", span.prompt_tokens),
+            ("completion", span.completion_tokens),
+        ):
+            if tokens:
+                self.inc("ai_xp_llm_tokens_total", tokens, stage=span.stage, kind=kind)
+        if self.events_path is not None:
+            line = json.dumps(span.asdict(), ensure_ascii=False, default=str) + "\n"
+            with self.lock:
+                self.events_path.parent.mkdir(exist_ok=True, parents=True)
+                with self.events_path.open("a") as fp:
+                    fp.write(line)
+
+    def to_prometheus(self) -> str:
+        # One block per metric family: its HELP and TYPE, then its samples.
+        families: dict[str, tuple[str, list[str]]] = {}
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+        for (name, labels), value in counters:
+            _, samples = families.setdefault(name, ("counter", []))
+            samples.append(f"{name}{render_labels(labels)} {value:g}")
+        for (name, labels), histogram in histograms:
+            _, samples = families.setdefault(name, ("histogram", []))
+            # Bucket counts are cumulative, as Prometheus expects.
+            for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                bucket_labels = (*labels, ("le", f"{bound:g}"))
+                samples.append(f"{name}_bucket{render_labels(bucket_labels)} {count}")
+            inf_labels = (*labels, ("le", "+Inf"))
+            samples.append(
+                f"{name}_bucket{render_labels(inf_labels)} {histogram.count}"
+            )
+            samples.append(f"{name}_sum{render_labels(labels)} {histogram.total:g}")
+            samples.append(f"{name}_count{render_labels(labels)} {histogram.count}")
+        lines = []
+        for name, (kind, samples) in sorted(families.items()):
+            if name in METRIC_HELP:
+                lines.append(f"# HELP {name} {METRIC_HELP[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines += samples
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        if self.prometheus_path is None:
+            return
+        # Write then rename: the collector never reads a partial file.
+        self.prometheus_path.parent.mkdir(exist_ok=True, parents=True)
+        tmp_path = self.prometheus_path.with_name(
+            f"{self.prometheus_path.name}.{os.getpid()}.tmp"
+        )
+        tmp_path.write_text(self.to_prometheus())
+        tmp_path.replace(self.prometheus_path)
+
+    def report(self) -> str:
+        """Spans, mean and max latency per stage, then outcomes per stage."""
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+        lines = [
+            f"{dict(labels)['stage']}: {histogram.count} spans, "
+            f"mean {histogram.total / histogram.count:.3f} s, "
+            f"max {histogram.max:.3f} s, total {histogram.total:.1f} s"
+            for (name, labels), histogram in histograms
+            if name == "ai_xp_stage_seconds"
+        ]
+        lines += [
+            f"{dict(labels)['stage']} {dict(labels)['status']}: {value:g}"
+            for (name, labels), value in counters
+            if name == "ai_xp_stage_total"
+        ]
+        return "\n".join(lines)
+
+
+@cache
+def default_metrics() -> MetricsRegistry:
+    # Process-wide registry, in memory only, when none is configured.
+    return MetricsRegistry()
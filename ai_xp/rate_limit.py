@@ -0,0 +1,235 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Iterable, TypeVar
+
+if TYPE_CHECKING:
+    from ai_xp.metrics import MetricsRegistry
+
+ItemType = TypeVar("ItemType")
+ResultType = TypeVar("ResultType")
+
+
+@dataclass(kw_only=True)
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens are refilled continuously at ``rate`` tokens per second, up to
+    ``burst`` tokens. A caller only sleeps when the bucket is empty.
+    """
+
+    rate: float
+    burst: int = 1
+    tokens: float = field(init=False)
+    updated_at: float = field(init=False)
+    idle_seconds: float = field(default=0.0, init=False)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __post_init__(self):
+        if self.rate <= 0:
+            raise ValueError(f"The rate must be positive, got {self.rate}")
+        if self.burst < 1:
+            raise ValueError(f"The burst must be at least 1, got {self.burst}")
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self) -> float:
+        """Take one token, waiting if needed. Return the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill(time.monotonic())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.idle_seconds += waited
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def try_acquire(self) -> bool:
+        """Take one token if there is one, without waiting."""
+        with self.lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+@dataclass(kw_only=True)
+class RunStats:
+    """Throughput statistics of a rate-limited run."""
+
+    label: str
+    total: int
+    workers: int = 1
+    succeeded: int = 0
+    failed: int = 0
+    # Summed over all the workers, see idle_seconds_per_worker.
+    idle_seconds: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def done(self) -> int:
+        return self.succeeded + self.failed
+
+    @property
+    def videos_per_second(self) -> float:
+        return self.done / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def idle_seconds_per_worker(self) -> float:
+        return self.idle_seconds / self.workers
+
+    def stop(self):
+        self.elapsed_seconds = time.monotonic() - self.started_at
+
+    def report(self) -> str:
+        return (
+            f"[STATS] {self.label}: {self.done}/{self.total} videos "
+            f"({self.succeeded} succeeded, {self.failed} failed) "
+            f"in {self.elapsed_seconds:.1f}s, "
+            f"{self.videos_per_second:.2f} videos/s, "
+            f"{self.idle_seconds_per_worker:.1f}s idle per worker "
+            "waiting for the rate limiter"
+        )
+
+
+def run_rate_limited(
+    items: Iterable[ItemType],
+    function: Callable[[ItemType], ResultType | None],
+    *,
+    bucket: TokenBucket,
+    max_workers: int,
+    label: str,
+    metrics: "MetricsRegistry | None" = None,
+    is_success: Callable[[ResultType], bool] | None = None,
+) -> tuple[list[ResultType], RunStats]:
+    """
+    Apply ``function`` to every item with a bounded worker pool.
+
+    Each call first takes a token from the bucket, the wait is observed in
+    ``metrics`` if given. A ``None`` result or an exception counts as a
+    failure of its item only, any other result is collected. Collected
+    results count as successes unless ``is_success`` tells otherwise, e.g.
+    for written error artifacts.
+    """
+    items = list(items)
+    stats = RunStats(label=label, total=len(items), workers=max_workers)
+    idle_before = bucket.idle_seconds
+    results: list[ResultType] = []
+
+    def task(item: ItemType) -> ResultType | None:
+        waited = bucket.acquire()
+        if metrics is not None:
+            metrics.observe("ai_xp_rate_limit_wait_seconds", waited, stage=label)
+        return function(item)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {executor.submit(task, item): item for item in items}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as error:
+                print(
+                    f"[ NOK] {label} {futures[future]} failed: "
+                    f"{type(error).__name__}: {error}"
+                )
+                result = None
+            if result is None:
+                stats.failed += 1
+                continue
+            results.append(result)
+            if is_success is None or is_success(result):
+                stats.succeeded += 1
+            else:
+                stats.failed += 1
+            print(f"{label} {stats.done}/{stats.total}")
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        stats.idle_seconds = bucket.idle_seconds - idle_before
+        stats.stop()
+        print(stats.report())
+    return results, stats
+
+
+@dataclass(kw_only=True)
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limit that adapts to the feedback of a rate-limited service.
+
+    The limit grows by one after each success (additive increase) and is
+    halved after each rate limit (multiplicative decrease). When the service
+    tells how many requests remain before a reset time, new requests are held
+    until the reset once the remaining budget is exhausted. The limit starts
+    at ``initial_limit``, by default ``min_limit``.
+    """
+
+    max_limit: int
+    min_limit: int = 1
+    initial_limit: int | None = None
+    limit: int = field(init=False)
+    in_flight: int = field(default=0, init=False)
+    paused_until: float = field(default=0.0, init=False)
+    condition: threading.Condition = field(
+        default_factory=threading.Condition, repr=False
+    )
+
+    def __post_init__(self):
+        if not 1 <= self.min_limit <= self.max_limit:
+            raise ValueError(
+                f"Expected 1 <= min_limit <= max_limit, "
+                f"got {self.min_limit} and {self.max_limit}"
+            )
+        initial_limit = self.initial_limit or self.min_limit
+        self.limit = min(self.max_limit, max(self.min_limit, initial_limit))
+
+    def acquire(self):
+        """Wait until a request can be sent, then count it as in flight."""
+        with self.condition:
+            while True:
+                pause = self.paused_until - time.time()
+                if pause > 0:
+                    self.condition.wait(pause)
+                elif self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                else:
+                    self.condition.wait()
+
+    def release(self):
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def set_max_limit(self, max_limit: int):
+        with self.condition:
+            self.max_limit = max(self.min_limit, max_limit)
+            self.limit = min(self.limit, self.max_limit)
+            self.condition.notify_all()
+
+    def on_success(self, remaining: int | None = None, reset_at: float | None = None):
+        with self.condition:
+            if remaining is not None and remaining <= self.in_flight:
+                # The budget is about to be exhausted: do not grow, and hold
+                # new requests until the reset if it is known.
+                if remaining <= 0 and reset_at is not None:
+                    self.paused_until = max(self.paused_until, reset_at)
+                return
+            self.limit = min(self.max_limit, self.limit + 1)
+            self.condition.notify_all()
+
+    def on_rate_limited(self, reset_at: float | None = None):
+        with self.condition:
+            self.limit = max(self.min_limit, self.limit // 2)
+            if reset_at is not None:
+                self.paused_until = max(self.paused_until, reset_at)
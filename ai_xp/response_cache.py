@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+@dataclass(kw_only=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    def report(self) -> str:
+        lookups = self.hits + self.misses
+        hit_ratio = self.hits / lookups if lookups else 0.0
+        return (
+            f"{self.hits} hits, {self.misses} misses ({hit_ratio:.0%} hit ratio), "
+            f"{self.writes} writes, {self.evictions} evictions"
+        )
+
+
+def render_cache_key(model: str, messages: list[dict[str, str]]) -> str:
+    # The messages are the rendered prompts: same model and prompts, same key.
+    payload = json.dumps(
+        {"model": model, "messages": messages}, sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass(kw_only=True, frozen=True)
+class ResponseCache:
+    """
+    On-disk cache of the LLM responses, addressed by the hash of the request.
+
+    Each response is stored as a JSON file named after the SHA-256 of the
+    model and messages. Entries older than ``max_age_seconds`` are ignored,
+    and the least recently used entries are evicted once the cache grows
+    above ``max_bytes``. Only successful responses should be stored.
+    """
+
+    root: Path
+    max_bytes: int = 512 * 1024 * 1024
+    max_age_seconds: float | None = 30 * 24 * 3600
+    stats: CacheStats = field(default_factory=CacheStats)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def _path(self, key: str) -> Path:
+        # Two-level layout, to keep directories small.
+        return self.root / key[:2] / f"{key}.json"
+
+    def _is_expired(self, mtime: float) -> bool:
+        return (
+            self.max_age_seconds is not None
+            and time.time() - mtime > self.max_age_seconds
+        )
+
+    def get(self, key: str) -> dict | None:
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            if self._is_expired(stat.st_mtime):
+                raise FileNotFoundError(path)
+            response_dict = json.loads(path.read_text())
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            with self.lock:
+                self.stats.misses += 1
+            return None
+        # Touch the entry: eviction removes the least recently used first.
+        os.utime(path)
+        with self.lock:
+            self.stats.hits += 1
+        return response_dict
+
+    def put(self, key: str, response_dict: dict):
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True, parents=True)
+        # Write then rename, so a concurrent reader never sees a partial entry.
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(response_dict, ensure_ascii=False))
+        tmp_path.replace(path)
+        with self.lock:
+            self.stats.writes += 1
+
+    def evict(self) -> int:
+        """Remove the expired entries, then the oldest ones above max_bytes."""
+        if not self.root.is_dir():
+            return 0
+        entries = []
+        for path in self.root.glob("*/*.json"):
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total_bytes = sum(size for _, size, _ in entries)
+        evicted = 0
+        for mtime, size, path in entries:
+            if not self._is_expired(mtime) and total_bytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+            evicted += 1
+        with self.lock:
+            self.stats.evictions += evicted
+        return evicted
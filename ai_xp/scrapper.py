@@ -1,61 +1,108 @@
+import html
 import json
 import re
 from dataclasses import asdict, dataclass
+from functools import cached_property
 from pathlib import Path
-from typing import Literal, Self
-
-from bs4 import BeautifulSoup
+from typing import TYPE_CHECKING, Any, Literal, Self
 
+from ai_xp.http_client import default_http_client
 from ai_xp.transcript import extract_video_id
 from ai_xp.utils import render_title_slug, render_video_url
 
+if TYPE_CHECKING:
+    import requests
+    from bs4 import BeautifulSoup
+
+
+PLAYER_RESPONSE_MARKER = "var ytInitialPlayerResponse = "
+INNERTUBE_API_KEY_PATTERN = re.compile(r'"INNERTUBE_API_KEY":\s*"([a-zA-Z0-9_-]+)"')
+# "<title" followed by attributes or ">", not e.g. "<titlefoo>".
+TITLE_PATTERN = re.compile(
+    r"<title(?:\s[^>]*)?>(.*?)</title>", re.DOTALL | re.IGNORECASE
+)
+
 
 @dataclass(frozen=True, kw_only=True)
 class YouTubeHtmlScrapper:
-    soup: BeautifulSoup
+    html: str
     url: str
     # Regex courtesy of
     # https://stackoverflow.com/questions/1060616/how-can-regex-ignore-escaped-quotes-when-matching-strings
     string_extraction_pattern = r'"((?:\\\\|\\"|[^"])*+)"'
 
+    @cached_property
+    def soup(self) -> "BeautifulSoup":
+        # Full parse, only done on demand: the metadata is extracted from the
+        # raw text directly.
+        from bs4 import BeautifulSoup
+
+        return BeautifulSoup(self.html, features="html.parser")
+
     @classmethod
     def _from_path(cls, path: Path):
-        soup = BeautifulSoup(path.read_text(), features="html.parser")
-        return cls(soup=soup, url="")
+        return cls(html=path.read_text(), url="")
 
     @classmethod
-    def from_video_id(cls, video_id: str) -> Self | None:
-        return cls.from_url(render_video_url(video_id))
+    def from_video_id(
+        cls, video_id: str, *, http_client: "requests.Session | None" = None
+    ) -> Self | None:
+        return cls.from_url(render_video_url(video_id), http_client=http_client)
 
     @classmethod
-    def from_url(cls, url: str) -> Self | None:
+    def from_url(
+        cls, url: str, *, http_client: "requests.Session | None" = None
+    ) -> Self | None:
         import requests
 
+        http_client = http_client or default_http_client()
         try:
-            response = requests.get(url)
+            response = http_client.get(url)
             response.raise_for_status()  # Raise an error for bad status codes
         except requests.exceptions.RequestException as e:
             print(f"Failed to fetch URL: {e}")
             return None
 
-        soup = BeautifulSoup(response.text, features="html.parser")
-        instance = cls(soup=soup, url=url)
+        instance = cls(html=response.text, url=url)
         return instance
 
     def title(self) -> str:
-        return str(self.soup.title.text).removesuffix(" - YouTube")
+        match = TITLE_PATTERN.search(self.html)
+        if match is None:
+            # Same error as the soup-based lookup used to raise.
+            raise AttributeError("'NoneType' object has no attribute 'text'")
+        return html.unescape(match.group(1)).removesuffix(" - YouTube")
+
+    def player_response_script(self) -> str:
+        # Text of the script assigning ytInitialPlayerResponse, from the
+        # assignment to the end of the script.
+        start = self.html.find(PLAYER_RESPONSE_MARKER)
+        if start == -1:
+            return ""
+        end = self.html.find("</script>", start)
+        return self.html[start : end if end != -1 else len(self.html)]
+
+    def player_response(self) -> dict[str, Any]:
+        # Only works when fetching the HTML automatically, not manually from
+        # source (the object is then not JSON). Only the object itself is
+        # decoded, not the rest of the page.
+        start = self.html.find(PLAYER_RESPONSE_MARKER)
+        if start == -1:
+            # Advertisements have no player response.
+            raise json.decoder.JSONDecodeError(
+                "ytInitialPlayerResponse not found", self.html, 0
+            )
+        obj, _ = json.JSONDecoder().raw_decode(
+            self.html, start + len(PLAYER_RESPONSE_MARKER)
+        )
+        return obj
 
     def short_description(self, *, mode: Literal["json", "regex"] = "json") -> str:
-        script_text = self.soup.body.script.text.replace("\n", "")
-
         if mode == "regex":
+            script_text = self.player_response_script().replace("\n", "")
             return self.try_to_extract_short_description_with_regex(script_text)
         elif mode == "json":
-            # Only works when fetching the HTML automatically, not manually from source.
-            obj = json.loads(
-                script_text.removeprefix("var ytInitialPlayerResponse = ")[:-1]
-            )
-            return obj["videoDetails"]["shortDescription"]
+            return self.player_response()["videoDetails"]["shortDescription"]
 
         raise NotImplementedError
 
@@ -72,13 +119,78 @@ class YouTubeHtmlScrapper:
                 pass
         return ""
 
-    def to_dict(self, *, mode: Literal["json", "regex"] = "json") -> dict[str, str]:
-        return {"title": self.title(), "description": self.short_description(mode=mode)}
+    def innertube_api_key(self) -> str | None:
+        # Key of the internal API the transcript listing goes through.
+        match = INNERTUBE_API_KEY_PATTERN.search(self.html)
+        return match.group(1) if match else None
+
+    def to_dict(self, *, mode: Literal["json", "regex"] = "json") -> dict[str, Any]:
+        if mode == "regex":
+            return {
+                "title": self.title(),
+                "description": self.short_description(mode=mode),
+            }
+        # The player response also tells which captions exist, so that the
+        # transcript stage does not have to fetch the watch page again.
+        player_response = self.player_response()
+        return {
+            "title": self.title(),
+            "description": player_response["videoDetails"]["shortDescription"],
+            "video_facts": extract_video_facts(player_response),
+            "caption_tracks": extract_caption_tracks(player_response),
+            # e.g. "OK", "LOGIN_REQUIRED": only a playable page tells whether
+            # the captions are disabled.
+            "playability_status": player_response.get("playabilityStatus", {}).get(
+                "status"
+            ),
+            "innertube_api_key": self.innertube_api_key(),
+        }
 
     def to_json(self, *, mode: Literal["json", "regex"] = "json") -> str:
         return json.dumps(self.to_dict(), ensure_ascii=False)
 
 
+def extract_video_facts(player_response: dict[str, Any]) -> dict[str, Any]:
+    details = player_response["videoDetails"]
+    microformat = player_response.get("microformat", {}).get(
+        "playerMicroformatRenderer", {}
+    )
+    length_seconds = details.get("lengthSeconds")
+    view_count = details.get("viewCount")
+    return {
+        "channel": details.get("author"),
+        "channel_id": details.get("channelId"),
+        "length_seconds": int(length_seconds) if length_seconds else None,
+        "view_count": int(view_count) if view_count else None,
+        "is_live_content": details.get("isLiveContent"),
+        "publish_date": microformat.get("publishDate"),
+        "category": microformat.get("category"),
+    }
+
+
+def extract_caption_tracks(player_response: dict[str, Any]) -> list[dict[str, Any]]:
+    # Empty when the captions are disabled.
+    renderer = player_response.get("captions", {}).get(
+        "playerCaptionsTracklistRenderer", {}
+    )
+    tracks = []
+    for track in renderer.get("captionTracks", []):
+        name = track.get("name", {})
+        tracks.append(
+            {
+                "language_code": track["languageCode"],
+                "name": name.get("simpleText")
+                or "".join(run.get("text", "") for run in name.get("runs", [])),
+                # Same naming as TranscriptPath.source
+                "source": (
+                    "generated" if track.get("kind") == "asr" else "manually_created"
+                ),
+                "is_translatable": track.get("isTranslatable", False),
+            }
+        )
+    return tracks
+
+
 @dataclass(frozen=True, kw_only=True)
 class MetadataPath:
     video_id: str
@@ -0,0 +1,347 @@
+import json
+import re
+import sqlite3
+import threading
+import unicodedata
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Literal, Self
+
+import pandas as pd
+
+from ai_xp.llm_proxy import AiSummaryPath
+from ai_xp.scrapper import MetadataPath
+from ai_xp.transcript import (
+    TranscriptPath,
+    load_transcript_full_text,
+    load_transcript_snippets,
+)
+from ai_xp.utils import load_json, render_video_url
+
+DocumentKind = Literal["input", "metadata", "transcript", "summary"]
+
+# Bump when the schema changes: the index is derived data, it is rebuilt.
+SCHEMA_VERSION = 3
+
+
+@dataclass(kw_only=True, frozen=True)
+class TranscriptHit:
+    video_id: str
+    language_code: str
+    start_seconds: float
+    snippet_text: str
+
+    @property
+    def video_url(self) -> str:
+        # Jump directly to the moment where the phrase is said.
+        return f"{render_video_url(self.video_id)}&t={int(self.start_seconds)}s"
+
+
+@dataclass(kw_only=True, frozen=True)
+class SearchIndex:
+    """
+    Persistent full-text index (SQLite FTS5) over the video archive.
+
+    It covers the input titles, the titles and descriptions from
+    ``metadata_output``, the transcripts text and the summaries markdown.
+    The snippets of the transcripts are also stored with their start time,
+    to locate where a phrase is said. Documents are added incrementally: a
+    file is only (re)indexed when its mtime changed.
+    """
+
+    path: Path
+    connection: sqlite3.Connection = field(repr=False)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @classmethod
+    def open(cls, path: Path) -> Self:
+        path.parent.mkdir(exist_ok=True, parents=True)
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        instance = cls(path=path, connection=connection)
+        instance._create_tables()
+        return instance
+
+    def _create_tables(self):
+        with self.lock, self.connection:
+            (user_version,) = self.connection.execute("PRAGMA user_version").fetchone()
+            if user_version != SCHEMA_VERSION:
+                for table in ("documents", "snippets", "transcript_snippets"):
+                    self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+                self.connection.execute("DROP TABLE IF EXISTS indexed_files")
+                self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            # Diacritics are removed so "resume" also matches "résumé".
+            self.connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5("
+                "title, content, video_id UNINDEXED, kind UNINDEXED, "
+                "path UNINDEXED, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+            # Bookkeeping of the indexed files, to update them incrementally.
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS indexed_files ("
+                "path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, "
+                "document_rowid INTEGER)"
+            )
+            # One row per transcript snippet, with its timing.
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS transcript_snippets ("
+                "id INTEGER PRIMARY KEY, path TEXT NOT NULL, video_id TEXT NOT NULL, "
+                "language_code TEXT NOT NULL, start REAL NOT NULL, text TEXT NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS transcript_snippets_path "
+                "ON transcript_snippets (path)"
+            )
+
+    def close(self):
+        self.connection.close()
+
+    def indexed_paths(self) -> set[str]:
+        return {p for (p,) in self.connection.execute("SELECT path FROM indexed_files")}
+
+    def index_inputs(self, input_dataframe: pd.DataFrame):
+        # Inputs have no file of their own: they are keyed by video id.
+        known = self.indexed_paths()
+        titles = input_dataframe["title"].fillna("").astype(str)
+        documents = [
+            (f"input:{video_id}", 0, "input", video_id, title, "")
+            for video_id, title in titles.items()
+            if f"input:{video_id}" not in known
+        ]
+        self._insert(documents)
+
+    def index_paths(self, kind: DocumentKind, paths: list[Path]):
+        """Index the given artifact files, skipping those already up-to-date."""
+        if not paths:
+            return
+        mtimes: dict[str, int] = {}
+        # Stay below the SQLite limit on the number of query parameters.
+        for start in range(0, len(paths), 500):
+            batch = [str(p) for p in paths[start : start + 500]]
+            mtimes.update(
+                self.connection.execute(
+                    "SELECT path, mtime_ns FROM indexed_files "
+                    f"WHERE path IN ({', '.join('?' for _ in batch)})",
+                    batch,
+                )
+            )
+        documents = []
+        for path in paths:
+            mtime_ns = path.stat().st_mtime_ns
+            if mtimes.get(str(path)) == mtime_ns:
+                continue
+            title, content = read_document(kind, path)
+            video_id = video_id_from_path(kind, path)
+            documents.append((str(path), mtime_ns, kind, video_id, title, content))
+        self._insert(documents)
+
+    def _insert(self, documents: list[tuple[str, int, str, str, str, str]]):
+        with self.lock, self.connection:
+            for path, mtime_ns, kind, video_id, title, content in documents:
+                self._delete(path)
+                document_rowid = None
+                if title or content:
+                    document_rowid = self.connection.execute(
+                        "INSERT INTO documents (title, content, video_id, kind, path) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (title, content, video_id, kind, path),
+                    ).lastrowid
+                self.connection.execute(
+                    "INSERT INTO indexed_files (path, mtime_ns, document_rowid) "
+                    "VALUES (?, ?, ?)",
+                    (path, mtime_ns, document_rowid),
+                )
+                if kind == "transcript" and content:
+                    self._insert_snippets(path, video_id)
+
+    def _insert_snippets(self, path: str, video_id: str):
+        language_code = TranscriptPath.from_path(path).language_code
+        rows = [
+            (path, video_id, language_code, snippet["start"], snippet["text"])
+            for snippet in load_transcript_snippets(Path(path))
+        ]
+        self.connection.executemany(
+            "INSERT INTO transcript_snippets "
+            "(path, video_id, language_code, start, text) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def _delete(self, path: str):
+        row = self.connection.execute(
+            "SELECT document_rowid FROM indexed_files WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            return
+        if row[0] is not None:
+            self.connection.execute("DELETE FROM documents WHERE rowid = ?", row)
+        self.connection.execute(
+            "DELETE FROM transcript_snippets WHERE path = ?", (path,)
+        )
+        self.connection.execute("DELETE FROM indexed_files WHERE path = ?", (path,))
+
+    def forget_missing(self):
+        """Drop the documents whose file was removed from disk."""
+        with self.lock, self.connection:
+            for path in self.indexed_paths():
+                if not path.startswith("input:") and not Path(path).exists():
+                    self._delete(path)
+
+    def search(self, value: str, *, limit: int | None = 100) -> pd.DataFrame:
+        """
+        Ranked full-text search.
+
+        Every word of ``value`` must match, as a prefix. The best matches
+        (lowest bm25 rank) come first.
+        """
+        query = render_match_query(value)
+        columns = ["video_id", "kind", "path", "rank", "snippet"]
+        if not query:
+            return pd.DataFrame(columns=columns)
+        df = pd.read_sql_query(
+            "SELECT video_id, kind, path, rank, "
+            "snippet(documents, -1, '[', ']', '...', 16) AS snippet "
+            "FROM documents WHERE documents MATCH ? ORDER BY rank LIMIT ?",
+            self.connection,
+            params=(query, -1 if limit is None else limit),
+        )
+        return df[columns]
+
+    def search_transcripts(
+        self, phrase: str, *, regex: bool = False, limit: int | None = 100
+    ) -> list[TranscriptHit]:
+        """
+        Locate a phrase (or a regex) in the transcripts.
+
+        A match may span several snippets: it is searched over the text of
+        each transcript, and located at the snippet where it starts. A phrase
+        is first looked up in the full-text index, the best ranked transcripts
+        come first. A regex is matched against every transcript, ordered by
+        video id. Raise ValueError on an invalid regex.
+        """
+        if regex:
+            try:
+                pattern = _compile(phrase)
+            except re.error as error:
+                raise ValueError(f"Invalid regex {phrase!r}: {error}") from error
+            paths = self.connection.execute(
+                "SELECT path FROM transcript_snippets "
+                "GROUP BY path ORDER BY video_id, path"
+            ).fetchall()
+        else:
+            words = normalize_words(phrase)
+            if not words:
+                return []
+            paths = self.connection.execute(
+                "SELECT path FROM documents "
+                "WHERE documents MATCH ? AND kind = 'transcript' ORDER BY rank",
+                ("content : " + render_phrase_query(phrase),),
+            ).fetchall()
+        hits: list[TranscriptHit] = []
+        for (path,) in paths:
+            rows = self.connection.execute(
+                "SELECT video_id, language_code, start, text "
+                "FROM transcript_snippets WHERE path = ? ORDER BY id",
+                (path,),
+            ).fetchall()
+            texts = [text for _, _, _, text in rows]
+            spans = (
+                locate_regex(pattern, texts) if regex else locate_phrase(words, texts)
+            )
+            for first, last in spans:
+                video_id, language_code, start, _ = rows[first]
+                hits.append(
+                    TranscriptHit(
+                        video_id=video_id,
+                        language_code=language_code,
+                        start_seconds=start,
+                        snippet_text=" ".join(texts[first : last + 1]),
+                    )
+                )
+                if limit is not None and len(hits) >= limit:
+                    return hits
+        return hits
+
+
+@lru_cache(maxsize=32)
+def _compile(pattern: str) -> re.Pattern:
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def normalize_words(text: str) -> list[str]:
+    # Close to the unicode61 tokenizer: case folded words, without diacritics.
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.findall(r"\w+", stripped)
+
+
+def locate_phrase(words: list[str], texts: list[str]) -> list[tuple[int, int]]:
+    # Return the (first, last) snippet indices of every occurrence of the words.
+    flat_words: list[str] = []
+    snippet_indices: list[int] = []
+    for idx, text in enumerate(texts):
+        text_words = normalize_words(text)
+        flat_words.extend(text_words)
+        snippet_indices.extend([idx] * len(text_words))
+    size = len(words)
+    return [
+        (snippet_indices[i], snippet_indices[i + size - 1])
+        for i in range(len(flat_words) - size + 1)
+        if flat_words[i : i + size] == words
+    ]
+
+
+def locate_regex(pattern: re.Pattern, texts: list[str]) -> list[tuple[int, int]]:
+    # Same, for the (non-empty) matches of a regex over the joined snippets.
+    offsets: list[int] = []
+    position = 0
+    for text in texts:
+        offsets.append(position)
+        position += len(text) + 1
+    return [
+        (
+            bisect_right(offsets, match.start()) - 1,
+            bisect_right(offsets, match.end() - 1) - 1,
+        )
+        for match in pattern.finditer(" ".join(texts))
+        if match.end() > match.start()
+    ]
+
+
+def render_phrase_query(phrase: str) -> str:
+    return '"' + phrase.replace('"', '""') + '"'
+
+
+def render_match_query(value: str) -> str:
+    # Quote every word so that user input never breaks the FTS5 query syntax.
+    words = value.split()
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in words)
+
+
+def video_id_from_path(kind: DocumentKind, path: Path) -> str:
+    if kind == "metadata":
+        return MetadataPath.from_path(path).video_id
+    elif kind == "transcript":
+        return TranscriptPath.from_path(path).video_id
+    elif kind == "summary":
+        return AiSummaryPath.from_path(path).transcript_path_suffix.video_id
+    raise ValueError(f"Unsupported document kind: {kind}")
+
+
+def read_document(kind: DocumentKind, path: Path) -> tuple[str, str]:
+    # Return the (title, content) of a document. Error artifacts are empty.
+    if kind == "metadata":
+        metadata_json = load_json(path)
+        if "error" in metadata_json:
+            return "", ""
+        return metadata_json.get("title") or "", metadata_json.get("description") or ""
+    elif kind == "transcript":
+        try:
+            return "", load_transcript_full_text(path)
+        except (KeyError, json.decoder.JSONDecodeError):
+            return "", ""
+    elif kind == "summary":
+        return "", path.read_text()
+    raise ValueError(f"Unsupported document kind: {kind}")
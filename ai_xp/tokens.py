@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from functools import cache
+from typing import Any
+
+# The models behind OpenRouter use their own tokenizers: tiktoken only gives
+# an estimate, which is enough to size the prompts.
+DEFAULT_ENCODING = "cl100k_base"
+
+
+@cache
+def get_encoding(name: str = DEFAULT_ENCODING):
+    try:
+        import tiktoken
+    except ImportError:
+        raise ImportError("Install 'tiktoken' first: pip install tiktoken")
+    return tiktoken.get_encoding(name)
+
+
+def count_tokens(text: str, *, encoding_name: str = DEFAULT_ENCODING) -> int:
+    return len(get_encoding(encoding_name).encode_ordinary(text))
+
+
+def count_tokens_batch(
+    texts: list[str], *, encoding_name: str = DEFAULT_ENCODING
+) -> list[int]:
+    # Encode in a single call: tiktoken spreads the batch over threads.
+    encoded = get_encoding(encoding_name).encode_ordinary_batch(texts)
+    return [len(tokens) for tokens in encoded]
+
+
+@dataclass(kw_only=True, frozen=True)
+class TranscriptChunk:
+    index: int
+    start_seconds: float
+    end_seconds: float
+    text: str
+    tokens: int
+
+
+def chunk_snippets(
+    snippets: list[dict[str, Any]],
+    *,
+    max_tokens: int,
+    encoding_name: str = DEFAULT_ENCODING,
+    timecodes: bool = False,
+) -> list[TranscriptChunk]:
+    """
+    Split the snippets of a transcript into chunks of at most max_tokens.
+
+    Snippets are never split: a chunk ends at a snippet boundary, and knows
+    the time range it covers. A snippet longer than max_tokens makes a chunk
+    on its own. With timecodes, every line of a chunk starts with the start
+    time of its snippet, e.g. "[0:01:30]", counted in the tokens.
+    """
+    lines = [
+        f"[{render_timecode(float(snippet['start']))}] {snippet['text']}"
+        if timecodes
+        else snippet["text"]
+        for snippet in snippets
+    ]
+    token_counts = count_tokens_batch(lines, encoding_name=encoding_name)
+    chunks: list[TranscriptChunk] = []
+    current: list[int] = []
+    current_tokens = 0
+
+    def flush():
+        first, last = snippets[current[0]], snippets[current[-1]]
+        chunks.append(
+            TranscriptChunk(
+                index=len(chunks),
+                start_seconds=float(first["start"]),
+                end_seconds=float(last["start"]) + float(last["duration"]),
+                # Same layout as load_transcript_full_text: one snippet per line.
+                text="\n".join(lines[idx] for idx in current),
+                tokens=current_tokens,
+            )
+        )
+
+    for idx, tokens in enumerate(token_counts):
+        # One more token for the newline joining the snippets.
+        if current and current_tokens + tokens + 1 > max_tokens:
+            flush()
+            current, current_tokens = [], 0
+        current.append(idx)
+        current_tokens += tokens + (1 if len(current) > 1 else 0)
+    if current:
+        flush()
+    return chunks
+
+
+def render_timecode(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}"
@@ -1,16 +1,30 @@
 import json
-from dataclasses import asdict, dataclass
+import threading
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Any, Self
+from typing import TYPE_CHECKING, Any, Self
 from urllib.parse import parse_qs, urlparse
 
-from youtube_transcript_api import FetchedTranscript, Transcript, YouTubeTranscriptApi
+import requests
+from youtube_transcript_api import (
+    FetchedTranscript,
+    Transcript,
+    TranscriptList,
+    YouTubeTranscriptApi,
+)
 from youtube_transcript_api._errors import (
+    TranscriptsDisabled,
     YouTubeTranscriptApiException,
 )
+from youtube_transcript_api._transcripts import TranscriptListFetcher
 
+from ai_xp.http_client import default_http_client
 from ai_xp.utils import load_json
 
+if TYPE_CHECKING:
+    # The store parses TranscriptPath filenames, hence the import cycle.
+    from ai_xp.transcript_store import TranscriptStore
+
 
 @dataclass(frozen=True, kw_only=True)
 class TranscriptPath:
@@ -65,14 +79,29 @@ class TranscriptPath:
         return asdict(self)
 
 
-def load_transcript_full_text(transcript_output_file_path: Path) -> str:
-    # Load a JSON-serialized transcript.
+def load_transcript_full_text(
+    transcript_output_file_path: Path, *, store: "TranscriptStore | None" = None
+) -> str:
+    # Load a JSON-serialized transcript, or read it from the columnar store.
     transcript_full_text = "\n".join(
-        line["text"] for line in load_json(transcript_output_file_path)["snippets"]
+        line["text"]
+        for line in load_transcript_snippets(transcript_output_file_path, store=store)
     )
     return transcript_full_text
 
 
+def load_transcript_snippets(
+    transcript_output_file_path: Path, *, store: "TranscriptStore | None" = None
+) -> list[dict[str, Any]]:
+    # Each snippet contains text, start and duration (in seconds).
+    # The store is tried first; transcripts not compacted yet are read from JSON.
+    if store is not None:
+        snippets = store.load_snippets(transcript_output_file_path)
+        if snippets is not None:
+            return snippets
+    return load_json(transcript_output_file_path)["snippets"]
+
+
 @dataclass(kw_only=True, frozen=True)
 class TranscriptSuccessResult:
     transcript: FetchedTranscript
@@ -127,10 +156,45 @@ class TranscriptErrorResult:
         )
 
 
+class PrefetchedTranscriptListFetcher(TranscriptListFetcher):
+    """
+    Transcript listing that reuses the innertube API key of the watch page
+    fetched by the metadata stage.
+
+    The library fetches the watch page only to read that key: this saves one
+    (heavy) request per video. It relies on private methods of
+    youtube_transcript_api.
+    """
+
+    def __init__(self, http_client: requests.Session, *, api_key: str):
+        super().__init__(http_client, proxy_config=None)
+        self._api_key = api_key
+
+    def _fetch_captions_json(self, video_id: str, try_number: int = 0) -> dict:
+        innertube_data = self._fetch_innertube_data(video_id, self._api_key)
+        return self._extract_captions_json(innertube_data, video_id)
+
+
+def are_captions_disabled(video_metadata: dict[str, Any] | None) -> bool:
+    # A page that is not playable (login required, age-gated, bot check)
+    # lists no captions either: the transcripts are then fetched normally,
+    # rather than recorded as (permanently) disabled.
+    return (
+        video_metadata is not None
+        and video_metadata.get("playability_status") == "OK"
+        and video_metadata.get("caption_tracks") == []
+    )
+
+
 def get_youtube_transcript(
     video_url: str,
     preferred_languages: tuple[str, ...] | str,
+    *,
+    http_client: requests.Session | None = None,
+    video_metadata: dict[str, Any] | None = None,
 ) -> TranscriptSuccessResult | TranscriptErrorResult:
+    # video_metadata is the JSON written by the metadata stage. When it lists
+    # the caption tracks, no request is made for videos without captions.
     # ISO 639-1 language code
     preferred_languages = (
         preferred_languages
@@ -141,10 +205,17 @@ def get_youtube_transcript(
     if not video_id:
         # This should not happen, the error cannot even be logged.
         raise ValueError
+    if are_captions_disabled(video_metadata):
+        error = TranscriptsDisabled(video_id)
+        print(f"Skip transcript fetching: {type(error).__name__}")
+        return TranscriptErrorResult(error=error, video_id=video_id)
     try:
         # Try preferred language. If the language is not available this will fail.
         transcript = get_youtube_transcript_internal(
-            video_id, preferred_languages
+            video_id,
+            preferred_languages,
+            http_client=http_client,
+            video_metadata=video_metadata,
         ).fetch()
         return TranscriptSuccessResult(transcript=transcript)
     except YouTubeTranscriptApiException as error:
@@ -160,9 +231,20 @@ def get_youtube_transcript_internal(
     preferred_languages: tuple[str, ...] | str,
     *,
     try_translation: bool = True,
+    http_client: requests.Session | None = None,
+    video_metadata: dict[str, Any] | None = None,
 ) -> Transcript:
-    ytt_api = YouTubeTranscriptApi()
-    transcript_list = ytt_api.list(video_id)
+    http_client = http_client or default_http_client()
+    api_key = (video_metadata or {}).get("innertube_api_key")
+    if api_key:
+        # The watch page was already fetched by the metadata stage.
+        transcript_list = PrefetchedTranscriptListFetcher(
+            http_client, api_key=api_key
+        ).fetch(video_id)
+    else:
+        # The API object is cheap, the session is not: share the pooled one.
+        ytt_api = YouTubeTranscriptApi(http_client=http_client)
+        transcript_list = ytt_api.list(video_id)
     try:
         result = transcript_list.find_transcript(preferred_languages)
         return result
@@ -189,6 +271,100 @@ def get_youtube_transcript_internal(
         raise
 
 
+TranscriptKey = tuple[str, str]  # (language_code, source), as in TranscriptPath
+
+
+@dataclass(kw_only=True, frozen=True)
+class TranscriptBatchFetcher:
+    """
+    Fetch several transcripts of a video from a single listing.
+
+    Listings and fetched transcripts are cached for the lifetime of the
+    fetcher (e.g. a run), so a video is listed once, and a transcript
+    (translations included) is downloaded once, whatever the number of
+    requested combinations.
+    """
+
+    http_client: requests.Session = field(default_factory=default_http_client)
+    listings: dict[str, TranscriptList] = field(default_factory=dict, repr=False)
+    fetched: dict[tuple[str, str, str], FetchedTranscript] = field(
+        default_factory=dict, repr=False
+    )
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def list_transcripts(
+        self, video_id: str, *, video_metadata: dict[str, Any] | None = None
+    ) -> TranscriptList:
+        with self.lock:
+            if video_id in self.listings:
+                return self.listings[video_id]
+        api_key = (video_metadata or {}).get("innertube_api_key")
+        if api_key:
+            transcript_list = PrefetchedTranscriptListFetcher(
+                self.http_client, api_key=api_key
+            ).fetch(video_id)
+        else:
+            transcript_list = YouTubeTranscriptApi(http_client=self.http_client).list(
+                video_id
+            )
+        with self.lock:
+            self.listings[video_id] = transcript_list
+        return transcript_list
+
+    def find(self, transcript_list: TranscriptList, key: TranscriptKey) -> Transcript:
+        language_code, source = key
+        if source == "manually_created":
+            return transcript_list.find_manually_created_transcript([language_code])
+        try:
+            return transcript_list.find_generated_transcript([language_code])
+        except YouTubeTranscriptApiException:
+            # Translations are generated transcripts: translate the first
+            # translatable transcript (manually created ones come first).
+            for transcript in transcript_list:
+                if transcript.is_translatable:
+                    return transcript.translate(language_code)
+            raise
+
+    def fetch_many(
+        self,
+        video_id: str,
+        keys: list[TranscriptKey],
+        *,
+        video_metadata: dict[str, Any] | None = None,
+    ) -> dict[TranscriptKey, TranscriptSuccessResult | TranscriptErrorResult]:
+        results: dict[TranscriptKey, TranscriptSuccessResult | TranscriptErrorResult]
+        results = {}
+        if are_captions_disabled(video_metadata):
+            error = TranscriptsDisabled(video_id)
+            return {
+                key: TranscriptErrorResult(error=error, video_id=video_id)
+                for key in keys
+            }
+        try:
+            transcript_list = self.list_transcripts(
+                video_id, video_metadata=video_metadata
+            )
+        except YouTubeTranscriptApiException as error:
+            print(f"Error listing transcripts: {type(error).__name__}")
+            return {
+                key: TranscriptErrorResult(error=error, video_id=video_id)
+                for key in keys
+            }
+
+        for key in keys:
+            cache_key = (video_id, *key)
+            try:
+                if cache_key not in self.fetched:
+                    self.fetched[cache_key] = self.find(transcript_list, key).fetch()
+                results[key] = TranscriptSuccessResult(
+                    transcript=self.fetched[cache_key]
+                )
+            except YouTubeTranscriptApiException as error:
+                print(f"Error fetching transcript {key}: {type(error).__name__}")
+                results[key] = TranscriptErrorResult(error=error, video_id=video_id)
+        return results
+
+
 def extract_video_id(url: str) -> str | None:
     """Extrait l'ID de la vidéo YouTube avec les modules standards"""
     if not url:
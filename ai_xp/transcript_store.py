@@ -0,0 +1,230 @@
+from dataclasses import dataclass, replace
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from ai_xp.transcript import TranscriptPath, load_transcript_snippets
+from ai_xp.utils import import_pyarrow, render_timestamp_slug
+
+STORE_COLUMNS = (
+    "transcript_name",
+    "video_id",
+    "language_code",
+    "source",
+    "start",
+    "duration",
+    "text",
+)
+
+
+@dataclass(kw_only=True, frozen=True)
+class CatalogEntry:
+    # Rows of a transcript in a part file, and the JSON file it was packed from.
+    part_path: Path
+    offset: int
+    length: int
+    source_path: Path
+    size: int
+    mtime_ns: int
+
+    def is_fresh(self) -> bool:
+        # The JSON file still exists, and was not rewritten since packed.
+        try:
+            stat = self.source_path.stat()
+        except FileNotFoundError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == (self.size, self.mtime_ns)
+
+
+@dataclass(kw_only=True, frozen=True)
+class TranscriptStore:
+    """
+    Columnar store of the transcripts, as Arrow IPC files.
+
+    The store is partitioned by language (``language_code=<code>/``) and each
+    compaction adds one part file per language, plus a small catalog giving
+    the rows of each transcript. Part files are uncompressed and memory-mapped,
+    so reading a transcript does not parse any JSON.
+
+    An entry is only served while the JSON file it was packed from keeps the
+    same size and mtime: a rewritten transcript is read from JSON until it is
+    packed again. Without a store directory, nothing is served and pyarrow is
+    not needed.
+    """
+
+    root: Path
+
+    @cached_property
+    def catalog(self) -> dict[str, CatalogEntry]:
+        # Transcript filename -> entry; later parts replace earlier ones.
+        if not self.root.is_dir():
+            return {}
+        pa = import_pyarrow()
+        catalog = {}
+        for catalog_path in sorted(self.root.glob("*/*.catalog.arrow")):
+            part_path = catalog_path.with_name(
+                catalog_path.name.removesuffix(".catalog.arrow") + ".arrow"
+            )
+            with pa.memory_map(str(catalog_path)) as source:
+                table = pa.ipc.open_file(source).read_all()
+            if "source_path" not in table.column_names:
+                # Packed before the freshness check: packed again by compact.
+                continue
+            for name, offset, length, source_path, size, mtime_ns in zip(
+                table["transcript_name"].to_pylist(),
+                table["offset"].to_pylist(),
+                table["length"].to_pylist(),
+                table["source_path"].to_pylist(),
+                table["size"].to_pylist(),
+                table["mtime_ns"].to_pylist(),
+            ):
+                catalog[name] = CatalogEntry(
+                    part_path=part_path,
+                    offset=offset,
+                    length=length,
+                    source_path=Path(source_path),
+                    size=size,
+                    mtime_ns=mtime_ns,
+                )
+        return catalog
+
+    def _entry(self, transcript_path: Path | str) -> "CatalogEntry | None":
+        # The entry of the transcript, if it is still fresh.
+        transcript_path = Path(transcript_path)
+        entry = self.catalog.get(transcript_path.name)
+        if entry is None:
+            return None
+        entry = replace(entry, source_path=transcript_path)
+        return entry if entry.is_fresh() else None
+
+    @cached_property
+    def _tables(self) -> dict[Path, Any]:
+        # Opened (memory-mapped) part files, filled lazily.
+        return {}
+
+    def _table(self, part_path: Path):
+        pa = import_pyarrow()
+        if part_path not in self._tables:
+            source = pa.memory_map(str(part_path))
+            self._tables[part_path] = pa.ipc.open_file(source).read_all()
+        return self._tables[part_path]
+
+    def __contains__(self, transcript_path: Path | str) -> bool:
+        return self._entry(transcript_path) is not None
+
+    def load_snippets(self, transcript_path: Path | str) -> list[dict[str, Any]] | None:
+        # None when the transcript was not compacted into the store yet, or
+        # was rewritten since.
+        entry = self._entry(transcript_path)
+        if entry is None:
+            return None
+        rows = self._table(entry.part_path).slice(entry.offset, entry.length)
+        # Column-wise conversion is much cheaper than Table.to_pylist().
+        return [
+            {"text": text, "start": start, "duration": duration}
+            for text, start, duration in zip(
+                rows["text"].to_pylist(),
+                rows["start"].to_pylist(),
+                rows["duration"].to_pylist(),
+            )
+        ]
+
+    def to_dataframe(self, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        All the snippets of the store, one row per snippet.
+
+        Only the rows of the latest packing of each transcript are read, and
+        transcripts whose JSON file was removed or rewritten since are left out.
+        """
+        pa = import_pyarrow()
+        entries = sorted(
+            (entry for entry in self.catalog.values() if entry.is_fresh()),
+            key=lambda entry: (entry.part_path, entry.offset),
+        )
+        tables = [
+            self._table(entry.part_path).slice(entry.offset, entry.length)
+            for entry in entries
+        ]
+        if not tables:
+            return pd.DataFrame(columns=columns or list(STORE_COLUMNS))
+        table = pa.concat_tables(tables)
+        if columns is not None:
+            table = table.select(columns)
+        return table.to_pandas()
+
+    def compact(self, transcript_paths: list[Path]) -> int:
+        """
+        Pack the transcripts that are not in the store yet.
+
+        Only successful transcripts are packed. Return the number of packed
+        transcripts.
+        """
+        pa = import_pyarrow()
+        missing = sorted(
+            (
+                path
+                for path in transcript_paths
+                if path not in self
+                and TranscriptPath.from_path(path).status == "success"
+            ),
+            key=lambda p: p.name,
+        )
+        by_language: dict[str, list[Path]] = {}
+        for path in missing:
+            language_code = TranscriptPath.from_path(path).language_code
+            by_language.setdefault(language_code, []).append(path)
+
+        part_name = "part-" + render_timestamp_slug(pd.Timestamp.now())
+        for language_code, paths in by_language.items():
+            columns: dict[str, list] = {column: [] for column in STORE_COLUMNS}
+            catalog: dict[str, list] = {
+                "transcript_name": [],
+                "offset": [],
+                "length": [],
+                "source_path": [],
+                "size": [],
+                "mtime_ns": [],
+            }
+            for path in paths:
+                parsed = TranscriptPath.from_path(path)
+                stat = path.stat()
+                snippets = load_transcript_snippets(path)
+                catalog["transcript_name"].append(path.name)
+                catalog["source_path"].append(str(path.absolute()))
+                catalog["size"].append(stat.st_size)
+                catalog["mtime_ns"].append(stat.st_mtime_ns)
+                catalog["offset"].append(len(columns["text"]))
+                catalog["length"].append(len(snippets))
+                for snippet in snippets:
+                    columns["transcript_name"].append(path.name)
+                    columns["video_id"].append(parsed.video_id)
+                    columns["language_code"].append(parsed.language_code)
+                    columns["source"].append(parsed.source)
+                    columns["start"].append(float(snippet["start"]))
+                    columns["duration"].append(float(snippet["duration"]))
+                    columns["text"].append(snippet["text"])
+
+            partition_path = self.root / f"language_code={language_code}"
+            partition_path.mkdir(exist_ok=True, parents=True)
+            part_path = partition_path / f"{part_name}.arrow"
+            write_arrow_file(pa.table(columns), part_path)
+            # The catalog is written last: a part without catalog is ignored.
+            write_arrow_file(
+                pa.table(catalog), partition_path / f"{part_name}.catalog.arrow"
+            )
+            print(f"[  OK] Packed {len(paths)} transcripts into {part_path}")
+
+        # Invalidate the cached catalog so the new parts are visible.
+        self.__dict__.pop("catalog", None)
+        return len(missing)
+
+
+def write_arrow_file(table, path: Path):
+    pa = import_pyarrow()
+    tmp_path = path.with_suffix(".tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    tmp_path.replace(path)
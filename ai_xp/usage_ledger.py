@@ -0,0 +1,78 @@
+import json
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+USAGE_COLUMNS = (
+    "time",
+    "model",
+    "prompt_tokens",
+    "completion_tokens",
+    "total_tokens",
+    "cost",
+    "latency_seconds",
+    "status_code",
+    "error",
+)
+
+
+@dataclass(kw_only=True, frozen=True)
+class UsageLedger:
+    """
+    Append-only ledger (JSON lines) of the LLM requests.
+
+    One line is appended per request actually sent, with the token usage
+    and cost (in credits) reported by OpenRouter, and the request latency. Aggregates per model and
+    day are computed from this single file, instead of walking the product
+    JSON files of ``llm_output``.
+    """
+
+    path: Path
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, product: dict, *, latency_seconds: float):
+        response = product["response"]
+        usage = response.get("usage") or {}
+        entry = {
+            "time": pd.Timestamp.now().isoformat(),
+            "model": response.get("model") or product["model"],
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "completion_tokens": usage.get("completion_tokens"),
+            "total_tokens": usage.get("total_tokens"),
+            "cost": usage.get("cost"),
+            "latency_seconds": latency_seconds,
+            "status_code": product.get("status_code"),
+            "error": (response.get("error") or {}).get("code"),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self.lock:
+            self.path.parent.mkdir(exist_ok=True, parents=True)
+            with self.path.open("a") as fp:
+                fp.write(line)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        if not self.path.is_file():
+            return pd.DataFrame(columns=list(USAGE_COLUMNS))
+        df = pd.read_json(self.path, lines=True, dtype=False)
+        # Lines recorded before a column was added miss it.
+        df = df.reindex(columns=list(USAGE_COLUMNS))
+        df["time"] = pd.to_datetime(df["time"])
+        return df
+
+    def daily_dataframe(self) -> pd.DataFrame:
+        """Requests, tokens, cost and latency per model and day."""
+        df = self.to_dataframe()
+        df["day"] = pd.to_datetime(df["time"]).dt.normalize()
+        df["failed"] = df["error"].notna()
+        return df.groupby(["model", "day"]).agg(
+            requests=("time", "size"),
+            failed=("failed", "sum"),
+            prompt_tokens=("prompt_tokens", "sum"),
+            completion_tokens=("completion_tokens", "sum"),
+            total_tokens=("total_tokens", "sum"),
+            cost=("cost", "sum"),
+            mean_latency_seconds=("latency_seconds", "mean"),
+            max_latency_seconds=("latency_seconds", "max"),
+        )
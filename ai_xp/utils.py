@@ -1,11 +1,13 @@
 import json
 import re
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-import pandas as pd
 from slugify import slugify
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 def sanitize_string(input_string: str) -> str:
     # Remove non-alphanumeric characters except spaces
@@ -55,10 +57,29 @@ def render_title_slug(title: str, *, limit: int = 128) -> str:
     return slug[:limit] if limit > 0 else slug
 
 
-def render_timestamp_slug(now: pd.Timestamp) -> str:
+def render_timestamp_slug(now: "pd.Timestamp") -> str:
     # Do not lowercase so the T-separator remains capitalized
     return slugify(now.isoformat(), lowercase=False)
 
 
 def render_video_url(video_id: str) -> str:
     return "https://www.youtube.com/watch?v=" + video_id
+
+
+def import_pyarrow():
+    # Optional dependency: the Arrow/Parquet based stores and caches.
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+
+        return pa
+    except ImportError:
+        raise ImportError("Install 'pyarrow' first: pip install pyarrow")
+
+
+def has_pyarrow() -> bool:
+    try:
+        import_pyarrow()
+    except ImportError:
+        return False
+    return True
@@ -1,15 +1,19 @@
 import json
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
-from typing import Any, Self
+from typing import TYPE_CHECKING, Any, Iterator, Self
 
 import pandas as pd
-import xarray as xr
-from matplotlib import pyplot as plt
 
 from ai_xp.transcript import extract_video_id
 from ai_xp.utils import render_video_url
 
+if TYPE_CHECKING:
+    # Only needed for the plots: imported on first use of xds.
+    import xarray as xr
+    from matplotlib import pyplot as plt
+
 path = Path(
     "/home/tselano/Downloads/takeout-20250416T125258Z-001/Takeout/YouTube et YouTube Music/historique/watch-history.json"
 )
@@ -82,14 +86,126 @@ path = Path(
 # plt.show()
 
 
+# Keys of the Takeout entries needed by the transcript and summary logic. Pass
+# them as the columns of YouTubeHistoryAnalyzer.from_path to drop the others
+# (subtitles, products, activityControls, details) while streaming.
+HISTORY_COLUMNS = ("header", "title", "titleUrl", "time")
+
+# Most of the Takeout URLs are plain watch URLs: their video id is extracted
+# with a vectorized regex, the others go through extract_video_id.
+WATCH_URL_PATTERN = (
+    r"^https://(?:www\.|music\.|m\.)?youtube\.com/watch\?v=([A-Za-z0-9_-]+)(?:&|$)"
+)
+
+
+def iter_history_entries(
+    path: Path, *, chunk_size: int = 1 << 20
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield the entries of a Takeout JSON array one by one.
+
+    The file is read by chunks and decoded entry by entry, so memory is
+    bounded by the chunk size (and the largest entry), not the file size.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as fp:
+        buffer = fp.read(chunk_size).lstrip()
+        if not buffer.startswith("["):
+            raise ValueError(f"Expected a JSON array in {path}")
+        position = 1
+        eof = False
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            try:
+                if position >= len(buffer):
+                    raise json.decoder.JSONDecodeError("Need more data", buffer, 0)
+                entry, position = decoder.raw_decode(buffer, position)
+            except json.decoder.JSONDecodeError:
+                if eof:
+                    raise
+                # The entry is truncated: read the next chunk.
+                chunk = fp.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield entry
+
+
+def consolidate_history(df: pd.DataFrame, *, lang: str = "fr") -> pd.DataFrame:
+    """
+    Add the data necessary for the transcript and summary logic, vectorized.
+
+    Titles lose their "Vous avez regardé" prefix (French only), entries
+    without URL, playlists, posts and ads are dropped, and the video id and
+    canonical URL are added.
+    """
+    title = df["title"].astype(str)
+    if lang == "fr":
+        # Note: the prefix before the title must be found for all languages.
+        # If it is not french, the prefix will just be kept
+        stripped = title.str.removeprefix("Vous avez regardé ").str.removeprefix(
+            "consulté "
+        )
+    else:
+        stripped = title
+    df = df.assign(
+        title=stripped.where(~title.str.contains("www.youtube.com", regex=False), "")
+    )
+
+    if "titleUrl" not in df:
+        return df.iloc[:0]
+    url = df["titleUrl"]
+    kept = url.notna() & ~(
+        url.str.startswith("https://www.youtube.com/playlist", na=False)
+        | url.str.startswith("https://www.youtube.com/post", na=False)
+        | (url == "https://www.youtube.com/watch?v=")
+        | url.str.contains("google.com/", regex=False, na=False)
+    )
+    df = df[kept]
+    url = df["titleUrl"]
+
+    video_id = url.str.extract(WATCH_URL_PATTERN, expand=False)
+    other = video_id.isna()
+    video_id[other] = url[other].map(extract_video_id)
+    # Like extract_video_id, an empty id is no id.
+    video_id = video_id.where(video_id.astype(bool) & video_id.notna())
+    return df.assign(
+        video_id=video_id,
+        href=video_id.map(render_video_url, na_action="ignore"),
+    )
+
+
 @dataclass
 class YouTubeHistoryAnalyzer:
     """A class to load and analyze YouTube watch history data."""
 
     path: Path
-    raw: list[dict[str, Any]]
     df: pd.DataFrame
-    xds: xr.Dataset
+
+    @cached_property
+    def xds(self) -> "xr.Dataset":
+        import xarray as xr
+
+        reset_df = self.df.reset_index()
+        xds = xr.Dataset(
+            coords={"time": reset_df["time"]},
+            data_vars={
+                "timedelta": ("time", reset_df["timedelta"].values),
+                "href": ("time", reset_df["titleUrl"].values),
+            },
+        )
+        xds["views"] = xr.ones_like(xds["time"], dtype=int)
+        assert xds.time.indexes["time"].is_monotonic_increasing
+        return xds
+
+    @cached_property
+    def raw(self) -> list[dict[str, Any]]:
+        # The full entries are not kept in memory: read them again on demand.
+        return list(iter_history_entries(self.path))
 
     @classmethod
     def from_path(
@@ -99,51 +215,46 @@ class YouTubeHistoryAnalyzer:
         drop_url_duplicates: bool = True,
         lang: str = "fr",
         consolidate: bool = False,
+        batch_size: int = 50_000,
+        columns: tuple[str, ...] | None = None,
     ) -> Self:
-        """Create a YouTubeHistory instance from a JSON file path."""
+        """
+        Create a YouTubeHistory instance from a JSON file path.
+
+        All the keys of the entries are kept as columns, unless ``columns``
+        is given, e.g. HISTORY_COLUMNS.
+        """
         path = Path(path)
 
-        # Load JSON data
-        with open(path, "r") as fp:
-            raw_history_json = json.load(fp)
-
-        filtered_raw_history_json = raw_history_json
-
-        # Consolidate history to add necessary data for transcript and summary logic
-        if consolidate:
-            filtered_raw_history_json = []
-            for entry in raw_history_json:
-                if "www.youtube.com" in entry["title"]:
-                    entry["title"] = ""
-                elif lang == "fr":
-                    # Note: the prefix before the title must be found for all languages.
-                    # If it is not french, the prefix will just be kept
-                    entry["title"] = (
-                        entry["title"]
-                        .removeprefix("Vous avez regardé ")
-                        .removeprefix("consulté ")
-                    )
-                else:
-                    # Do nothing, the prefix will remain
-                    pass
-                if "titleUrl" in entry:
-                    if (
-                        entry["titleUrl"].startswith("https://www.youtube.com/playlist")
-                        or entry["titleUrl"].startswith("https://www.youtube.com/post")
-                        or entry["titleUrl"] == "https://www.youtube.com/watch?v="
-                        or "google.com/" in entry["titleUrl"]
-                    ):
-                        continue
-
-                    identifier = extract_video_id(entry["titleUrl"])
-                    if identifier:
-                        entry["video_id"] = identifier
-                        entry["href"] = render_video_url(identifier)
-
-                    filtered_raw_history_json.append(entry)
+        # Stream the entries, and only keep the requested columns of each batch.
+        frames: list[pd.DataFrame] = []
+        batch: list[dict[str, Any]] = []
+
+        def flush():
+            frame = pd.DataFrame.from_records(batch, columns=columns)
+            # Consolidate history to add necessary data for transcript and summary logic
+            if consolidate:
+                frame = consolidate_history(frame, lang=lang)
+                if columns is None:
+                    # Only the keys of the kept entries, e.g. not the details
+                    # of the dropped ads.
+                    keys = {key for idx in frame.index for key in batch[idx]}
+                    keys.update(("video_id", "href"))
+                    frame = frame[[column for column in frame if column in keys]]
+            frames.append(frame)
+            batch.clear()
+
+        for entry in iter_history_entries(path):
+            batch.append(
+                entry if columns is None else {key: entry.get(key) for key in columns}
+            )
+            if len(batch) >= batch_size:
+                flush()
+        if batch or not frames:
+            flush()
 
         # Create and preprocess DataFrame
-        df = pd.DataFrame(filtered_raw_history_json)
+        df = pd.concat(frames, ignore_index=True)
         df["time"] = pd.to_datetime(df["time"], format="mixed")
         df = df.sort_values("time")
         if drop_url_duplicates:
@@ -151,25 +262,13 @@ class YouTubeHistoryAnalyzer:
         df["timedelta"] = df["time"] - df["time"].iloc[0]
         df = df.set_index("time")
 
-        # Create xarray Dataset
-        reset_df = df.reset_index()
-        xds = xr.Dataset(
-            coords={"time": reset_df["time"]},
-            data_vars={
-                "timedelta": ("time", reset_df["timedelta"].values),
-                "href": ("time", reset_df["titleUrl"].values),
-            },
-        )
-        xds["views"] = xr.ones_like(xds["time"], dtype=int)
-        assert xds.time.indexes["time"].is_monotonic_increasing
-
-        return cls(path=path, raw=raw_history_json, df=df, xds=xds)
+        return cls(path=path, df=df)
 
-    def group_by_days(self) -> xr.Dataset:
+    def group_by_days(self) -> "xr.Dataset":
         """Group data by days and sum views."""
         return self.xds.groupby("timedelta.days").sum()
 
-    def plot_daily_views(self, **kwargs) -> tuple[plt.Figure, plt.Axes]:
+    def plot_daily_views(self, **kwargs) -> tuple["plt.Figure", "plt.Axes"]:
         """Plot daily views using a scatter plot."""
         daily_ds = self.group_by_days()
         return daily_ds.views.plot.scatter(x="days", y="views", marker="+", **kwargs)
@@ -179,7 +278,7 @@ class YouTubeHistoryAnalyzer:
         cmap: str = "plasma",
         size: float = 4,
         aspect: float = 5,
-    ) -> tuple[plt.Figure, plt.Axes]:
+    ) -> tuple["plt.Figure", "plt.Axes"]:
         """
         Create a heatmap visualization of viewing patterns.
 
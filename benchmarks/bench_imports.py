@@ -0,0 +1,49 @@
+"""
+Measure the import time of the ai_xp modules, each in a fresh interpreter,
+and fail when one of them exceeds its budget.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_imports
+"""
+
+import statistics
+import subprocess
+import sys
+
+# Seconds, median of the runs. The budgets leave room for a slower machine
+# but catch a heavy dependency imported at module level again.
+IMPORT_BUDGETS = {
+    "ai_xp.transcript": 0.5,
+    "ai_xp.scrapper": 0.5,
+    "ai_xp.youtube_history": 1.5,
+    "ai_xp.database": 1.5,
+}
+
+
+def import_seconds(module: str) -> float:
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+    return float(output)
+
+
+def main(repeat: int = 5) -> int:
+    over_budget = []
+    for module, budget in IMPORT_BUDGETS.items():
+        seconds = statistics.median(import_seconds(module) for _ in range(repeat))
+        status = "ok" if seconds <= budget else "OVER BUDGET"
+        print(
+            f"{module}: {seconds * 1000:.0f} ms (budget {budget * 1000:.0f} ms) {status}"
+        )
+        if seconds > budget:
+            over_budget.append(module)
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
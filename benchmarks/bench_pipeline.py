@@ -0,0 +1,95 @@
+"""
+Load test of the whole pipeline (metadata, transcripts, summaries) against
+the local fake server, see ai_xp.fake_server. Nothing leaves the machine.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pipeline --videos 1000 --latency 0.05
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from ai_xp.database import FileDatabase
+from ai_xp.fake_server import FakeBehaviour, FakeServer, FakeServerConfig
+from ai_xp.http_client import PooledSession
+from benchmarks.synthetic import write_inputs
+
+PROMPTS_PATH = Path("resources/prompts/prompts.toml")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--videos", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--youtube-rps", type=float, default=None)
+    parser.add_argument("--openrouter-rps", type=float, default=None)
+    parser.add_argument("--requests-per-second", type=float, default=100.0)
+    parser.add_argument("--max-workers", type=int, default=16)
+    parser.add_argument("--stream", action="store_true")
+    args = parser.parse_args()
+
+    def behaviour(requests_per_second: float | None) -> FakeBehaviour:
+        return FakeBehaviour(
+            latency_seconds=args.latency,
+            latency_jitter_seconds=args.latency,
+            error_rate=args.error_rate,
+            requests_per_second=requests_per_second,
+            burst=max(1, int(requests_per_second or 1)),
+        )
+
+    config = FakeServerConfig(
+        youtube=behaviour(args.youtube_rps),
+        openrouter=behaviour(args.openrouter_rps),
+    )
+    timings: dict[str, float] = {}
+    with (
+        FakeServer(config=config) as server,
+        tempfile.TemporaryDirectory(prefix="ai_xp_load_") as tmp_dir,
+    ):
+        session = PooledSession(
+            max_per_host=args.max_workers,
+            pool_maxsize=args.max_workers,
+            base_url_overrides=server.base_url_overrides(),
+        )
+        inputs_dir = write_inputs(Path(tmp_dir), args.videos)
+        db = FileDatabase.from_paths(inputs_dir, Path(tmp_dir) / "generated")
+        rate = {
+            "requests_per_second": args.requests_per_second,
+            "burst": args.max_workers,
+            "max_workers": args.max_workers,
+            "http_client": session,
+        }
+
+        start = time.perf_counter()
+        db = db.fetch_missing_metadata(**rate)
+        timings["metadata"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        db = db.fetch_missing_transcripts(**rate)
+        timings["transcripts"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        db = db.fetch_missing_llm_outputs(
+            max_concurrency=args.max_workers,
+            stream=args.stream,
+            http_client=session,
+            api_key="fake",
+            prompts_path=PROMPTS_PATH,
+        )
+        timings["llm_outputs"] = time.perf_counter() - start
+
+        print(server.report())
+        print(session.report())
+        print(db.metadata_dataframe["status"].value_counts().to_string())
+        print(db.transcript_dataframe["status"].value_counts().to_string())
+        print(f"{len(db.llm_output_dataframe)} summaries")
+    for stage, seconds in timings.items():
+        print(f"{stage}: {seconds:.1f} s ({args.videos / seconds:.0f} videos/s)")
+
+
+if __name__ == "__main__":
+    main()
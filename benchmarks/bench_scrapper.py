@@ -0,0 +1,83 @@
+"""
+Compare the metadata extraction of YouTubeHtmlScrapper with the former
+BeautifulSoup-based one, in both modes (json and regex), on the example watch
+pages. The examples were saved from a browser, their player response is not
+JSON: the json mode is measured on the pages as served by the fake server.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_scrapper
+"""
+
+import json
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from ai_xp.fake_server import (
+    FakeServerConfig,
+    render_player_response,
+    render_watch_page,
+)
+from ai_xp.scrapper import YouTubeHtmlScrapper
+
+EXAMPLES_DIR = Path("resources/examples")
+
+
+def extract_with_soup(html: str, mode: str) -> tuple[str, str]:
+    # Former path: full html.parser parse, then lookup of <title> and of the
+    # first script of the body.
+    scrapper = YouTubeHtmlScrapper(html=html, url="")
+    soup = BeautifulSoup(html, features="html.parser")
+    title = str(soup.title.text).removesuffix(" - YouTube")
+    script_text = soup.body.script.text.replace("\n", "")
+    if mode == "regex":
+        return title, scrapper.try_to_extract_short_description_with_regex(script_text)
+    obj = json.loads(script_text.removeprefix("var ytInitialPlayerResponse = ")[:-1])
+    return title, obj["videoDetails"]["shortDescription"]
+
+
+def extract_fast(html: str, mode: str) -> tuple[str, str]:
+    scrapper = YouTubeHtmlScrapper(html=html, url="")
+    return scrapper.title(), scrapper.short_description(mode=mode)
+
+
+def cpu_seconds_per_page(function, html: str, mode: str, repeat: int) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        function(html, mode)
+    return (time.process_time() - start) / repeat
+
+
+def load_pages() -> dict[str, tuple[str, tuple[str, ...]]]:
+    # Name: (html, modes).
+    config = FakeServerConfig(examples_dir=EXAMPLES_DIR, unavailable_rate=0)
+    pages = {}
+    for path in sorted(EXAMPLES_DIR.glob("*.html")):
+        template = path.read_text()
+        pages[path.name] = (template, ("regex",))
+        served = render_watch_page(
+            template, render_player_response(config, "abcdefghijk")
+        )
+        pages[f"{path.name} (served)"] = (served, ("json", "regex"))
+    return pages
+
+
+def main(repeat: int = 5):
+    for name, (html, modes) in load_pages().items():
+        for mode in modes:
+            assert extract_with_soup(html, mode) == extract_fast(html, mode)
+            soup_seconds = cpu_seconds_per_page(extract_with_soup, html, mode, repeat)
+            fast_seconds = cpu_seconds_per_page(extract_fast, html, mode, repeat)
+            print(
+                f"{name} {mode} ({len(html) / 1e6:.1f} MB): "
+                f"soup {soup_seconds * 1000:.1f} ms, "
+                f"fast {fast_seconds * 1000:.2f} ms, "
+                f"saved {(soup_seconds - fast_seconds) * 1000:.1f} ms CPU per page "
+                f"(x{soup_seconds / fast_seconds:.0f})"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Benchmark suite: database load, missing summaries lookup, search, scraping
+and history parsing, on synthetic trees of several sizes.
+
+Run from the repository root:
+
+    python -m benchmarks.suite --sizes 1000 10000
+    python -m benchmarks.suite --sizes 1000 --compare benchmarks/results/<run>.json
+
+Results are written as JSON in benchmarks/results/. With --compare, the
+medians are compared with a former run and the command exits non-zero when
+one of them regressed by more than --tolerance.
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+from ai_xp.database import FileDatabase
+from ai_xp.scrapper import MetadataPath, YouTubeHtmlScrapper
+from ai_xp.utils import render_video_url
+from ai_xp.youtube_history import HISTORY_COLUMNS, YouTubeHistoryAnalyzer
+from benchmarks.synthetic import write_generated_tree, write_takeout
+
+EXAMPLES_DIR = Path("resources/examples")
+RESULTS_DIR = Path("benchmarks/results")
+
+
+def measure(
+    function: Callable[[], Any],
+    *,
+    repeat: int,
+    setup: Callable[[], Any] | None = None,
+) -> list[float]:
+    # Wall time of each run; setup runs before each of them, untimed.
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def render_result(name: str, size: int | None, timings: list[float]) -> dict:
+    return {
+        "name": name,
+        "size": size,
+        "repeat": len(timings),
+        "min_seconds": min(timings),
+        "median_seconds": statistics.median(timings),
+    }
+
+
+def bench_database(root: Path, size: int, *, repeat: int) -> list[dict]:
+    inputs_dir, generated_dir = write_generated_tree(root, size)
+
+    def drop_state():
+        # Cold open: no manifest, search index nor input cache yet.
+        for name in ("manifest.sqlite", "search_index.sqlite"):
+            for path in generated_dir.glob(f"{name}*"):
+                path.unlink()
+        shutil.rmtree(generated_dir / "input_cache", ignore_errors=True)
+
+    def open_db() -> FileDatabase:
+        return FileDatabase.from_paths(inputs_dir, generated_dir)
+
+    results = [
+        render_result(
+            "database_from_paths_cold",
+            size,
+            measure(open_db, repeat=repeat, setup=drop_state),
+        ),
+        render_result(
+            "database_from_paths_warm", size, measure(open_db, repeat=repeat)
+        ),
+    ]
+
+    db = open_db()
+    indexers = [("fr", "generated")]
+    results.append(
+        render_result(
+            "find_missing_llm_outputs_candidates",
+            size,
+            measure(
+                lambda: db.find_missing_llm_outputs_candidates(
+                    indexers, keep_successful_only=True
+                ),
+                repeat=repeat,
+            ),
+        )
+    )
+    results.append(
+        render_result(
+            "search_scan",
+            size,
+            measure(lambda: db.search(db.input_dataframe, "monstre"), repeat=repeat),
+        )
+    )
+    results.append(
+        render_result(
+            "search_ranked",
+            size,
+            measure(
+                lambda: db.search(db.input_dataframe, "monstre", ranked=True),
+                repeat=repeat,
+            ),
+        )
+    )
+    return results
+
+
+def bench_history(root: Path, size: int, *, repeat: int) -> list[dict]:
+    path = write_takeout(root / f"takeout-{size}.json", size)
+    return [
+        render_result(
+            "youtube_history_from_path",
+            size,
+            measure(
+                lambda: YouTubeHistoryAnalyzer.from_path(
+                    path, consolidate=True, columns=HISTORY_COLUMNS
+                ),
+                repeat=repeat,
+            ),
+        )
+    ]
+
+
+def bench_scrapper(*, repeat: int) -> list[dict]:
+    results = []
+    for path in sorted(EXAMPLES_DIR.glob("*.html")):
+        html = path.read_text()
+
+        def extract():
+            # Same work as fetch_one_metadata, without the writes.
+            scrapper = YouTubeHtmlScrapper(html=html, url=render_video_url("x"))
+            if MetadataPath.from_scrapper(scrapper, "json").status == "success":
+                scrapper.to_dict()
+
+        results.append(
+            render_result(
+                f"scrapper[{path.name}]", None, measure(extract, repeat=repeat)
+            )
+        )
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(
+    results: list[dict], baseline: list[dict], *, tolerance: float
+) -> list[str]:
+    baseline_medians = {
+        (result["name"], result["size"]): result["median_seconds"]
+        for result in baseline
+    }
+    regressions = []
+    for result in results:
+        former = baseline_medians.get((result["name"], result["size"]))
+        if former is None:
+            continue
+        ratio = result["median_seconds"] / former
+        print(f"{result['name']} ({result['size']}): x{ratio:.2f} vs baseline")
+        if ratio > 1 + tolerance:
+            regressions.append(f"{result['name']} ({result['size']})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = bench_scrapper(repeat=args.repeat)
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory(prefix=f"ai_xp_bench_{size}_") as tmp_dir:
+            print(f"Benchmarking {size} artifacts")
+            results += bench_history(Path(tmp_dir), size, repeat=args.repeat)
+            results += bench_database(Path(tmp_dir), size, repeat=args.repeat)
+    print(pd.DataFrame(results).to_string(index=False))
+
+    run = {
+        "created": pd.Timestamp.now().isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"{pd.Timestamp.now():%Y-%m-%dT%H-%M-%S}.json"
+    output.parent.mkdir(exist_ok=True, parents=True)
+    output.write_text(json.dumps(run, indent=2))
+    print(f"Results written into {output}")
+
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text())["results"]
+        regressions = compare(results, baseline, tolerance=args.tolerance)
+        if regressions:
+            print(f"Regressions above {args.tolerance:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,140 @@
+"""
+Synthetic inputs and ``generated/`` trees, named like the real artifacts.
+"""
+
+import json
+import random
+from pathlib import Path
+
+import pandas as pd
+
+from ai_xp.llm_proxy import AiSummaryPath
+from ai_xp.scrapper import MetadataPath
+from ai_xp.transcript import TranscriptPath
+from ai_xp.utils import render_title_slug, render_video_url
+
+WORDS = (
+    "comment fonctionne un monstre unicellulaire histoire science python "
+    "cuisine voyage musique physique quantique jardin économie cinéma "
+    "astronomie mathématiques données océan volcan robot"
+).split()
+
+
+def render_video_id(index: int) -> str:
+    # 11 characters, like the real ids.
+    return f"v{index:010d}"
+
+
+def render_title(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(6)).capitalize()
+
+
+def write_takeout(path: Path, n: int, *, seed: int = 0) -> Path:
+    """Watch history of n videos in the Takeout format, plus ads and playlists."""
+    rng = random.Random(seed)
+    start = pd.Timestamp("2023-01-01T00:00:00Z")
+    entries = []
+    for index in range(n):
+        entry = {
+            "header": "YouTube",
+            "title": f"Vous avez regardé {render_title(rng)}",
+            "titleUrl": render_video_url(render_video_id(index)),
+            "time": (start + pd.Timedelta(minutes=7 * index)).isoformat(),
+            "products": ["YouTube"],
+            "activityControls": ["Historique des vidéos regardées sur YouTube"],
+        }
+        entries.append(entry)
+        # Entries dropped by the consolidation, on top of the n videos.
+        if index % 50 == 0:
+            entries.append(
+                {**entry, "titleUrl": "https://www.youtube.com/playlist?list=PL0"}
+            )
+        if index % 97 == 0:
+            entries.append(
+                {
+                    **entry,
+                    "titleUrl": "https://www.google.com/aclk?sa=l",
+                    "details": [{"name": "From Google Ads"}],
+                }
+            )
+    path.parent.mkdir(exist_ok=True, parents=True)
+    path.write_text(json.dumps(entries, ensure_ascii=False, indent=2))
+    return path
+
+
+def write_inputs(root: Path, n: int, *, seed: int = 0) -> Path:
+    """Inputs directory listing a synthetic history of n videos."""
+    inputs_dir = root / "inputs"
+    inputs_dir.mkdir(exist_ok=True, parents=True)
+    takeout_path = write_takeout(root / "takeout" / "watch-history.json", n, seed=seed)
+    (inputs_dir / "watch_history_json_list.txt").write_text(f"{takeout_path}\n")
+    return inputs_dir
+
+
+def write_generated_tree(root: Path, n: int, *, seed: int = 0) -> tuple[Path, Path]:
+    """
+    Write an inputs directory and a generated tree of n videos.
+
+    Every video has a metadata file, most have a transcript and half of those
+    have a summary. Return (inputs dir, generated dir).
+    """
+    rng = random.Random(seed)
+    inputs_dir = write_inputs(root, n, seed=seed)
+    generated_dir = root / "generated"
+    metadata_dir = generated_dir / "metadata_output"
+    transcript_dir = generated_dir / "transcript_output"
+    llm_output_dir = generated_dir / "llm_output" / "2025-04-20T10-00-00-000001"
+    for directory in (metadata_dir, transcript_dir, llm_output_dir):
+        directory.mkdir(exist_ok=True, parents=True)
+
+    for index in range(n):
+        video_id = render_video_id(index)
+        title = render_title(rng)
+        title_slug = render_title_slug(title)
+        metadata_path = MetadataPath(
+            video_id=video_id, title_slug=title_slug, status="success", extension="json"
+        )
+        (metadata_dir / metadata_path.to_filename()).write_text(
+            json.dumps(
+                {"title": title, "description": render_title(rng)}, ensure_ascii=False
+            )
+        )
+        if index % 10 == 9:
+            transcript_path = TranscriptPath(
+                language_code="_",
+                source="_",
+                video_id=video_id,
+                title_slug=title_slug,
+                status="TranscriptsDisabled",
+                extension="json",
+            )
+            (transcript_dir / transcript_path.to_filename()).write_text(
+                json.dumps({"error": {"exc_name": "TranscriptsDisabled"}})
+            )
+            continue
+        transcript_path = TranscriptPath(
+            language_code="fr",
+            source="generated",
+            video_id=video_id,
+            title_slug=title_slug,
+            status="success",
+            extension="json",
+        )
+        snippets = [
+            {"text": render_title(rng), "start": 4.0 * i, "duration": 4.0}
+            for i in range(20)
+        ]
+        (transcript_dir / transcript_path.to_filename()).write_text(
+            json.dumps({"video_id": video_id, "snippets": snippets}, ensure_ascii=False)
+        )
+        if index % 2 == 0:
+            summary_path = AiSummaryPath(
+                prompt_family="basic",
+                transcript_path_suffix=TranscriptPath(
+                    **{**transcript_path.asdict(), "extension": "md"}
+                ),
+            )
+            (llm_output_dir / summary_path.to_filename()).write_text(
+                f"# {title}\n\n{render_title(rng)}\n"
+            )
+    return inputs_dir, generated_dir
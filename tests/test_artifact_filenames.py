@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from ai_xp.database import (
+    AI_SUMMARY_PATH_COLUMNS,
+    METADATA_PATH_COLUMNS,
+    TRANSCRIPT_PATH_COLUMNS,
+    split_artifact_filenames,
+)
+from ai_xp.llm_proxy import AiSummaryPath
+from ai_xp.scrapper import MetadataPath
+from ai_xp.transcript import TranscriptPath
+
+FILENAMES = {
+    METADATA_PATH_COLUMNS: (
+        MetadataPath,
+        [
+            "abc123.some-title.success.json",
+            "def456.no_slug.likely-an-advertisement.json",
+        ],
+    ),
+    TRANSCRIPT_PATH_COLUMNS: (
+        TranscriptPath,
+        [
+            "fr.generated.abc123.some-title.success.json",
+            "_._.ghi789.other.TranscriptsDisabled.json",
+        ],
+    ),
+    AI_SUMMARY_PATH_COLUMNS: (
+        AiSummaryPath,
+        ["basic.fr.generated.abc123.some-title.success.md"],
+    ),
+}
+
+
+@pytest.mark.parametrize("columns", FILENAMES)
+def test_split_artifact_filenames_matches_from_path(columns: tuple[str, ...]):
+    parser, filenames = FILENAMES[columns]
+    paths = [Path("generated") / filename for filename in filenames]
+
+    expected = pd.DataFrame(
+        [{**parser.from_path(path).asdict(), "path": path} for path in paths]
+    )
+    pd.testing.assert_frame_equal(split_artifact_filenames(paths, columns), expected)
+
+
+def test_split_artifact_filenames_rejects_malformed_names():
+    with pytest.raises(ValueError, match="abc123.success.json"):
+        split_artifact_filenames(
+            [Path("def456.title.success.json"), Path("abc123.success.json")],
+            METADATA_PATH_COLUMNS,
+        )
@@ -0,0 +1,118 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from youtube_transcript_api import (
+    FetchedTranscript,
+    FetchedTranscriptSnippet,
+    RequestBlocked,
+    TranscriptsDisabled,
+)
+
+from ai_xp import entrypoint
+from ai_xp.database import FileDatabase
+from ai_xp.job_ledger import JobKey, JobLedger
+from ai_xp.layout import ArtifactDirectory
+from ai_xp.transcript import (
+    TranscriptErrorResult,
+    TranscriptPath,
+    TranscriptSuccessResult,
+    extract_video_id,
+)
+from benchmarks.synthetic import write_inputs
+
+VIDEO_ID = "abcdefghijk"
+
+
+def render_success(video_url: str, **kwargs) -> TranscriptSuccessResult:
+    snippets = [FetchedTranscriptSnippet(text="bonjour", start=0.0, duration=1.0)]
+    transcript = FetchedTranscript(
+        snippets=snippets,
+        video_id=extract_video_id(video_url),
+        language="French (auto-generated)",
+        language_code="fr",
+        is_generated=True,
+    )
+    return TranscriptSuccessResult(transcript=transcript)
+
+
+def write_error_artifact(transcript_dir: Path, video_id: str, error: Exception):
+    result = TranscriptErrorResult(error=error, video_id=video_id)
+    path = (
+        ArtifactDirectory.transcripts(transcript_dir).directory(video_id)
+        / result.generate_transcript_parsed_name("title").to_filename()
+    )
+    path.parent.mkdir(exist_ok=True, parents=True)
+    path.write_text(result.to_json())
+    return path
+
+
+def handle_video(transcript_dir: Path, ledger: JobLedger):
+    entrypoint.handle_video(
+        "Title",
+        VIDEO_ID,
+        transcript_dir,
+        transcript_dir.parent / "llm_output",
+        False,
+        pd.Timestamp.now(),
+        ledger=ledger,
+    )
+
+
+@pytest.fixture
+def ledger(tmp_path: Path) -> JobLedger:
+    return JobLedger.open(tmp_path / "jobs.sqlite")
+
+
+def test_transient_error_artifact_is_replaced_by_the_retry(
+    tmp_path: Path, ledger: JobLedger, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(entrypoint, "get_youtube_transcript", render_success)
+    transcript_dir = tmp_path / "transcript_output"
+    error_path = write_error_artifact(
+        transcript_dir, VIDEO_ID, RequestBlocked(VIDEO_ID)
+    )
+    key = JobKey(stage="transcript", video_id=VIDEO_ID)
+    ledger.fail(key, "RequestBlocked", attempt=True)
+
+    handle_video(transcript_dir, ledger)
+
+    paths = ArtifactDirectory.transcripts(transcript_dir).paths(VIDEO_ID)
+    assert [TranscriptPath.from_path(path).status for path in paths] == ["success"]
+    assert not error_path.exists()
+    assert ledger.state(key) == ("done", 2)
+
+
+def test_permanent_error_artifact_is_kept(
+    tmp_path: Path, ledger: JobLedger, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(entrypoint, "get_youtube_transcript", pytest.fail)
+    transcript_dir = tmp_path / "transcript_output"
+    error = TranscriptsDisabled(VIDEO_ID)
+    error_path = write_error_artifact(transcript_dir, VIDEO_ID, error)
+    ledger.fail(JobKey(stage="transcript", video_id=VIDEO_ID), "TranscriptsDisabled")
+
+    handle_video(transcript_dir, ledger)
+
+    assert ArtifactDirectory.transcripts(transcript_dir).paths(VIDEO_ID) == [error_path]
+
+
+def test_main_retries_the_videos_of_error_artifacts(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(entrypoint, "get_youtube_transcript", render_success)
+    write_inputs(tmp_path, 3)
+    transcript_dir = tmp_path / "generated" / "transcript_output"
+    video_ids = FileDatabase.from_paths(
+        tmp_path / "inputs", tmp_path / "generated"
+    ).input_dataframe.index
+    write_error_artifact(transcript_dir, video_ids[0], RequestBlocked(video_ids[0]))
+
+    entrypoint.main()
+
+    db = FileDatabase.from_paths(tmp_path / "inputs", tmp_path / "generated")
+    assert db.transcript_errors().empty
+    assert set(db.transcript_dataframe.index.get_level_values("video_id")) == set(
+        video_ids
+    )
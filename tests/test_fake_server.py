@@ -0,0 +1,187 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import ai_xp.llm_proxy
+from ai_xp.database import FileDatabase, transcript_job_key
+from ai_xp.fake_server import FakeBehaviour, FakeServer, FakeServerConfig
+from ai_xp.http_client import PooledSession
+from ai_xp.llm_proxy import OpenRouterAiProxy
+from ai_xp.scrapper import MetadataPath, YouTubeHtmlScrapper
+from ai_xp.transcript import (
+    TranscriptBatchFetcher,
+    TranscriptErrorResult,
+    TranscriptSuccessResult,
+    get_youtube_transcript,
+)
+from ai_xp.utils import render_video_url
+from benchmarks.synthetic import write_inputs
+
+EXAMPLES_DIR = Path(__file__).parents[1] / "resources" / "examples"
+PROMPTS_PATH = Path(__file__).parents[1] / "resources" / "prompts" / "prompts.toml"
+
+
+@pytest.fixture
+def server():
+    config = FakeServerConfig(
+        examples_dir=EXAMPLES_DIR, transcripts_disabled_rate=0, unavailable_rate=0
+    )
+    with FakeServer(config=config) as server:
+        yield server
+
+
+def test_pipeline_requests_reach_the_fake_server(server: FakeServer):
+    session = PooledSession(base_url_overrides=server.base_url_overrides())
+    url = render_video_url("abcdefghijk")
+
+    scrapper = YouTubeHtmlScrapper.from_url(url, http_client=session)
+    assert scrapper is not None
+    assert MetadataPath.from_scrapper(scrapper, "json").status == "success"
+    assert scrapper.to_dict()["playability_status"] == "OK"
+
+    result = get_youtube_transcript(
+        url, ("fr",), http_client=session, video_metadata=scrapper.to_dict()
+    )
+    assert isinstance(result, TranscriptSuccessResult)
+    assert len(result.transcript.snippets) == server.config.snippets_per_transcript
+
+    proxy = OpenRouterAiProxy(api_key="fake", http_client=session)
+    product = proxy.prompt({"user": "Résume ce transcript."})
+    assert product["status_code"] == 200
+    assert product["response"]["choices"][0]["message"]["content"]
+
+
+def test_rate_limited_requests_get_429():
+    config = FakeServerConfig(
+        examples_dir=EXAMPLES_DIR,
+        openrouter=FakeBehaviour(requests_per_second=0.001, burst=1),
+    )
+    with FakeServer(config=config) as server:
+        session = PooledSession(base_url_overrides=server.base_url_overrides())
+        proxy = OpenRouterAiProxy(api_key="fake", http_client=session)
+        assert proxy.prompt({"user": "1"})["status_code"] == 200
+        product = proxy.prompt({"user": "2"})
+    assert product["status_code"] == 429
+    assert product["response"]["error"]["code"] == 429
+
+
+def test_streamed_completion_is_decoded_as_utf8(server: FakeServer):
+    session = PooledSession(base_url_overrides=server.base_url_overrides())
+    proxy = OpenRouterAiProxy(api_key="fake", http_client=session)
+    deltas: list[str] = []
+    product = proxy.prompt({"user": "Résume ce transcript."}, on_delta=deltas.append)
+
+    content = product["response"]["choices"][0]["message"]["content"]
+    assert "error" not in product["response"]
+    assert content == "".join(deltas)
+    assert any(char in content for char in "éèà")
+    assert "Ã" not in content
+
+
+def test_non_json_response_is_reported_as_an_error(server: FakeServer):
+    session = PooledSession(base_url_overrides=server.base_url_overrides())
+    proxy = OpenRouterAiProxy(
+        api_key="fake",
+        http_client=session,
+        endpoint="https://openrouter.ai/api/v1/not-found",
+    )
+    for on_delta in (None, print):
+        product = proxy.prompt({"user": "1"}, on_delta=on_delta)
+        assert product["response"]["error"]["code"] == 404
+
+
+@pytest.mark.parametrize(
+    ("playability_status", "fetched"), [("OK", False), ("LOGIN_REQUIRED", True)]
+)
+def test_captions_are_only_known_disabled_on_a_playable_page(
+    server: FakeServer, playability_status: str, fetched: bool
+):
+    session = PooledSession(base_url_overrides=server.base_url_overrides())
+    video_metadata = {"caption_tracks": [], "playability_status": playability_status}
+    result = get_youtube_transcript(
+        render_video_url("abcdefghijk"),
+        ("fr",),
+        http_client=session,
+        video_metadata=video_metadata,
+    )
+    if fetched:
+        assert isinstance(result, TranscriptSuccessResult)
+    else:
+        assert isinstance(result, TranscriptErrorResult)
+        assert type(result.error).__name__ == "TranscriptsDisabled"
+
+
+def test_batch_fetcher_translates_and_lists_a_video_once(server: FakeServer):
+    fetcher = TranscriptBatchFetcher(
+        http_client=PooledSession(base_url_overrides=server.base_url_overrides())
+    )
+    keys = [("fr", "generated"), ("en", "generated"), ("fr", "manually_created")]
+
+    results = fetcher.fetch_many("abcdefghijk", keys)
+
+    assert results[("fr", "generated")].transcript.language_code == "fr"
+    translated = results[("en", "generated")].transcript
+    assert (translated.language_code, translated.is_generated) == ("en", True)
+    assert isinstance(results[("fr", "manually_created")], TranscriptErrorResult)
+
+    # Listings and transcripts are kept for the lifetime of the fetcher.
+    counts = server.counts.copy()
+    results = fetcher.fetch_many("abcdefghijk", keys[:2])
+    assert results[("fr", "generated")].transcript.language_code == "fr"
+    assert server.counts == counts
+
+
+def test_transcript_languages_are_not_fetched_again_after_a_permanent_failure(
+    server: FakeServer, tmp_path: Path
+):
+    db = FileDatabase.from_paths(write_inputs(tmp_path, 3), tmp_path / "generated")
+    session = PooledSession(base_url_overrides=server.base_url_overrides())
+    keys = [("fr", "generated"), ("fr", "manually_created")]
+    rate = {"requests_per_second": 100.0, "burst": 10, "http_client": session}
+
+    db = db.fetch_missing_transcript_languages(keys, **rate)
+    for video_id in db.input_dataframe.index:
+        state = db.job_ledger.state
+        assert state(transcript_job_key(video_id, keys[0])) == ("done", 1)
+        assert state(transcript_job_key(video_id, keys[1])) == ("failed-permanent", 1)
+
+    counts = server.counts.copy()
+    db.fetch_missing_transcript_languages(keys, **rate)
+    assert server.counts == counts
+
+
+def test_fetched_database_matches_a_fresh_listing(
+    server: FakeServer, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(
+        ai_xp.llm_proxy,
+        "count_tokens_batch",
+        lambda texts, **kwargs: [len(text.split()) for text in texts],
+    )
+    generated_dir = tmp_path / "generated"
+    db = FileDatabase.from_paths(write_inputs(tmp_path, 5), generated_dir)
+    session = PooledSession(base_url_overrides=server.base_url_overrides())
+    rate = {"requests_per_second": 100.0, "burst": 10, "http_client": session}
+
+    db = db.fetch_missing_metadata(**rate).fetch_missing_transcripts(**rate)
+    db = db.fetch_missing_llm_outputs(
+        http_client=session, api_key="fake", prompts_path=PROMPTS_PATH
+    )
+
+    # The rows appended by the write-through are those of a full listing.
+    fresh = FileDatabase.from_paths(db.input_lookup_dir_path, generated_dir)
+    for name in ("metadata_dataframe", "transcript_dataframe", "llm_output_dataframe"):
+        df = getattr(db, name)
+        assert not df.empty
+        pd.testing.assert_frame_equal(
+            df.sort_index(), getattr(fresh, name).sort_index(), check_like=True
+        )
+
+    # A rewritten file replaces its row.
+    paths = [Path(path) for path in db.transcript_dataframe["path"]]
+    rewritten = db.with_transcript_paths(paths)
+    pd.testing.assert_frame_equal(
+        rewritten.transcript_dataframe.sort_index(),
+        db.transcript_dataframe.sort_index(),
+    )
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import pytest
+
+import ai_xp.database
+from ai_xp.fake_server import (
+    FakeServerConfig,
+    render_player_response,
+    render_watch_page,
+)
+from ai_xp.html_archive import HtmlArchive, reparse_archive, reparse_one
+
+EXAMPLES_DIR = Path(__file__).parents[1] / "resources" / "examples"
+
+
+@pytest.fixture
+def archive(tmp_path: Path) -> HtmlArchive:
+    config = FakeServerConfig(examples_dir=EXAMPLES_DIR, unavailable_rate=0)
+    template = sorted(EXAMPLES_DIR.glob("*.html"))[0].read_text()
+    archive = HtmlArchive(root=tmp_path / "html_archive")
+    for video_id in ("abcdefghijk", "bcdefghijkl"):
+        page = render_watch_page(template, render_player_response(config, video_id))
+        archive.put(video_id, page)
+    return archive
+
+
+@pytest.fixture
+def metadata_dir(tmp_path: Path) -> Path:
+    metadata_dir = tmp_path / "metadata_output"
+    metadata_dir.mkdir()
+    for video_id in ("abcdefghijk", "bcdefghijkl"):
+        (metadata_dir / f"{video_id}.no_slug.likely-an-advertisement.json").write_text(
+            "{}"
+        )
+    return metadata_dir
+
+
+def test_reparse_archive_replaces_former_artifacts(
+    archive: HtmlArchive, metadata_dir: Path
+):
+    written_paths = reparse_archive(archive, metadata_dir, max_workers=2)
+
+    assert sorted(path.name.split(".")[2] for path in written_paths) == [
+        "success",
+        "success",
+    ]
+    assert sorted(metadata_dir.glob("*.json")) == sorted(written_paths)
+
+
+def test_reparse_archive_keeps_going_after_a_failure(
+    archive: HtmlArchive, metadata_dir: Path
+):
+    archive.path("bcdefghijkl").write_bytes(b"not gzip")
+
+    written_paths = reparse_archive(archive, metadata_dir, max_workers=2)
+
+    assert [path.name.split(".")[0] for path in written_paths] == ["abcdefghijk"]
+    # The artifact of the failed page is kept.
+    assert (metadata_dir / "bcdefghijkl.no_slug.likely-an-advertisement.json").is_file()
+
+
+def test_reparse_one_keeps_the_former_artifact_on_error(
+    archive: HtmlArchive, metadata_dir: Path, monkeypatch: pytest.MonkeyPatch
+):
+    def fail(*args, **kwargs):
+        raise AttributeError("scrapper bug")
+
+    monkeypatch.setattr(ai_xp.database, "fetch_one_metadata", fail)
+    former_path = metadata_dir / "abcdefghijk.no_slug.likely-an-advertisement.json"
+
+    assert reparse_one(archive.root, metadata_dir, "abcdefghijk", [former_path]) is None
+    assert former_path.is_file()
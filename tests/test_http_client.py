@@ -0,0 +1,71 @@
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pytest
+
+from ai_xp.fake_server import FakeServer, FakeServerConfig
+from ai_xp.http_client import ConnectionPool, PooledSession, default_http_client
+
+EXAMPLES_DIR = Path(__file__).parents[1] / "resources" / "examples"
+
+
+def test_default_clients_only_share_the_connections():
+    scrapper_session, transcript_session = default_http_client(), default_http_client()
+    assert scrapper_session is not transcript_session
+    assert scrapper_session.pool is transcript_session.pool
+    assert scrapper_session.get_adapter("https://www.youtube.com") is (
+        transcript_session.get_adapter("https://openrouter.ai")
+    )
+
+    transcript_session.headers["Accept-Language"] = "fr"
+    transcript_session.cookies.set("CONSENT", "YES+")
+    assert "Accept-Language" not in scrapper_session.headers
+    assert not scrapper_session.cookies
+
+
+def test_fork_keeps_the_settings_and_the_pool():
+    session = PooledSession(
+        read_timeout=3.0, base_url_overrides={"https://www.youtube.com": "http://x"}
+    )
+    forked = session.fork()
+    assert forked is not session
+    assert forked.pool is session.pool
+    assert forked.timeout == (5.0, 3.0)
+    assert forked.base_url_overrides == session.base_url_overrides
+
+
+def test_closing_a_session_keeps_a_shared_pool(monkeypatch: pytest.MonkeyPatch):
+    pool = ConnectionPool()
+    closed = []
+    monkeypatch.setattr(pool.adapter, "close", lambda: closed.append(True))
+
+    PooledSession(pool=pool).close()
+    assert closed == []
+
+    own = PooledSession()
+    monkeypatch.setattr(own.pool.adapter, "close", lambda: closed.append(True))
+    own.close()
+    assert closed
+
+
+@pytest.mark.parametrize("consume", [True, False])
+def test_streamed_response_holds_its_slot_until_released(consume: bool):
+    config = FakeServerConfig(examples_dir=EXAMPLES_DIR)
+    with FakeServer(config=config) as server:
+        session = PooledSession(
+            max_per_host=1, base_url_overrides=server.base_url_overrides()
+        )
+        semaphore = session.pool.semaphore(urlsplit(server.base_url).netloc)
+
+        response = session.get("https://openrouter.ai/api/v1/auth/key", stream=True)
+        assert not semaphore.acquire(blocking=False)
+        if consume:
+            assert response.json()["data"]["label"] == "fake"
+        response.close()
+        assert semaphore.acquire(blocking=False)
+        semaphore.release()
+
+        # The slot is only released once.
+        response.close()
+        session.get("https://openrouter.ai/api/v1/auth/key")
+        assert semaphore.acquire(blocking=False)
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from ai_xp.database import FileDatabase
+from ai_xp.input_cache import InputCache
+from benchmarks.synthetic import write_inputs
+
+
+def test_input_cache_parses_changed_files_only(tmp_path: Path):
+    pytest.importorskip("pyarrow")
+    cache = InputCache(root=tmp_path / "input_cache")
+    path = tmp_path / "input.json"
+    path.write_text("1")
+
+    def parse(path: Path) -> pd.DataFrame:
+        return pd.DataFrame({"value": [int(path.read_text())]})
+
+    assert cache.frame("test", path, parse)["value"].tolist() == [1]
+    assert cache.frame("test", path, parse)["value"].tolist() == [1]
+    path.write_text("2")
+    assert cache.frame("test", path, parse)["value"].tolist() == [2]
+    assert (cache.stats.hits, cache.stats.misses) == (1, 2)
+    # The entry of the former content was replaced.
+    assert len(list(cache.root.glob("*.parquet"))) == 1
+
+
+def test_from_paths_without_pyarrow(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    inputs_dir = write_inputs(tmp_path, 5)
+    # A None entry makes any "import pyarrow" raise ImportError.
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+
+    db = FileDatabase.from_paths(inputs_dir, tmp_path / "generated")
+    assert db.input_cache is None
+    assert len(db.input_dataframe) == 5
@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import pytest
+
+from ai_xp.job_ledger import JobKey, JobLedger, classify_error
+
+KEY = JobKey(stage="transcript", video_id="abc123")
+
+
+@pytest.fixture
+def ledger(tmp_path: Path) -> JobLedger:
+    return JobLedger.open(tmp_path / "jobs.sqlite", max_attempts=2)
+
+
+@pytest.mark.parametrize(
+    ("exc_name", "kind"),
+    [
+        ("TranscriptsDisabled", "permanent"),
+        ("likely-video-unavailable", "permanent"),
+        ("OpenRouterRequestFailed", "permanent"),
+        ("RequestBlocked", "transient"),
+        ("OpenRouterRateLimitExceeded", "transient"),
+        # Unknown errors are retried, bounded by max_attempts.
+        ("SomethingNew", "transient"),
+    ],
+)
+def test_classify_error(exc_name: str, kind: str):
+    assert classify_error(exc_name) == kind
+
+
+def test_new_job_should_run(ledger: JobLedger):
+    assert ledger.state(KEY) == (None, 0)
+    assert ledger.should_run(KEY)
+
+
+def test_succeeded_job_does_not_run_again(ledger: JobLedger):
+    ledger.start(KEY)
+    ledger.succeed(KEY)
+    assert ledger.state(KEY) == ("done", 1)
+    assert not ledger.should_run(KEY)
+
+
+def test_permanent_failure_is_not_retried(ledger: JobLedger):
+    ledger.start(KEY)
+    ledger.fail(KEY, "TranscriptsDisabled")
+    assert ledger.state(KEY) == ("failed-permanent", 1)
+    assert not ledger.should_run(KEY)
+    assert ledger.retryable("transcript").empty
+
+
+def test_transient_failure_is_retried_until_max_attempts(ledger: JobLedger):
+    ledger.start(KEY)
+    ledger.fail(KEY, "RequestBlocked")
+    assert ledger.state(KEY) == ("failed-transient", 1)
+    assert ledger.should_run(KEY)
+    assert list(ledger.retryable("transcript")["video_id"]) == ["abc123"]
+
+    ledger.start(KEY)
+    ledger.fail(KEY, "RequestBlocked")
+    assert ledger.state(KEY) == ("failed-transient", 2)
+    assert not ledger.should_run(KEY)
+    assert ledger.retryable("transcript").empty
+
+
+def test_interrupted_job_is_retried(ledger: JobLedger):
+    ledger.start(KEY)
+    assert ledger.state(KEY) == ("running", 1)
+    assert ledger.should_run(KEY)
+
+
+def test_ledger_persists_across_opens(tmp_path: Path):
+    ledger = JobLedger.open(tmp_path / "jobs.sqlite")
+    ledger.start(KEY)
+    ledger.succeed(KEY)
+    ledger.close()
+    assert JobLedger.open(tmp_path / "jobs.sqlite").state(KEY) == ("done", 1)
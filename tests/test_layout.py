@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import pandas as pd
+
+from ai_xp.database import metadata_dir_to_dataframe, transcripts_dir_to_dataframe
+from ai_xp.layout import ArtifactDirectory, render_shard_name
+from ai_xp.manifest import FileManifest
+
+
+def test_shard_keeps_loaders_manifest_and_lookups_consistent(tmp_path: Path):
+    metadata = ArtifactDirectory.metadata(tmp_path / "metadata_output")
+    transcripts = ArtifactDirectory.transcripts(tmp_path / "transcript_output")
+    for directory in (metadata.root, transcripts.root, tmp_path / "llm_output"):
+        directory.mkdir()
+    for video_id in ("abc123", "def456"):
+        (metadata.root / f"{video_id}.some-title.success.json").write_text("{}")
+        (
+            transcripts.root / f"fr.generated.{video_id}.some-title.success.json"
+        ).write_text("{}")
+    manifest = FileManifest.open(
+        tmp_path / "manifest.sqlite",
+        metadata_dir_path=metadata.root,
+        transcript_dir_path=transcripts.root,
+        llm_output_dir_path=tmp_path / "llm_output",
+    )
+    manifest.reconcile()
+    flat_metadata = metadata_dir_to_dataframe(metadata.root)
+
+    assert metadata.shard() == 2
+    assert transcripts.shard() == 2
+    assert metadata.shard() == 0
+
+    shard_dir = transcripts.root / render_shard_name("abc123")
+    assert transcripts.directory("abc123") == shard_dir
+    assert transcripts.paths("abc123") == [
+        shard_dir / "fr.generated.abc123.some-title.success.json"
+    ]
+    assert not list(metadata.root.glob("*.json"))
+
+    sharded_metadata = metadata_dir_to_dataframe(metadata.root)
+    pd.testing.assert_frame_equal(
+        sharded_metadata.drop(columns="path"), flat_metadata.drop(columns="path")
+    )
+    manifest.reconcile()
+    pd.testing.assert_frame_equal(manifest.metadata_dataframe(), sharded_metadata)
+    pd.testing.assert_frame_equal(
+        manifest.transcript_dataframe(),
+        transcripts_dir_to_dataframe(transcripts.root),
+    )
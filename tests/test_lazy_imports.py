@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+import pytest
+
+# Heavy dependencies only needed by some call sites (plots, HTML parsing,
+# token counting): importing the package must not load them.
+LAZY_DEPENDENCIES = ("matplotlib", "xarray", "bs4", "tiktoken")
+
+
+@pytest.mark.parametrize(
+    "module", ["ai_xp.transcript", "ai_xp.scrapper", "ai_xp.database"]
+)
+def test_import_does_not_load_heavy_dependencies(module: str):
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(name for name in {LAZY_DEPENDENCIES!r} if name in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+    assert output.strip() == ""
+
+
+def test_transcript_import_does_not_load_pandas():
+    code = "import sys, ai_xp.transcript; print('pandas' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+    assert output.strip() == "False"
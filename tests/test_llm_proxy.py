@@ -0,0 +1,177 @@
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import ai_xp.llm_proxy
+import ai_xp.tokens
+from ai_xp.llm_proxy import AiSummarizer, OpenRouterAiProxy, SummaryJob, VideoModel
+from ai_xp.rate_limit import AdaptiveConcurrencyLimiter
+from ai_xp.tokens import TranscriptChunk, chunk_snippets
+
+PROMPTS_PATH = Path(__file__).parents[1] / "resources" / "prompts" / "prompts.toml"
+
+
+def test_limiter_starts_at_the_initial_limit():
+    assert AdaptiveConcurrencyLimiter(max_limit=8).limit == 1
+    assert AdaptiveConcurrencyLimiter(max_limit=8, initial_limit=6).limit == 6
+    assert AdaptiveConcurrencyLimiter(max_limit=8, initial_limit=20).limit == 8
+
+
+def test_summarize_many_keeps_going_after_an_unexpected_error(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    proxy = OpenRouterAiProxy(
+        api_key="fake",
+        limiter=AdaptiveConcurrencyLimiter(max_limit=2, initial_limit=2),
+    )
+    summarizer = AiSummarizer.instantiate(proxy, prompts_path=PROMPTS_PATH)
+
+    def summarize_with_ai(self, video, *args):
+        if video.video_id == "broken":
+            raise KeyError("choices")
+        return {"summary": tmp_path / f"{video.video_id}.md"}
+
+    monkeypatch.setattr(AiSummarizer, "summarize_with_ai", summarize_with_ai)
+    jobs = [
+        SummaryJob(
+            video=SimpleNamespace(video_id=video_id),
+            transcript_file_path=tmp_path / f"{video_id}.json",
+            llm_output_dir_path=tmp_path,
+            prompt_language_code="fr",
+            prompt_family="default",
+        )
+        for video_id in ("abc123", "broken", "def456")
+    ]
+
+    results = summarizer.summarize_many(jobs)
+
+    assert [result["summary"].stem for result in results] == ["abc123", "def456"]
+
+
+class ScriptedProxy:
+    # Stands in for OpenRouterAiProxy: the first call of a prompt containing
+    # rate_limited_text is rate limited.
+    def __init__(
+        self,
+        rate_limited_text: str,
+        *,
+        limiter: AdaptiveConcurrencyLimiter | None = None,
+    ):
+        self.rate_limited_text = rate_limited_text
+        self.limiter = limiter
+        self.calls: Counter[str] = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def prompt(self, prompts: dict, *, bypass_cache: bool = False) -> dict:
+        with self.lock:
+            self.calls[prompts["user"]] += 1
+            count = self.calls[prompts["user"]]
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.01)
+        with self.lock:
+            self.in_flight -= 1
+        if self.rate_limited_text in prompts["user"] and count == 1:
+            response = {"error": {"code": 429, "message": "Rate limit exceeded"}}
+        else:
+            response = {"choices": [{"message": {"content": "Résumé"}}]}
+        return {"status_code": 200, "rate_limit_headers": {}, "response": response}
+
+
+def render_chunks(n: int) -> list[TranscriptChunk]:
+    return [
+        TranscriptChunk(
+            index=index,
+            start_seconds=30.0 * index,
+            end_seconds=30.0 * (index + 1),
+            text=f"[0:{index // 2:02d}:{30 * (index % 2):02d}] chunk {index}",
+            tokens=3,
+        )
+        for index in range(n)
+    ]
+
+
+def test_rate_limited_chunk_is_retried_on_its_own():
+    proxy = ScriptedProxy(rate_limited_text="[0:00:30] chunk 1")
+    summarizer = AiSummarizer.instantiate(proxy, prompts_path=PROMPTS_PATH)
+    video = VideoModel(video_id="abc123", title="Title", description=None)
+
+    products = summarizer.summarize_chunks(
+        video, render_chunks(2), "fr", backoff_seconds=0
+    )
+
+    assert len(products) == 2
+    # The first chunk was sent once, the rate-limited one twice.
+    assert sorted(proxy.calls.values()) == [1, 2]
+
+
+@pytest.mark.parametrize(
+    ("limiter", "max_in_flight"),
+    [(None, 1), (AdaptiveConcurrencyLimiter(max_limit=3), 3)],
+)
+def test_chunk_workers_are_capped_by_the_limiter(
+    limiter: AdaptiveConcurrencyLimiter | None, max_in_flight: int
+):
+    proxy = ScriptedProxy(rate_limited_text="never", limiter=limiter)
+    summarizer = AiSummarizer.instantiate(proxy, prompts_path=PROMPTS_PATH)
+    video = VideoModel(video_id="abc123", title="Title", description=None)
+
+    products = summarizer.summarize_chunks(video, render_chunks(12), "fr")
+
+    assert len(products) == 12
+    assert proxy.max_in_flight == max_in_flight
+
+
+def test_chunks_are_marked_with_timecodes(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(
+        ai_xp.tokens,
+        "count_tokens_batch",
+        lambda texts, **kwargs: [len(text.split()) for text in texts],
+    )
+    snippets = [
+        {"text": "un deux", "start": 0.0, "duration": 2.0},
+        {"text": "trois quatre", "start": 65.0, "duration": 2.0},
+        {"text": "cinq six", "start": 3700.0, "duration": 2.0},
+    ]
+
+    chunks = chunk_snippets(snippets, max_tokens=7, timecodes=True)
+
+    assert [chunk.text for chunk in chunks] == [
+        "[0:00:00] un deux\n[0:01:05] trois quatre",
+        "[1:01:40] cinq six",
+    ]
+    assert [chunk.tokens for chunk in chunks] == [7, 3]
+    assert chunk_snippets(snippets, max_tokens=7)[0].text == "un deux\ntrois quatre"
+
+
+def test_plan_does_not_announce_any_generation(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
+):
+    monkeypatch.setattr(
+        ai_xp.llm_proxy,
+        "count_tokens_batch",
+        lambda texts, **kwargs: [len(text.split()) for text in texts],
+    )
+    transcript_path = tmp_path / "fr.generated.abc123.some-title.success.json"
+    transcript_path.write_text('{"snippets": [{"text": "bonjour", "start": 0.0}]}')
+    summarizer = AiSummarizer.instantiate(
+        OpenRouterAiProxy(api_key=""), dry_run=True, prompts_path=PROMPTS_PATH
+    )
+    job = SummaryJob(
+        video=VideoModel(video_id="abc123", title="Title", description=None),
+        transcript_file_path=transcript_path,
+        llm_output_dir_path=tmp_path,
+        prompt_language_code="fr",
+        prompt_family="basic",
+    )
+
+    plan = summarizer.plan([job])
+
+    assert len(plan) == 1
+    assert "Generating" not in capsys.readouterr().out
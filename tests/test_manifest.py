@@ -0,0 +1,109 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from ai_xp.database import (
+    llm_outputs_dir_dataframe,
+    metadata_dir_to_dataframe,
+    transcripts_dir_to_dataframe,
+)
+from ai_xp.manifest import FileManifest
+
+
+@pytest.fixture
+def generated(tmp_path: Path) -> Path:
+    metadata_dir = tmp_path / "metadata_output"
+    transcript_dir = tmp_path / "transcript_output"
+    llm_output_dir = tmp_path / "llm_output" / "2025-04-20T10-00-00-000001"
+    for directory in (metadata_dir, transcript_dir, llm_output_dir):
+        directory.mkdir(parents=True)
+    for video_id in ("abc123", "def456"):
+        (metadata_dir / f"{video_id}.some-title.success.json").write_text("{}")
+        (
+            transcript_dir / f"fr.generated.{video_id}.some-title.success.json"
+        ).write_text("{}")
+        (
+            llm_output_dir / f"basic.fr.generated.{video_id}.some-title.success.md"
+        ).write_text("")
+    (transcript_dir / "_._.ghi789.other.TranscriptsDisabled.json").write_text("{}")
+    return tmp_path
+
+
+def open_manifest(generated: Path) -> FileManifest:
+    return FileManifest.open(
+        generated / "manifest.sqlite",
+        metadata_dir_path=generated / "metadata_output",
+        transcript_dir_path=generated / "transcript_output",
+        llm_output_dir_path=generated / "llm_output",
+    )
+
+
+def test_manifest_matches_globbed_dataframes(generated: Path):
+    manifest = open_manifest(generated)
+    manifest.reconcile()
+
+    pd.testing.assert_frame_equal(
+        manifest.metadata_dataframe(),
+        metadata_dir_to_dataframe(generated / "metadata_output"),
+    )
+    pd.testing.assert_frame_equal(
+        manifest.transcript_dataframe(),
+        transcripts_dir_to_dataframe(generated / "transcript_output"),
+    )
+    pd.testing.assert_frame_equal(
+        manifest.llm_output_dataframe(),
+        llm_outputs_dir_dataframe(generated / "llm_output"),
+    )
+
+
+def test_manifest_reconcile_only_changed_directories(generated: Path):
+    manifest = open_manifest(generated)
+    manifest.reconcile()
+    assert manifest.reconcile() == {"metadata": 0, "transcript": 0, "llm_output": 0}
+
+    (generated / "metadata_output" / "abc123.some-title.success.json").unlink()
+    assert manifest.reconcile() == {"metadata": 1, "transcript": 0, "llm_output": 0}
+    assert list(manifest.metadata_dataframe().index) == ["def456"]
+
+
+def test_manifest_skips_llm_outputs_outside_time_id_folders(generated: Path):
+    manifest = open_manifest(generated)
+    stray_paths = [
+        generated / "llm_output" / "basic.fr.generated.abc123.some-title.success.md",
+        generated / "llm_output" / "drafts" / "basic.fr.generated.abc123.x.success.md",
+    ]
+    for path in stray_paths:
+        path.parent.mkdir(exist_ok=True)
+        path.write_text("")
+
+    manifest.reconcile()
+    manifest.record("llm_output", stray_paths[0])
+
+    df = manifest.llm_output_dataframe()
+    assert len(df) == 2
+    assert not set(stray_paths) & set(df["path"])
+
+
+def test_manifest_lists_a_subfolder_created_during_reconcile(
+    generated: Path, monkeypatch: pytest.MonkeyPatch
+):
+    manifest = open_manifest(generated)
+    manifest.reconcile()
+    late_dir = generated / "llm_output" / "2025-04-21T10-00-00-000001"
+    subdirectories = FileManifest._subdirectories
+
+    def create_after_listing(self, root: Path, root_mtime_ns: int | None):
+        listed = subdirectories(self, root, root_mtime_ns)
+        if root.name == "llm_output" and not late_dir.exists():
+            late_dir.mkdir()
+            (late_dir / "basic.fr.generated.abc123.some-title.success.md").touch()
+        return listed
+
+    (generated / "llm_output" / "stray.txt").touch()
+    monkeypatch.setattr(FileManifest, "_subdirectories", create_after_listing)
+    manifest.reconcile()
+    assert len(manifest.llm_output_dataframe()) == 2
+
+    manifest.reconcile()
+    assert len(manifest.llm_output_dataframe()) == 3
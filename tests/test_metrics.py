@@ -0,0 +1,68 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from ai_xp.metrics import MetricsRegistry
+
+
+def test_spans_are_exported_as_events_and_prometheus(tmp_path: Path):
+    metrics = MetricsRegistry(
+        events_path=tmp_path / "events.jsonl",
+        prometheus_path=tmp_path / "ai_xp.prom",
+    )
+    with metrics.span("llm_call", video_id="abc123") as span:
+        span.status = "success"
+        span.bytes = 42
+        span.prompt_tokens = 100
+        span.completion_tokens = 20
+    with pytest.raises(TimeoutError):
+        with metrics.span("transcript_fetch", video_id="def456"):
+            raise TimeoutError
+    metrics.flush()
+
+    events = [
+        json.loads(line)
+        for line in (tmp_path / "events.jsonl").read_text().splitlines()
+    ]
+    assert [
+        (event["stage"], event["video_id"], event["status"]) for event in events
+    ] == [
+        ("llm_call", "abc123", "success"),
+        ("transcript_fetch", "def456", "TimeoutError"),
+    ]
+    assert events[0]["bytes"] == 42
+
+    prometheus = (tmp_path / "ai_xp.prom").read_text()
+    assert "# TYPE ai_xp_stage_seconds histogram" in prometheus
+    assert 'ai_xp_stage_total{stage="llm_call",status="success"} 1' in prometheus
+    assert 'ai_xp_llm_tokens_total{kind="prompt",stage="llm_call"} 100' in prometheus
+    assert 'ai_xp_stage_seconds_bucket{stage="llm_call",le="+Inf"} 1' in prometheus
+    assert 'ai_xp_stage_seconds_count{stage="transcript_fetch"} 1' in prometheus
+
+
+def test_prometheus_families_are_contiguous():
+    metrics = MetricsRegistry()
+    for stage in ("metadata_fetch", "llm_call"):
+        with metrics.span(stage) as span:
+            span.bytes = 10
+    metrics.inc("ai_xp_custom_total")
+
+    family = None
+    families = []
+    for line in metrics.to_prometheus().splitlines():
+        if line.startswith("# HELP "):
+            assert line.split()[2] not in families
+        elif line.startswith("# TYPE "):
+            family = line.split()[2]
+            families.append(family)
+        else:
+            # Every sample follows the TYPE of its family.
+            name = line.split("{")[0].split()[0]
+            assert family is not None and name.startswith(family)
+    assert families == [
+        "ai_xp_custom_total",
+        "ai_xp_stage_bytes_total",
+        "ai_xp_stage_seconds",
+        "ai_xp_stage_total",
+    ]
@@ -0,0 +1,36 @@
+from ai_xp.rate_limit import TokenBucket, run_rate_limited
+
+
+def test_run_rate_limited_counts_failures_per_item():
+    def function(item: str) -> str | None:
+        if item == "raises":
+            raise KeyError(item)
+        if item == "none":
+            return None
+        return item
+
+    results, stats = run_rate_limited(
+        ["ok", "error-artifact", "raises", "none"],
+        function,
+        bucket=TokenBucket(rate=1000, burst=4),
+        max_workers=2,
+        label="test",
+        is_success=lambda result: result == "ok",
+    )
+
+    # Error artifacts are collected, but not counted as successes.
+    assert sorted(results) == ["error-artifact", "ok"]
+    assert (stats.succeeded, stats.failed, stats.done) == (1, 3, 4)
+
+
+def test_idle_time_is_reported_per_worker():
+    results, stats = run_rate_limited(
+        range(4),
+        lambda item: item,
+        bucket=TokenBucket(rate=40, burst=1),
+        max_workers=4,
+        label="test",
+    )
+
+    assert sorted(results) == [0, 1, 2, 3]
+    assert stats.idle_seconds_per_worker <= stats.elapsed_seconds
@@ -0,0 +1,119 @@
+import json
+import os
+import time
+from dataclasses import replace
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from ai_xp.llm_proxy import OpenRouterAiProxy
+from ai_xp.response_cache import CacheStats, ResponseCache, render_cache_key
+
+
+class CountingSession:
+    # Stands in for the HTTP session: each request gets a new completion.
+    def __init__(self):
+        self.calls = 0
+
+    def post(self, **kwargs) -> SimpleNamespace:
+        self.calls += 1
+        body = {"choices": [{"message": {"content": f"Résumé {self.calls}"}}]}
+        return SimpleNamespace(
+            status_code=200, headers={}, content=json.dumps(body).encode()
+        )
+
+
+def content(product: dict) -> str:
+    return product["response"]["choices"][0]["message"]["content"]
+
+
+@pytest.fixture
+def session() -> CountingSession:
+    return CountingSession()
+
+
+@pytest.fixture
+def proxy(tmp_path: Path, session: CountingSession) -> OpenRouterAiProxy:
+    return OpenRouterAiProxy(
+        api_key="fake",
+        http_client=session,
+        response_cache=ResponseCache(root=tmp_path / "cache"),
+    )
+
+
+def test_hit_returns_the_stored_response_without_a_request(
+    proxy: OpenRouterAiProxy, session: CountingSession
+):
+    first = proxy.prompt({"user": "Résume ce transcript."})
+    second = proxy.prompt({"user": "Résume ce transcript."})
+
+    assert session.calls == 1
+    assert (first["cache_hit"], second["cache_hit"]) == (False, True)
+    assert second["response"] == first["response"]
+    assert proxy.response_cache.stats == CacheStats(hits=1, misses=1, writes=1)
+
+
+def test_other_prompt_or_model_is_a_miss(
+    proxy: OpenRouterAiProxy, session: CountingSession
+):
+    proxy.prompt({"user": "Résume ce transcript."})
+    assert not proxy.prompt({"user": "Résume cet autre transcript."})["cache_hit"]
+    other_model = replace(proxy, model="other/model")
+    assert not other_model.prompt({"user": "Résume ce transcript."})["cache_hit"]
+
+    assert session.calls == 3
+    assert proxy.response_cache.stats == CacheStats(misses=3, writes=3)
+
+
+def test_bypass_refreshes_the_entry(proxy: OpenRouterAiProxy, session: CountingSession):
+    prompts = {"user": "Résume ce transcript."}
+    proxy.prompt(prompts)
+    fresh = proxy.prompt(prompts, bypass_cache=True)
+    cached = proxy.prompt(prompts)
+
+    assert session.calls == 2
+    assert (content(fresh), content(cached)) == ("Résumé 2", "Résumé 2")
+    # The bypassed lookup is not counted.
+    assert proxy.response_cache.stats == CacheStats(hits=1, misses=1, writes=2)
+
+
+def test_evict_removes_the_least_recently_used_first(tmp_path: Path):
+    cache = ResponseCache(root=tmp_path / "cache", max_age_seconds=None)
+    keys = [
+        render_cache_key("model", [{"role": "user", "content": f"{i}"}])
+        for i in range(3)
+    ]
+    now = time.time()
+    for age, key in zip((30, 20, 10), keys):
+        cache.put(key, {"choices": [{"message": {"content": "Résumé"}}]})
+        os.utime(cache._path(key), (now - age, now - age))
+    entry_size = cache._path(keys[0]).stat().st_size
+    cache = replace(cache, max_bytes=2 * entry_size)
+
+    # Reading the oldest entry makes it the most recently used.
+    assert cache.get(keys[0]) is not None
+    assert cache.evict() == 1
+
+    assert [cache._path(key).exists() for key in keys] == [True, False, True]
+    assert cache.stats == CacheStats(hits=1, writes=3, evictions=1)
+
+
+def test_evict_removes_the_expired_entries(tmp_path: Path):
+    cache = ResponseCache(root=tmp_path / "cache", max_age_seconds=60)
+    keys = [
+        render_cache_key("model", [{"role": "user", "content": f"{i}"}])
+        for i in range(2)
+    ]
+    for key in keys:
+        cache.put(key, {"choices": [{"message": {"content": "Résumé"}}]})
+    expired = time.time() - 120
+    os.utime(cache._path(keys[0]), (expired, expired))
+
+    assert cache.get(keys[0]) is None
+    assert cache.evict() == 1
+    assert [cache._path(key).exists() for key in keys] == [False, True]
+    assert cache.stats == CacheStats(misses=1, writes=2, evictions=1)
+    assert cache.stats.report() == (
+        "0 hits, 1 misses (0% hit ratio), 2 writes, 1 evictions"
+    )
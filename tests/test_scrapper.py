@@ -0,0 +1,16 @@
+import pytest
+
+from ai_xp.scrapper import YouTubeHtmlScrapper
+
+
+@pytest.mark.parametrize(
+    "head",
+    [
+        "<title>Une vidéo - YouTube</title>",
+        '<TITLE lang="fr">Une vidéo - YouTube</TITLE>',
+        "<titlefoo>Autre</titlefoo><title>Une vidéo - YouTube</title>",
+    ],
+)
+def test_title(head: str):
+    scrapper = YouTubeHtmlScrapper(html=f"<html><head>{head}</head></html>", url="")
+    assert scrapper.title() == "Une vidéo"
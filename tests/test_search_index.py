@@ -0,0 +1,103 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from ai_xp.database import FileDatabase, search
+from ai_xp.search_index import SearchIndex
+from benchmarks.synthetic import write_generated_tree, write_inputs
+
+SNIPPETS = [
+    {"text": "bonjour à tous", "start": 0.0, "duration": 1.5},
+    {"text": "aujourd'hui on parle", "start": 1.5, "duration": 2.0},
+    {"text": "de la théorie des cordes", "start": 3.5, "duration": 2.0},
+]
+
+
+@pytest.fixture
+def index(tmp_path: Path) -> SearchIndex:
+    path = tmp_path / "fr.generated.abc123.some-title.success.json"
+    path.write_text(json.dumps({"snippets": SNIPPETS}, ensure_ascii=False))
+    index = SearchIndex.open(tmp_path / "search.sqlite")
+    index.index_paths("transcript", [path])
+    return index
+
+
+def test_phrase_within_a_snippet(index: SearchIndex):
+    (hit,) = index.search_transcripts("theorie des")
+    assert (hit.video_id, hit.language_code) == ("abc123", "fr")
+    assert hit.start_seconds == 3.5
+    assert hit.video_url.endswith("&t=3s")
+
+
+def test_phrase_across_snippets(index: SearchIndex):
+    (hit,) = index.search_transcripts("on parle de la théorie")
+    assert hit.start_seconds == 1.5
+    assert hit.snippet_text == "aujourd'hui on parle de la théorie des cordes"
+    assert index.search_transcripts("tous cordes") == []
+
+
+def test_regex_across_snippets(index: SearchIndex):
+    hits = index.search_transcripts(r"parle\s+de", regex=True)
+    assert [hit.start_seconds for hit in hits] == [1.5]
+    assert len(index.search_transcripts("o", regex=True, limit=2)) == 2
+
+
+def test_invalid_regex(index: SearchIndex):
+    with pytest.raises(ValueError, match="Invalid regex"):
+        index.search_transcripts("(unclosed", regex=True)
+
+
+def test_reindexed_transcript_replaces_its_snippets(tmp_path: Path, index: SearchIndex):
+    path = tmp_path / "fr.generated.abc123.some-title.success.json"
+    path.write_text(json.dumps({"snippets": SNIPPETS[:1]}))
+    index.index_paths("transcript", [path])
+    assert index.search_transcripts("on parle") == []
+    assert len(index.search_transcripts("bonjour")) == 1
+
+
+def test_search_keeps_the_substring_semantics(tmp_path: Path):
+    inputs_dir, generated_dir = write_generated_tree(tmp_path, 20)
+    db = FileDatabase.from_paths(inputs_dir, generated_dir)
+    # Nothing is indexed on open.
+    assert db.search_index.indexed_paths() == set()
+
+    df = db.input_dataframe
+    for value in ("robot", "ONSTR", "économie python", "absent"):
+        pd.testing.assert_frame_equal(db.search(df, value), search(df, value))
+
+
+def test_ranked_search_matches_word_prefixes(tmp_path: Path):
+    db = FileDatabase.from_paths(write_inputs(tmp_path, 50), tmp_path / "generated")
+    df = db.input_dataframe
+
+    # Whole words: same rows as the substring search, best ranked first.
+    for value in ("robot", "cinéma", "volcan"):
+        ranked = db.search(df, value, ranked=True)
+        assert sorted(ranked.index) == sorted(search(df, value).index)
+    # A substring within a word is not a prefix.
+    assert not search(df, "onctionne").empty
+    assert db.search(df, "onctionne", ranked=True).empty
+
+
+@pytest.mark.parametrize("use_manifest", [True, False])
+def test_empty_tree_has_the_columns_of_a_populated_one(
+    tmp_path: Path, use_manifest: bool
+):
+    inputs_dir, generated_dir = write_generated_tree(tmp_path / "populated", 5)
+    populated = FileDatabase.from_paths(inputs_dir, generated_dir)
+    empty = FileDatabase.from_paths(
+        write_inputs(tmp_path / "empty", 5),
+        tmp_path / "empty" / "generated",
+        use_manifest=use_manifest,
+    )
+
+    for name in ("metadata_dataframe", "transcript_dataframe", "llm_output_dataframe"):
+        df, populated_df = getattr(empty, name), getattr(populated, name)
+        assert df.empty
+        assert df.columns.tolist() == populated_df.columns.tolist()
+        assert df.index.names == populated_df.index.names
+    # Nothing to index, but nothing missing either.
+    empty.sync_search_index()
+    assert empty.search_transcripts("robot") == []
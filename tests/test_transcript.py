@@ -0,0 +1,71 @@
+import pytest
+import requests
+from youtube_transcript_api import (
+    NoTranscriptFound,
+    Transcript,
+    TranscriptList,
+    TranslationLanguageNotAvailable,
+)
+from youtube_transcript_api._transcripts import _TranslationLanguage
+
+from ai_xp.transcript import TranscriptBatchFetcher
+
+TRANSLATION_LANGUAGES = [_TranslationLanguage(language="English", language_code="en")]
+
+
+def render_transcript(language_code: str, *, is_generated: bool) -> Transcript:
+    return Transcript(
+        requests.Session(),
+        "abcdefghijk",
+        f"https://www.youtube.com/api/timedtext?lang={language_code}",
+        language_code,
+        language_code,
+        is_generated,
+        TRANSLATION_LANGUAGES,
+    )
+
+
+@pytest.fixture
+def transcript_list() -> TranscriptList:
+    return TranscriptList(
+        "abcdefghijk",
+        {"de": render_transcript("de", is_generated=False)},
+        {"fr": render_transcript("fr", is_generated=True)},
+        TRANSLATION_LANGUAGES,
+    )
+
+
+@pytest.mark.parametrize(
+    ("key", "url"),
+    [
+        (("fr", "generated"), "https://www.youtube.com/api/timedtext?lang=fr"),
+        (("de", "manually_created"), "https://www.youtube.com/api/timedtext?lang=de"),
+        # Translations are made from the manually created transcripts first.
+        (
+            ("en", "generated"),
+            "https://www.youtube.com/api/timedtext?lang=de&tlang=en",
+        ),
+    ],
+)
+def test_find(transcript_list: TranscriptList, key: tuple[str, str], url: str):
+    transcript = TranscriptBatchFetcher().find(transcript_list, key)
+    assert transcript.language_code == key[0]
+    assert transcript._url == url
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        # Manually created transcripts are never translated.
+        ("en", "manually_created"),
+        ("fr", "manually_created"),
+    ],
+)
+def test_find_manually_created_only(transcript_list: TranscriptList, key):
+    with pytest.raises(NoTranscriptFound):
+        TranscriptBatchFetcher().find(transcript_list, key)
+
+
+def test_find_without_translation_language(transcript_list: TranscriptList):
+    with pytest.raises(TranslationLanguageNotAvailable):
+        TranscriptBatchFetcher().find(transcript_list, ("es", "generated"))
@@ -0,0 +1,102 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from ai_xp.transcript import load_transcript_snippets
+from ai_xp.transcript_store import TranscriptStore
+
+SNIPPETS = [
+    {"text": "bonjour à tous", "start": 0.0, "duration": 1.5},
+    {"text": "aujourd'hui", "start": 1.5, "duration": 2.0},
+]
+
+
+def write_transcript(path: Path, snippets: list[dict]) -> Path:
+    path.write_text(json.dumps({"snippets": snippets}, ensure_ascii=False))
+    return path
+
+
+@pytest.fixture
+def transcript_dir(tmp_path: Path) -> Path:
+    transcript_dir = tmp_path / "transcript_output"
+    transcript_dir.mkdir()
+    write_transcript(
+        transcript_dir / "fr.generated.abc123.some-title.success.json", SNIPPETS
+    )
+    write_transcript(
+        transcript_dir / "en.manually_created.def456.other.success.json", SNIPPETS
+    )
+    (transcript_dir / "_._.ghi789.other.TranscriptsDisabled.json").write_text("{}")
+    return transcript_dir
+
+
+def test_compact_and_load_round_trip(tmp_path: Path, transcript_dir: Path):
+    pytest.importorskip("pyarrow")
+    store = TranscriptStore(root=tmp_path / "transcript_store")
+    paths = sorted(transcript_dir.glob("*.json"))
+
+    # Error artifacts are not packed.
+    assert store.compact(paths) == 2
+    assert store.compact(paths) == 0
+    for path in paths[1:]:
+        assert path in store
+        assert store.load_snippets(path) == SNIPPETS
+        assert load_transcript_snippets(path, store=store) == SNIPPETS
+    assert len(store.to_dataframe()) == 4
+
+    reopened = TranscriptStore(root=store.root)
+    assert reopened.load_snippets(paths[1]) == SNIPPETS
+
+
+def test_rewritten_transcript_is_not_served_from_the_store(
+    tmp_path: Path, transcript_dir: Path
+):
+    pytest.importorskip("pyarrow")
+    store = TranscriptStore(root=tmp_path / "transcript_store")
+    path = transcript_dir / "fr.generated.abc123.some-title.success.json"
+    store.compact([path])
+
+    rewritten = [{"text": "nouveau", "start": 0.0, "duration": 1.0}]
+    write_transcript(path, rewritten)
+    assert path not in store
+    assert store.load_snippets(path) is None
+    assert load_transcript_snippets(path, store=store) == rewritten
+
+    assert store.compact([path]) == 1
+    assert store.load_snippets(path) == rewritten
+
+
+def test_dataframe_holds_the_latest_packing_of_existing_transcripts(
+    tmp_path: Path, transcript_dir: Path
+):
+    pytest.importorskip("pyarrow")
+    store = TranscriptStore(root=tmp_path / "transcript_store")
+    rewritten_path = transcript_dir / "fr.generated.abc123.some-title.success.json"
+    deleted_path = transcript_dir / "en.manually_created.def456.other.success.json"
+    store.compact([rewritten_path, deleted_path])
+
+    rewritten = [{"text": "nouveau", "start": 0.0, "duration": 1.0}]
+    write_transcript(rewritten_path, rewritten)
+    assert store.compact([rewritten_path, deleted_path]) == 1
+
+    df = store.to_dataframe()
+    assert not df.duplicated(["transcript_name", "start"]).any()
+    assert df.groupby("transcript_name")["text"].apply(list).to_dict() == {
+        rewritten_path.name: ["nouveau"],
+        deleted_path.name: [snippet["text"] for snippet in SNIPPETS],
+    }
+
+    deleted_path.unlink()
+    assert store.to_dataframe()["transcript_name"].tolist() == [rewritten_path.name]
+
+
+def test_missing_store_does_not_need_pyarrow(
+    tmp_path: Path, transcript_dir: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    store = TranscriptStore(root=tmp_path / "transcript_store")
+    path = transcript_dir / "fr.generated.abc123.some-title.success.json"
+    assert store.load_snippets(path) is None
+    assert load_transcript_snippets(path, store=store) == SNIPPETS
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from ai_xp.usage_ledger import UsageLedger
+
+
+def render_product(prompt_tokens: int, completion_tokens: int, cost: float) -> dict:
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "cost": cost,
+    }
+    response = {"model": "fake/model", "usage": usage}
+    return {"model": "fake/model", "response": response, "status_code": 200}
+
+
+def test_daily_dataframe_aggregates_per_day(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    ledger = UsageLedger(path=tmp_path / "usage.jsonl")
+    for time, (prompt_tokens, completion_tokens, cost) in [
+        ("2025-04-20T10:00:00", (100, 10, 0.5)),
+        ("2025-04-20T23:00:00", (200, 20, 1.0)),
+        ("2025-04-21T08:00:00", (300, 30, 2.0)),
+    ]:
+        monkeypatch.setattr(pd.Timestamp, "now", lambda time=time: pd.Timestamp(time))
+        ledger.record(
+            render_product(prompt_tokens, completion_tokens, cost),
+            latency_seconds=1.0,
+        )
+    failed = {"model": "fake/model", "response": {"error": {"code": 429}}}
+    ledger.record(failed, latency_seconds=3.0)
+
+    df = ledger.daily_dataframe().loc["fake/model"]
+
+    assert df.index.tolist() == [pd.Timestamp("2025-04-20"), pd.Timestamp("2025-04-21")]
+    assert df["requests"].tolist() == [2, 2]
+    assert df["failed"].tolist() == [0, 1]
+    assert df["prompt_tokens"].tolist() == [300, 300]
+    assert df["completion_tokens"].tolist() == [30, 30]
+    assert df["total_tokens"].tolist() == [330, 330]
+    assert df["cost"].tolist() == [1.5, 2.0]
+    assert df["max_latency_seconds"].tolist() == [1.0, 3.0]
@@ -0,0 +1,120 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from ai_xp.transcript import extract_video_id
+from ai_xp.utils import render_video_url
+from ai_xp.youtube_history import (
+    HISTORY_COLUMNS,
+    YouTubeHistoryAnalyzer,
+    iter_history_entries,
+)
+from benchmarks.synthetic import write_takeout
+
+
+def legacy_history_dataframe(path: Path, *, consolidate: bool) -> pd.DataFrame:
+    # Former implementation of YouTubeHistoryAnalyzer.from_path (French).
+    with open(path, "r") as fp:
+        raw_history_json = json.load(fp)
+    filtered_raw_history_json = raw_history_json
+    if consolidate:
+        filtered_raw_history_json = []
+        for entry in raw_history_json:
+            if "www.youtube.com" in entry["title"]:
+                entry["title"] = ""
+            else:
+                entry["title"] = (
+                    entry["title"]
+                    .removeprefix("Vous avez regardé ")
+                    .removeprefix("consulté ")
+                )
+            if "titleUrl" in entry:
+                if (
+                    entry["titleUrl"].startswith("https://www.youtube.com/playlist")
+                    or entry["titleUrl"].startswith("https://www.youtube.com/post")
+                    or entry["titleUrl"] == "https://www.youtube.com/watch?v="
+                    or "google.com/" in entry["titleUrl"]
+                ):
+                    continue
+                identifier = extract_video_id(entry["titleUrl"])
+                if identifier:
+                    entry["video_id"] = identifier
+                    entry["href"] = render_video_url(identifier)
+                filtered_raw_history_json.append(entry)
+    df = pd.DataFrame(filtered_raw_history_json)
+    df["time"] = pd.to_datetime(df["time"], format="mixed")
+    df = df.sort_values("time")
+    df = df.drop_duplicates(subset="titleUrl", keep="last")
+    df["timedelta"] = df["time"] - df["time"].iloc[0]
+    return df.set_index("time")
+
+
+@pytest.fixture
+def takeout_path(tmp_path: Path) -> Path:
+    path = write_takeout(tmp_path / "watch-history.json", 120)
+    entries = json.loads(path.read_text())
+    time = "2023-02-01T00:00:00.123Z"
+    entries += [
+        {
+            "header": "YouTube",
+            "title": "Vous avez regardé une vidéo supprimée",
+            "time": time,
+        },
+        {
+            "header": "YouTube",
+            "title": "Vous avez consulté https://www.youtube.com/post/Ugk",
+            "titleUrl": "https://www.youtube.com/post/Ugk",
+            "time": time,
+        },
+        {
+            "header": "YouTube Music",
+            "title": "Vous avez regardé Une chanson",
+            "titleUrl": "https://music.youtube.com/watch?v=abcdefghijk",
+            "subtitles": [{"name": "Un artiste", "url": "https://example.com"}],
+            "time": "2023-02-02T00:00:00Z",
+        },
+        {
+            "header": "YouTube",
+            "title": "Vous avez regardé https://www.youtube.com/watch?v=bcdefghijkl",
+            "titleUrl": "https://youtu.be/bcdefghijkl",
+            "time": "2023-02-03T00:00:00Z",
+        },
+    ]
+    path.write_text(json.dumps(entries, ensure_ascii=False, indent=2))
+    return path
+
+
+def test_iter_history_entries_by_small_chunks(takeout_path: Path):
+    entries = list(iter_history_entries(takeout_path, chunk_size=64))
+    assert entries == json.loads(takeout_path.read_text())
+
+
+@pytest.mark.parametrize("consolidate", [False, True])
+def test_from_path_matches_the_former_implementation(
+    takeout_path: Path, consolidate: bool
+):
+    analyzer = YouTubeHistoryAnalyzer.from_path(
+        takeout_path, consolidate=consolidate, batch_size=50
+    )
+    expected = legacy_history_dataframe(takeout_path, consolidate=consolidate)
+
+    pd.testing.assert_frame_equal(analyzer.df, expected, check_like=True)
+
+
+def test_from_path_with_columns(takeout_path: Path):
+    analyzer = YouTubeHistoryAnalyzer.from_path(
+        takeout_path, consolidate=True, columns=HISTORY_COLUMNS
+    )
+    expected = legacy_history_dataframe(takeout_path, consolidate=True)
+
+    assert set(analyzer.df.columns) == {
+        *HISTORY_COLUMNS,
+        "video_id",
+        "href",
+        "timedelta",
+    } - {"time"}
+    pd.testing.assert_frame_equal(
+        analyzer.df, expected[analyzer.df.columns], check_like=True
+    )